@@ -3,7 +3,14 @@ from azure.identity import DefaultAzureCredential
 from azure.ai.projects.models import MessageTextContent
 from dotenv import load_dotenv
 import os
-import time
+import sys
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_waiter import RunWaiter
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +27,8 @@ project_client = AIProjectClient.from_connection_string(
     conn_str=conn_str,
 )
 
+run_waiter = RunWaiter()
+
 with project_client:
 
     # [START create_agent]
@@ -42,14 +51,10 @@ with project_client:
 
     print(f"Created message, message ID: {message.id}")
 
-    run = project_client.agents.create_run(thread_id=thread.id, agent_id=agent.id)
-
-    while run.status in ["queued", "in_progress", "requires_action"]:
-        # Wait for a second
-        time.sleep(1)
-        run = project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
-        # [END create_run]
-        print(f"Run status: {run.status}")
+    # Streams the run when possible, otherwise polls with backoff instead of once a second
+    run = run_waiter.create_and_wait(project_client.agents, thread_id=thread.id, agent_id=agent.id)
+    print(f"Run status: {run.status}")
+    print(f"Run wait: {run_waiter.history[-1]}")
     
     project_client.agents.delete_agent(agent.id)
     print("Deleted agent")
@@ -3,7 +3,15 @@ from azure.identity import DefaultAzureCredential
 from azure.ai.projects.models import MessageTextContent, FileSearchTool
 from dotenv import load_dotenv
 import os
-import time
+import sys
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_waiter import RunWaiter
+from agent_utils.upload_cache import UploadCache
 
 # Load environment variables
 load_dotenv()
@@ -20,14 +28,16 @@ project_client = AIProjectClient.from_connection_string(
     conn_str=conn_str,
 )
 
-with project_client:
+run_waiter = RunWaiter()
+upload_cache = UploadCache(project_client)
 
-    file = project_client.agents.upload_file_and_poll(file_path = "Section_5/files/product_info_1.md", purpose = "assistants")
-    print("File uploaded with file id", file.id)
+with project_client:
 
-    vector_store = project_client.agents.create_vector_store_and_poll(file_ids=[file.id], name="my_vectorstore")
+    # Unchanged files are not uploaded again and the vector store is reused across runs
+    vector_store_id = upload_cache.vector_store("my_vectorstore", ["Section_5/files/product_info_1.md"])
+    print("Vector store ready with id", vector_store_id)
 
-    file_search = FileSearchTool(vector_store_ids=[vector_store.id])
+    file_search = FileSearchTool(vector_store_ids=[vector_store_id])
 
     # [START create_agent]
     agent = project_client.agents.create_agent(
@@ -51,14 +61,10 @@ with project_client:
 
     print(f"Created message, message ID: {message.id}")
 
-    run = project_client.agents.create_run(thread_id=thread.id, agent_id=agent.id)
-
-    while run.status in ["queued", "in_progress", "requires_action"]:
-        # Wait for a second
-        time.sleep(1)
-        run = project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
-        # [END create_run]
-        print(f"Run status: {run.status}")
+    # Streams the run when possible, otherwise polls with backoff instead of once a second
+    run = run_waiter.create_and_wait(project_client.agents, thread_id=thread.id, agent_id=agent.id)
+    print(f"Run status: {run.status}")
+    print(f"Run wait: {run_waiter.history[-1]}")
     
     # project_client.agents.delete_agent(agent.id)
     # print("Deleted agent")
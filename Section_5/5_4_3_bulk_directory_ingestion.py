@@ -0,0 +1,86 @@
+"""
+DESCRIPTION:
+    Keeps a vector store in sync with a whole directory of documents and runs a
+    file search agent over it. Files are uploaded concurrently and added in
+    vector store file batches; re-runs only upload new or changed files and
+    remove the ones that were deleted locally from the vector store (pass
+    --delete-removed-files to delete the uploaded files as well).
+
+USAGE:
+    python Section_5/5_4_3_bulk_directory_ingestion.py Section_5/files --vector-store-name product_docs --max-workers 16
+"""
+
+from azure.ai.projects import AIProjectClient
+from azure.identity import DefaultAzureCredential
+from azure.ai.projects.models import FileSearchTool
+from dotenv import load_dotenv
+import argparse
+import os
+import sys
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.ingestion import DirectoryIngestor
+from agent_utils.run_waiter import RunWaiter
+
+# Load environment variables
+load_dotenv()
+
+conn_str = os.environ["PROJECT_CONNECTION_STRING"]
+model_deployment_name = os.environ["MODEL_DEPLOYMENT_NAME"]
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("directory", help="Directory of documents to index.")
+parser.add_argument("--vector-store-name", default="product_docs")
+parser.add_argument("--pattern", action="append", help="File name glob to include (repeatable, default: all files).")
+parser.add_argument("--max-workers", type=int, default=int(os.getenv("INGEST_MAX_WORKERS", "8")))
+parser.add_argument("--batch-size", type=int, default=500, help="File IDs per vector store file batch (max 500).")
+parser.add_argument(
+    "--delete-removed-files",
+    action="store_true",
+    help="Also delete uploaded files whose local file is gone, unless another vector store still uses them.",
+)
+parser.add_argument("--question", default="What feature does Smart Eyewear offer?")
+args = parser.parse_args()
+
+project_client = AIProjectClient.from_connection_string(
+    credential=DefaultAzureCredential(), conn_str=conn_str
+)
+
+with project_client:
+
+    ingestor = DirectoryIngestor(
+        project_client,
+        max_workers=args.max_workers,
+        batch_size=args.batch_size,
+        patterns=args.pattern or ("*",),
+        delete_removed_files=args.delete_removed_files,
+    )
+    report = ingestor.sync(args.directory, args.vector_store_name)
+    print(f"Ingestion finished: {report}")
+
+    file_search = FileSearchTool(vector_store_ids=[report.vector_store_id])
+    agent = project_client.agents.create_agent(
+        model=model_deployment_name,
+        name="my-assistant",
+        instructions="You are helpful assistant, You answer only from the files provided to you.",
+        tools=file_search.definitions,
+        tool_resources=file_search.resources,
+    )
+    print(f"Created agent, agent ID: {agent.id}")
+
+    thread = project_client.agents.create_thread()
+    project_client.agents.create_message(thread_id=thread.id, role="user", content=args.question)
+    run = RunWaiter().create_and_wait(project_client.agents, thread_id=thread.id, agent_id=agent.id)
+    print(f"Run status: {run.status}")
+
+    project_client.agents.delete_agent(agent.id)
+    print("Deleted agent")
+
+    messages = project_client.agents.list_messages(thread_id=thread.id)
+    reply = messages.get_last_text_message_by_role("assistant")
+    if reply:
+        print(f"assistant: {reply.text.value}")
@@ -3,8 +3,16 @@ from azure.identity import DefaultAzureCredential
 from azure.ai.projects.models import MessageTextContent, FileSearchTool, BingGroundingTool, FilePurpose
 from dotenv import load_dotenv
 import os
+import sys
 import time
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.upload_cache import UploadCache
+
 # Load environment variables
 load_dotenv()
 
@@ -20,23 +28,17 @@ project_client = AIProjectClient.from_connection_string(
 
 with project_client:
 
-    # Upload a file and wait for it to be processed
-    file = project_client.agents.upload_file_and_poll(file_path="Section_5/files/product_info_1.md", purpose=FilePurpose.AGENTS)
-    print(f"Uploaded file, file ID: {file.id}")
-
-    # Create a vector store with no file and wait for it to be processed
-    vector_store = project_client.agents.create_vector_store_and_poll(data_sources=[], name="sample_vector_store")
-    print(f"Created vector store, vector store ID: {vector_store.id}")
-
-    # Add the file to the vector store or you can supply file ids in the vector store creation
-    vector_store_file_batch = project_client.agents.create_vector_store_file_batch_and_poll(
-        vector_store_id=vector_store.id, file_ids=[file.id]
+    # Upload the file and build the vector store only when the file content changed;
+    # new or changed files are added to the existing store as a file batch
+    upload_cache = UploadCache(project_client)
+    vector_store_id = upload_cache.vector_store(
+        "sample_vector_store", ["Section_5/files/product_info_1.md"], purpose=FilePurpose.AGENTS
     )
-    print(f"Created vector store file batch, vector store file batch ID: {vector_store_file_batch.id}")
+    print(f"Vector store ready, vector store ID: {vector_store_id}")
 
     # Create a file search tool
     # [START create_agent_with_tools_and_tool_resources]
-    file_search_tool = FileSearchTool(vector_store_ids=[vector_store.id])
+    file_search_tool = FileSearchTool(vector_store_ids=[vector_store_id])
 
     # Notices that FileSearchTool as tool and tool_resources must be added or the assistant unable to search the file
     agent = project_client.agents.create_agent(
@@ -60,8 +62,8 @@ with project_client:
     run = project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
     print(f"Created run, run ID: {run.id}")
 
-    file_search_tool.remove_vector_store(vector_store.id)
-    print(f"Removed vector store from file search, vector store ID: {vector_store.id}")
+    file_search_tool.remove_vector_store(vector_store_id)
+    print(f"Removed vector store from file search, vector store ID: {vector_store_id}")
 
     project_client.agents.update_agent(
         agent_id=agent.id, tools=file_search_tool.definitions, tool_resources=file_search_tool.resources
@@ -79,8 +81,7 @@ with project_client:
     run = project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
     print(f"Created run, run ID: {run.id}")
 
-    project_client.agents.delete_vector_store(vector_store.id)
-    print("Deleted vector store")
+    # The vector store is kept so the next run can reuse it
 
     project_client.agents.delete_agent(agent.id)
     print("Deleted agent")
@@ -1,11 +1,20 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FunctionTool, ToolSet, CodeInterpreterTool
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.parallel_tools import ParallelToolExecutor
+from agent_utils.tool_cache import ToolResultCache
+from agent_utils.tool_registry import user_tools
 
 # Load environment variables
 load_dotenv()
@@ -24,15 +33,19 @@ project_client = AIProjectClient.from_connection_string(
 with project_client:
     # Initialize agent toolset with user functions and code interpreter
     # [START create_agent_toolset]
-    functions = FunctionTool(user_functions)
+    functions = user_tools.function_tool()
     code_interpreter = CodeInterpreterTool()
 
     toolset = ToolSet()
     toolset.add(functions)
     toolset.add(code_interpreter)
 
-    # To enable tool calls executed automatically
-    project_client.agents.enable_auto_function_calls(toolset=toolset)
+    # Tool calls requested in the same step (e.g. datetime and weather) run concurrently,
+    # and all their outputs are submitted together
+    # Repeated calls to @pure tools (e.g. the same weather lookup) are answered from the cache
+    tool_executor = ParallelToolExecutor(
+        functions, timeouts={"send_email_to_address": 60}, result_cache=ToolResultCache()
+    )
 
     agent = project_client.agents.create_agent(
         model=os.environ["MODEL_DEPLOYMENT_NAME"],
@@ -57,12 +70,13 @@ with project_client:
 
     # Create and process agent run in thread with tools
     # [START create_and_process_run]
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
+    run = tool_executor.process_run(project_client.agents, thread_id=thread.id, agent_id=agent.id)
     # [END create_and_process_run]
     print(f"Run finished with status: {run.status}")
 
     if run.status == "failed":
         print(f"Run failed: {run.last_error}")
+    print(tool_executor.result_cache.summary())
 
     # Delete the assistant when done
     project_client.agents.delete_agent(agent.id)
@@ -1,13 +1,21 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FileSearchTool, CodeInterpreterTool, ToolSet, FunctionTool
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.upload_cache import UploadCache
+from agent_utils.tool_registry import user_tools
+
 # Load environment variables
 load_dotenv()
 
@@ -25,16 +33,15 @@ with project_client:
 
     # Upload file and create vector store
     # [START create_agent_and_thread_for_file_search]
-    file = project_client.agents.upload_file_and_poll(file_path="Section_5/files/product_info_1.md", purpose="assistants")
-    print(f"Uploaded file, file ID: {file.id}")
-    
-    vector_store = project_client.agents.create_vector_store_and_poll(file_ids=[file.id], name="my_vectorstore")
-    print(f"Created vector store, vector store ID: {vector_store.id}")
+    # Unchanged files are not uploaded again and the vector store is reused across runs
+    upload_cache = UploadCache(project_client)
+    vector_store_id = upload_cache.vector_store("my_vectorstore", ["Section_5/files/product_info_1.md"])
+    print(f"Vector store ready, vector store ID: {vector_store_id}")
 
     # Create file search tool with resources followed by creating agent
-    file_search = FileSearchTool(vector_store_ids=[vector_store.id])
+    file_search = FileSearchTool(vector_store_ids=[vector_store_id])
 
-    functions = FunctionTool(user_functions)
+    functions = user_tools.function_tool()
     code_interpreter = CodeInterpreterTool()
 
     toolset = ToolSet()
@@ -72,12 +79,7 @@ with project_client:
         print(f"Run failed: {run.last_error}")
     time.sleep(3)
     # [START teardown]
-    # Delete the file when done
-    project_client.agents.delete_vector_store(vector_store.id)
-    print("Deleted vector store")
-
-    project_client.agents.delete_file(file_id=file.id)
-    print("Deleted file")
+    # The file and vector store are kept so the next run can reuse them
 
     # Delete the agent when done
     project_client.agents.delete_agent(agent.id)
@@ -1,12 +1,19 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FileSearchTool, CodeInterpreterTool, ToolSet, FunctionTool
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
-import time
+import sys
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_waiter import RunWaiter
+from agent_utils.tracing import TracingProfile, configure_tracing, enable_sdk_instrumentation
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +28,8 @@ project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(), conn_str=conn_str
 )
 
+run_waiter = RunWaiter()
+
 # [START enable_tracing]
 from opentelemetry import trace
 from azure.monitor.opentelemetry import configure_azure_monitor
@@ -32,10 +41,16 @@ if not application_insights_connection_string:
     print("Enable it via the 'Tracing' tab in your AI Foundry project page.")
     exit()
 print(application_insights_connection_string)
-configure_azure_monitor(connection_string=application_insights_connection_string)
+# Export to Azure Monitor with the profile chosen by TRACING_PROFILE: "full" traces every run with
+# arguments and message contents, "low_overhead" samples 10% of runs plus the failed and slow ones,
+# caps attribute sizes and skips argument capture. Spans are exported in batches off the calling thread.
+tracing_profile = TracingProfile.from_env()
+tracing = configure_tracing(tracing_profile, connection_string=application_insights_connection_string)
+# configure_tracing only exports traces; keep Azure Monitor's log and metric exporters for the rest
+configure_azure_monitor(connection_string=application_insights_connection_string, disable_tracing=True)
 
-# enable additional instrumentations
-project_client.telemetry.enable()
+# enable additional instrumentations; message contents are recorded only if the profile captures arguments
+enable_sdk_instrumentation(project_client, tracing_profile)
 
 scenario = os.path.basename(__file__)
 tracer = trace.get_tracer(__name__)
@@ -56,18 +71,16 @@ with tracer.start_as_current_span(scenario):
         )
         print(f"Created message, message ID: {message.id}")
 
-        run = project_client.agents.create_run(thread_id=thread.id, agent_id=agent.id)
-
-        # Poll the run as long as run status is queued or in progress
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            # Wait for a second
-            time.sleep(1)
-            run = project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
-
-            print(f"Run status: {run.status}")
+        # Streams the run when possible, otherwise polls with backoff instead of once a second
+        run = run_waiter.create_and_wait(project_client.agents, thread_id=thread.id, agent_id=agent.id)
+        print(f"Run status: {run.status}")
+        print(f"Run wait: {run_waiter.history[-1]}")
 
         project_client.agents.delete_agent(agent.id)
         print("Deleted agent")
 
         messages = project_client.agents.list_messages(thread_id=thread.id)
-        print(f"messages: {messages}")
\ No newline at end of file
+        print(f"messages: {messages}")
+
+print(tracing.summary())
+tracing.shutdown()
@@ -1,7 +1,6 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import AgentStreamEvent, MessageDeltaChunk, RunStep, RunStepDeltaChunk, ThreadMessage, ThreadRun, MessageRole, BingGroundingTool, MessageDeltaTextContent, MessageDeltaTextUrlCitationAnnotation
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
@@ -1,13 +1,20 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FileSearchTool, AgentStreamEvent, MessageDeltaChunk, RunStep, RunStepDeltaChunk, ThreadMessage, ThreadRun, MessageRole, BingGroundingTool, MessageDeltaTextContent, MessageDeltaTextUrlCitationAnnotation
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.upload_cache import UploadCache
+
 # Load environment variables
 load_dotenv()
 
@@ -24,14 +31,13 @@ with project_client:
 
     # Upload file and create vector store
     # [START upload_file_create_vector_store_and_agent_with_file_search_tool]
-    file = project_client.agents.upload_file_and_poll(file_path="Section_7/files/product_info_1.md", purpose="assistants")
-    print(f"Uploaded file, file ID: {file.id}")
-
-    vector_store = project_client.agents.create_vector_store_and_poll(file_ids=[file.id], name="my_vectorstore")
-    print(f"Created vector store, vector store ID: {vector_store.id}")
+    # Unchanged files are not uploaded again and the vector store is reused across runs
+    upload_cache = UploadCache(project_client)
+    vector_store_id = upload_cache.vector_store("my_vectorstore", ["Section_7/files/product_info_1.md"])
+    print(f"Vector store ready, vector store ID: {vector_store_id}")
 
     # Create file search tool with resources followed by creating agent
-    file_search = FileSearchTool(vector_store_ids=[vector_store.id])
+    file_search = FileSearchTool(vector_store_ids=[vector_store_id])
 
     agent = project_client.agents.create_agent(
         model=os.environ["MODEL_DEPLOYMENT_NAME"],
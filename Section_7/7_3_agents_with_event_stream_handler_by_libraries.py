@@ -1,13 +1,19 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import AgentEventHandler, MessageDeltaChunk, RunStep, RunStepDeltaChunk, ThreadMessage, ThreadRun, MessageRole, BingGroundingTool, MessageDeltaTextContent, MessageDeltaTextUrlCitationAnnotation
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_profiler import ProfilingEventHandler, RunProfiler
 from typing import Any, Optional
 
 # Load environment variables
@@ -22,7 +28,11 @@ project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(), conn_str=conn_str
 )
 
-class MyEventHandler(AgentEventHandler[str]):
+# Latency breakdown of every streamed run (queue, tools, model, time to first token), optionally appended to a JSONL file
+profiler = RunProfiler(export_path=os.getenv("RUN_PROFILE_PATH"))
+
+
+class MyEventHandler(ProfilingEventHandler[str]):
 
     def on_message_delta(self, delta: "MessageDeltaChunk") -> Optional[str]:
         return f"Text delta received: {delta.text}"
@@ -64,7 +74,7 @@ with project_client:
 
     # [START create_stream]
     with project_client.agents.create_stream(
-        thread_id=thread.id, agent_id=agent.id, event_handler=MyEventHandler()
+        thread_id=thread.id, agent_id=agent.id, event_handler=MyEventHandler(profiler)
     ) as stream:
         for event_type, event_data, func_return in stream:
             print(f"Received data.")
@@ -72,6 +82,9 @@ with project_client:
             print(f"Event Data: {str(event_data)[:100]}...")
             print(f"Event Function return: {func_return}\n")
     # [END create_stream]
+    print(profiler.summary())
+    if os.getenv("RUN_PROFILE_HISTOGRAMS_PATH"):
+        profiler.export_histograms(os.environ["RUN_PROFILE_HISTOGRAMS_PATH"])
 
     project_client.agents.delete_agent(agent.id)
     print("Deleted agent")
@@ -1,13 +1,23 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FunctionTool, ToolSet, AgentEventHandler, BaseAgentEventHandler, AgentStreamEvent, MessageDeltaChunk, RunStep, RunStepDeltaChunk, ThreadMessage, ThreadRun, MessageRole, FileSearchTool, MessageDeltaTextContent, MessageDeltaTextUrlCitationAnnotation
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
 import json
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.parallel_tools import ParallelToolExecutor
+from agent_utils.run_profiler import ProfilingEventHandler, RunProfiler
+from agent_utils.tool_cache import ToolResultCache
+from agent_utils.tool_registry import user_tools
 from typing import Optional, Any
 
 # Load environment variables
@@ -23,8 +33,12 @@ project_client = AIProjectClient.from_connection_string(
 )
 
 # When using FunctionTool with ToolSet in agent creation, the tool call events are handled inside the create_stream
-# method and functions gets automatically called by default.
-class MyEventHandler(AgentEventHandler):
+# method. The ParallelToolExecutor wrapped around the handler runs all calls of a step concurrently, and the
+# profiling base class times the tool calls separately from queueing and generation.
+profiler = RunProfiler(export_path=os.getenv("RUN_PROFILE_PATH"))
+
+
+class MyEventHandler(ProfilingEventHandler):
 
     def on_message_delta(self, delta: "MessageDeltaChunk") -> None:
         print(f"Text delta received: {delta.text}")
@@ -53,10 +67,13 @@ class MyEventHandler(AgentEventHandler):
 
 with project_client:
     # [START create_agent_with_function_tool]
-    functions = FunctionTool(user_functions)
+    functions = user_tools.function_tool()
     toolset = ToolSet()
     toolset.add(functions)
-    project_client.agents.enable_auto_function_calls(toolset=toolset)
+    # Repeated calls to @pure tools (e.g. the same weather lookup) are answered from the cache
+    tool_executor = ParallelToolExecutor(
+        functions, timeouts={"send_email_to_address": 60}, result_cache=ToolResultCache()
+    )
 
     agent = project_client.agents.create_agent(
         model=os.environ["MODEL_DEPLOYMENT_NAME"],
@@ -78,9 +95,14 @@ with project_client:
     print(f"Created message, message ID {message.id}")
 
     with project_client.agents.create_stream(
-        thread_id=thread.id, agent_id=agent.id, event_handler=MyEventHandler()
+        thread_id=thread.id,
+        agent_id=agent.id,
+        event_handler=tool_executor.stream_handler(project_client.agents, MyEventHandler(profiler)),
     ) as stream:
         stream.until_done()
+    print(profiler.summary())
+    if os.getenv("RUN_PROFILE_HISTOGRAMS_PATH"):
+        profiler.export_histograms(os.environ["RUN_PROFILE_HISTOGRAMS_PATH"])
 
     project_client.agents.delete_agent(agent.id)
     print("Deleted agent")
@@ -1,14 +1,19 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FunctionTool, ToolSet, AgentEventHandler, BaseAgentEventHandler, AgentStreamEvent, MessageDeltaChunk, RunStep, RunStepDeltaChunk, ThreadMessage, ThreadRun, MessageRole, FileSearchTool, MessageDeltaTextContent, MessageDeltaTextUrlCitationAnnotation
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
-import json
-from typing import Optional, Any, Generator
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.fast_stream import StreamingTextEventHandler
 
 # Load environment variables
 load_dotenv()
@@ -22,35 +27,11 @@ project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(), conn_str=conn_str
 )
 
-class MyEventHandler(BaseAgentEventHandler[Optional[str]]):
-
-    def _process_event(self, event_data_str: str) -> Optional[str]:  # type: ignore[return]
-        event_lines = event_data_str.strip().split("\n")
-        event_type: Optional[str] = None
-        event_data = ""
-        for line in event_lines:
-            if line.startswith("event:"):
-                event_type = line.split(":", 1)[1].strip()
-            elif line.startswith("data:"):
-                event_data = line.split(":", 1)[1].strip()
-
-        if not event_type:
-            raise ValueError("Event type not specified in the event data.")
-
-        if event_type == AgentStreamEvent.THREAD_MESSAGE_DELTA.value:
-
-            event_obj: MessageDeltaChunk = MessageDeltaChunk(**json.loads(event_data))
-
-            for content_part in event_obj.delta.content:
-                if isinstance(content_part, MessageDeltaTextContent):
-                    if content_part.text is not None:
-                        return content_part.text.value
-        return None
-
-    def get_stream_chunks(self) -> Generator[str, None, None]:
-        for chunk in self:
-            if chunk:
-                yield chunk
+class MyEventHandler(StreamingTextEventHandler):
+    # Parses SSE frames in place and reads each delta's text straight from the frame
+    # bytes; events other than message deltas are skipped without JSON decoding.
+    # See benchmarks/bench_sse_parser.py for the comparison with a json.loads-per-delta handler.
+    pass
 
 
 project_client = AIProjectClient.from_connection_string(
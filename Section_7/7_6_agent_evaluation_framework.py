@@ -1,15 +1,26 @@
 import os
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import FunctionTool, ToolSet, CodeInterpreterTool
-from user_functions import user_functions
 from azure.identity import DefaultAzureCredential
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 import time
 import json
 from typing import Optional, Any, Generator
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.evaluation_cache import EvaluationScoreCache, aggregate_scores, judge_deployment, read_records, score_records
+from agent_utils.evaluation_runner import EvaluationRunner, read_thread_ids
+from agent_utils.evaluation_store import EvaluationStore, format_table, score_rows_from_evaluate
+from agent_utils.heuristic_evaluators import heuristic_evaluators, prescreen, prescreen_summary
+from agent_utils.tool_registry import user_tools
+
 # Load environment variables
 load_dotenv()
 
@@ -27,7 +38,7 @@ project_client = AIProjectClient.from_connection_string(
 with project_client:
     # Initialize agent toolset with user functions and code interpreter
     # [START create_agent_toolset]
-    functions = FunctionTool(user_functions)
+    functions = user_tools.function_tool()
     code_interpreter = CodeInterpreterTool()
 
     toolset = ToolSet()
@@ -87,8 +98,6 @@ with project_client:
     thread_id = thread.id
     run_id = run.id
 
-    converted_data = converter.convert(thread_id, run_id)
-
 
 
     model_config = project_client.connections.get_default(
@@ -106,39 +115,76 @@ with project_client:
     evaluation_data = converter.prepare_evaluation_data(thread_ids=thread_id, filename=filename) 
 
     print(f"Evaluation data saved to {filename}")
-    for evaluator in [IntentResolutionEvaluator, TaskAdherenceEvaluator, ToolCallAccuracyEvaluator]:
-        evaluator = evaluator(model_config)
-        try:
-            result = evaluator(**converted_data)
-            print(json.dumps(result, indent=4)) 
-        except:
-            print("Note: if there is no tool call to evaluate in the run history, ToolCallAccuracyEvaluator will raise an error")
-            pass
-    
-    # Select evaluators of your choice
+
+    # Select evaluators of your choice; they are created once and shared by the runner and evaluate()
     intent_resolution = IntentResolutionEvaluator(model_config=model_config)
     task_adherence = TaskAdherenceEvaluator(model_config=model_config)
     tool_call_accuracy = ToolCallAccuracyEvaluator(model_config=model_config)
-
-    # Batch evaluation API (local)
-    from azure.ai.evaluation import evaluate
-
-    response = evaluate(
-        data=filename,
-        evaluation_name="agent demo - batch run",
-        evaluators={
-            "intent_resolution": intent_resolution,
-            "task_adherence": task_adherence,
-            "tool_call_accuracy": tool_call_accuracy,
-        },
-        # optionally, log your results to your Azure AI Foundry project for rich visualization 
-        azure_ai_project={
-            "subscription_id": os.environ["AZURE_SUBSCRIPTION_ID"],
-            "project_name": os.environ["PROJECT_NAME"],
-            "resource_group_name": os.environ["RESOURCE_GROUP_NAME"],
-        }
+    # The LLM judges run behind local prescreens, which answer without a judge call when the outcome is
+    # certain (no tool calls, malformed or unanswered tool calls, empty final answer). The local
+    # heuristic evaluators (argument schema, call/result pairing, latency, answer length) cost no tokens.
+    evaluators = {
+        **prescreen(
+            {
+                "intent_resolution": intent_resolution,
+                "task_adherence": task_adherence,
+                "tool_call_accuracy": tool_call_accuracy,
+            }
+        ),
+        **heuristic_evaluators(max_latency_seconds=float(os.getenv("EVAL_MAX_LATENCY_SECONDS", "30"))),
+    }
+
+    # Scores are cached by (record hash, evaluator name/version, judge deployment), so reruns only pay
+    # for new or changed records. Clear entries with: python -m agent_utils.evaluation_cache invalidate
+    score_cache = EvaluationScoreCache(judge=judge_deployment(model_config))
+
+    # Score threads concurrently and append the results to a JSONL file as they finish. Set
+    # EVAL_THREAD_IDS_FILE to a file of thread IDs (one per line) to evaluate many threads; rerunning
+    # after a crash skips the records already in EVAL_SCORES_PATH. Evaluator errors (e.g.
+    # ToolCallAccuracyEvaluator on a run without tool calls) are recorded in the row, not raised.
+    thread_ids_file = os.getenv("EVAL_THREAD_IDS_FILE")
+    runner = EvaluationRunner(
+        converter,
+        evaluators,
+        output_path=os.getenv("EVAL_SCORES_PATH", "evaluation_scores.jsonl"),
+        max_workers=int(os.getenv("EVAL_MAX_WORKERS", "16")),
+        score_cache=score_cache,
     )
-    # Inspect the average scores at a high-level
-    print(response["metrics"])
-    # Use the URL to inspect the results on the UI
-    print(f'AI Foundary URL: {response.get("studio_url")}')
\ No newline at end of file
+    report = runner.run(read_thread_ids(thread_ids_file) if thread_ids_file else [(thread_id, run_id)])
+    print(report)
+
+    # Score every line of the evaluation file: unchanged records come from the cache, and the
+    # aggregate metrics are recomputed from cached and fresh rows alike
+    rows = score_records(read_records(filename), evaluators, cache=score_cache)
+    print(json.dumps(aggregate_scores(rows), indent=4))
+    print(f"Scores from cache: {score_cache.stats.hits}, newly scored: {score_cache.stats.misses}")
+    print(prescreen_summary(evaluators))
+
+    # Keep the per-record scores in the columnar results store, so evaluation runs can be summarised,
+    # sliced by tool and compared later, e.g.
+    #   python -m agent_utils.evaluation_store diff <baseline> <candidate> --by evaluator,tool
+    results_store = EvaluationStore()
+    eval_run = os.getenv("EVAL_RUN_NAME", time.strftime("%Y%m%dT%H%M%S"))
+    results_store.write(rows, eval_run, agent_id=agent.id)
+    print(format_table(results_store.summary(eval_run)))
+
+    # Batch evaluation API, which re-scores every record; only needed to log the results to your
+    # Azure AI Foundry project for rich visualization
+    if os.getenv("EVAL_LOG_TO_FOUNDRY"):
+        from azure.ai.evaluation import evaluate
+
+        response = evaluate(
+            data=filename,
+            evaluation_name="agent demo - batch run",
+            evaluators=evaluators,
+            azure_ai_project={
+                "subscription_id": os.environ["AZURE_SUBSCRIPTION_ID"],
+                "project_name": os.environ["PROJECT_NAME"],
+                "resource_group_name": os.environ["RESOURCE_GROUP_NAME"],
+            }
+        )
+        # Inspect the average scores at a high-level
+        print(response["metrics"])
+        results_store.write(score_rows_from_evaluate(response), f"{eval_run}-foundry", agent_id=agent.id)
+        # Use the URL to inspect the results on the UI
+        print(f'AI Foundary URL: {response.get("studio_url")}')
\ No newline at end of file
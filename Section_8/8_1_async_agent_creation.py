@@ -1,7 +1,7 @@
 
 #pip install aiohttp
 import asyncio
-import time
+import sys
 
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
@@ -11,6 +11,15 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_waiter import RunWaiter
+
+run_waiter = RunWaiter()
+
 async def main() -> None:
     async with DefaultAzureCredential() as creds:
         project_client = AIProjectClient.from_connection_string(
@@ -31,13 +40,9 @@ async def main() -> None:
             )
             print(f"Created message, message ID: {message.id}")
 
-            run = await project_client.agents.create_run(thread_id=thread.id, agent_id=agent.id)
-
-            # Poll the run as long as run status is queued or in progress
-            while run.status in ["queued", "in_progress", "requires_action"]:
-                run = await project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
-
-                print(f"Run status: {run.status}")
+            # Streams the run when possible, otherwise polls with backoff without blocking the event loop
+            run = await run_waiter.create_and_wait_async(project_client.agents, thread_id=thread.id, agent_id=agent.id)
+            print(f"Run wait: {run_waiter.history[-1]}")
 
             print(f"Run completed with status: {run.status}")
 
@@ -1,9 +1,17 @@
-import os, asyncio
+import os, sys, asyncio
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.models import AsyncFunctionTool, AsyncToolSet
-from user_async_function import user_async_functions
 from dotenv import load_dotenv
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.async_tools import AsyncToolAdapter, ToolLimits
+from agent_utils.tool_registry import async_user_tools
+
 load_dotenv()
 
 async def main() -> None:
@@ -16,47 +24,57 @@ async def main() -> None:
 
             # Initialize agent toolset with user functions and code interpreter
             # [START create_agent_with_async_function_tool]
-            functions = AsyncFunctionTool(user_async_functions)
-
-            toolset = AsyncToolSet()
-            toolset.add(functions)
-            project_client.agents.enable_auto_function_calls(toolset=toolset)
-
-            agent = await project_client.agents.create_agent(
-                model=os.environ["MODEL_DEPLOYMENT_NAME"],
-                name="my-assistant",
-                instructions="You are a helpful assistant",
-                toolset=toolset,
-            )
-            # [END create_agent_with_async_function_tool]
-            print(f"Created agent, ID: {agent.id}")
-
-            # Create thread for communication
-            thread = await project_client.agents.create_thread()
-            print(f"Created thread, ID: {thread.id}")
-
-            # Create message to thread
-            message = await project_client.agents.create_message(
-                thread_id=thread.id,
-                role="user",
-                content="Hello, send an email with the datetime and weather information in New York?",
-            )
-            print(f"Created message, ID: {message.id}")
-
-            # Create and process agent run in thread with tools
-            run = await project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
-            print(f"Run finished with status: {run.status}")
-
-            if run.status == "failed":
-                print(f"Run failed: {run.last_error}")
-
-            # Delete the assistant when done
-            await project_client.agents.delete_agent(agent.id)
-            print("Deleted agent")
-
-            # Fetch and log all messages
-            messages = await project_client.agents.list_messages(thread_id=thread.id)
-            print(f"Messages: {messages}")
+            # Sync tools run on a bounded thread pool instead of the event loop, and email sends
+            # are limited to 2 at a time and 10 per minute. The pool is shut down on the way out,
+            # even if the run fails
+            with AsyncToolAdapter(
+                max_workers=8,
+                limits={"send_email_async": ToolLimits(max_concurrency=2, calls=10, per_seconds=60)},
+            ) as tool_adapter:
+                functions = tool_adapter.function_tool(async_user_tools.async_function_tool())
+
+                toolset = AsyncToolSet()
+                toolset.add(functions)
+                project_client.agents.enable_auto_function_calls(toolset=toolset)
+
+                agent = await project_client.agents.create_agent(
+                    model=os.environ["MODEL_DEPLOYMENT_NAME"],
+                    name="my-assistant",
+                    instructions="You are a helpful assistant",
+                    toolset=toolset,
+                )
+                # [END create_agent_with_async_function_tool]
+                print(f"Created agent, ID: {agent.id}")
+
+                # Create thread for communication
+                thread = await project_client.agents.create_thread()
+                print(f"Created thread, ID: {thread.id}")
+
+                # Create message to thread
+                message = await project_client.agents.create_message(
+                    thread_id=thread.id,
+                    role="user",
+                    content="Hello, send an email with the datetime and weather information in New York?",
+                )
+                print(f"Created message, ID: {message.id}")
+
+                # Create and process agent run in thread with tools
+                run = await project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
+                print(f"Run finished with status: {run.status}")
+
+                if run.status == "failed":
+                    print(f"Run failed: {run.last_error}")
+
+                # Queueing delay shows when a tool's limits, not the tool itself, slowed the run down
+                print(tool_adapter.summary())
+
+                # Delete the assistant when done
+                await project_client.agents.delete_agent(agent.id)
+                print("Deleted agent")
+
+                # Fetch and log all messages
+                messages = await project_client.agents.list_messages(thread_id=thread.id)
+                print(f"Messages: {messages}")
 
 
 if __name__ == "__main__":
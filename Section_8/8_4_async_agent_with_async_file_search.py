@@ -1,30 +1,31 @@
-import os, asyncio
+import os, sys, asyncio
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.models import AsyncFunctionTool, AsyncToolSet, FilePurpose, FileSearchTool
-from user_async_function import user_async_functions
 from dotenv import load_dotenv
 load_dotenv()
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.upload_cache import AsyncUploadCache
+
 async def main():
     async with DefaultAzureCredential() as credential:
         async with AIProjectClient.from_connection_string(
             credential=credential, conn_str=os.environ["PROJECT_CONNECTION_STRING"]
         ) as project_client:
-            # Upload a file and wait for it to be processed
-            file = await project_client.agents.upload_file_and_poll(
-                file_path="Section_8/files/product_info_1.md", purpose=FilePurpose.AGENTS
-            )
-            print(f"Uploaded file, file ID: {file.id}")
-
-            # Create a vector store with no file and wait for it to be processed
-            vector_store = await project_client.agents.create_vector_store_and_poll(
-                file_ids=[file.id], name="sample_vector_store"
+            # Upload the file and build the vector store only when the file content changed
+            upload_cache = AsyncUploadCache(project_client)
+            vector_store_id = await upload_cache.vector_store(
+                "sample_vector_store", ["Section_8/files/product_info_1.md"], purpose=FilePurpose.AGENTS
             )
-            print(f"Created vector store, vector store ID: {vector_store.id}")
+            print(f"Vector store ready, vector store ID: {vector_store_id}")
 
             # Create a file search tool
-            file_search_tool = FileSearchTool(vector_store_ids=[vector_store.id])
+            file_search_tool = FileSearchTool(vector_store_ids=[vector_store_id])
 
             # Notices that FileSearchTool as tool and tool_resources must be added or the assistant unable to search the file
             agent = await project_client.agents.create_agent(
@@ -47,8 +48,7 @@ async def main():
             run = await project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
             print(f"Created run, run ID: {run.id}")
 
-            await project_client.agents.delete_vector_store(vector_store.id)
-            print("Deleted vector store")
+            # The vector store is kept so the next run can reuse it
 
             await project_client.agents.delete_agent(agent.id)
             print("Deleted agent")
@@ -1,12 +1,24 @@
-import os, asyncio
+import os, sys, asyncio
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.models import AsyncAgentEventHandler, MessageDeltaChunk, ThreadRun, ThreadMessage, RunStep
 from typing import Any, Optional
 from dotenv import load_dotenv
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_profiler import AsyncProfilingEventHandler, RunProfiler
+
 load_dotenv()
 
-class MyEventHandler(AsyncAgentEventHandler[str]):
+# Latency breakdown of every streamed run (queue, tools, model, time to first token), optionally appended to a JSONL file
+profiler = RunProfiler(export_path=os.getenv("RUN_PROFILE_PATH"))
+
+
+class MyEventHandler(AsyncProfilingEventHandler[str]):
 
     async def on_message_delta(self, delta: "MessageDeltaChunk") -> Optional[str]:
         return f"Text delta received: {delta.text}"
@@ -50,13 +62,16 @@ async def main() -> None:
             print(f"Created message, message ID {message.id}")
 
             async with await project_client.agents.create_stream(
-                thread_id=thread.id, agent_id=agent.id, event_handler=MyEventHandler()
+                thread_id=thread.id, agent_id=agent.id, event_handler=MyEventHandler(profiler)
             ) as stream:
                 async for event_type, event_data, func_return in stream:
                     print(f"Received data.")
                     print(f"Streaming receive Event Type: {event_type}")
                     print(f"Event Data: {str(event_data)[:100]}...")
                     print(f"Event Function return: {func_return}\n")
+            print(profiler.summary())
+            if os.getenv("RUN_PROFILE_HISTOGRAMS_PATH"):
+                profiler.export_histograms(os.environ["RUN_PROFILE_HISTOGRAMS_PATH"])
 
             await project_client.agents.delete_agent(agent.id)
             print("Deleted agent")
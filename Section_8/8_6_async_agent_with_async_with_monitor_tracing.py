@@ -1,16 +1,24 @@
-import os, asyncio
+import os, sys, asyncio
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.models import AsyncAgentEventHandler, MessageDeltaChunk, ThreadRun, ThreadMessage, RunStep
 from opentelemetry import trace
 from dotenv import load_dotenv
-import time
 load_dotenv()
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.run_waiter import RunWaiter
+from agent_utils.tracing import TracingProfile, configure_tracing, enable_sdk_instrumentation
+
 from azure.monitor.opentelemetry import configure_azure_monitor
 
 scenario = os.path.basename(__file__)
 tracer = trace.get_tracer(__name__)
+run_waiter = RunWaiter()
 
 async def main() -> None:
 
@@ -25,10 +33,15 @@ async def main() -> None:
             print("Application Insights was not enabled for this project.")
             print("Enable it via the 'Tracing' tab in your AI Foundry project page.")
             exit()
-        configure_azure_monitor(connection_string=application_insights_connection_string)
+        # TRACING_PROFILE=low_overhead samples runs and skips argument capture; export runs on a
+        # background thread, so it never blocks the event loop
+        tracing_profile = TracingProfile.from_env()
+        tracing = configure_tracing(tracing_profile, connection_string=application_insights_connection_string)
+        # configure_tracing only exports traces; keep Azure Monitor's log and metric exporters for the rest
+        configure_azure_monitor(connection_string=application_insights_connection_string, disable_tracing=True)
 
-        # enable additional instrumentations
-        project_client.telemetry.enable()
+        # enable additional instrumentations; message contents are recorded only if the profile captures arguments
+        enable_sdk_instrumentation(project_client, tracing_profile)
 
         with tracer.start_as_current_span(scenario):
             async with project_client:
@@ -47,15 +60,11 @@ async def main() -> None:
                 )
                 print(f"Created message, message ID: {message.id}")
 
-                run = await project_client.agents.create_run(thread_id=thread.id, agent_id=agent.id)
-
-                # Poll the run as long as run status is queued or in progress
-                while run.status in ["queued", "in_progress", "requires_action"]:
-                    # Wait for a second
-                    time.sleep(1)
-                    run = await project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
-
-                    print(f"Run status: {run.status}")
+                # Streams the run when possible, otherwise polls with backoff without blocking the event loop
+                run = await run_waiter.create_and_wait_async(
+                    project_client.agents, thread_id=thread.id, agent_id=agent.id
+                )
+                print(f"Run wait: {run_waiter.history[-1]}")
 
                 print(f"Run completed with status: {run.status}")
 
@@ -65,6 +74,10 @@ async def main() -> None:
                 messages = await project_client.agents.list_messages(thread_id=thread.id)
                 print(f"Messages: {messages}")
 
+        print(tracing.summary())
+        # Flushing the last batch is a blocking export, so keep it off the event loop
+        await asyncio.to_thread(tracing.shutdown)
+
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
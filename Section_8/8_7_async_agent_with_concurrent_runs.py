@@ -0,0 +1,50 @@
+import os, sys, asyncio
+from azure.ai.projects.aio import AIProjectClient
+from azure.identity.aio import DefaultAzureCredential
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.async_runs import AsyncRunExecutor
+
+questions = [
+    "Hello, tell me a joke",
+    "Tell me a fun fact about horses",
+    "What is the capital of France?",
+    "Explain Euler's Identity in one sentence",
+    "Give me a haiku about the ocean",
+]
+
+async def main() -> None:
+
+    async with DefaultAzureCredential() as creds:
+        async with AIProjectClient.from_connection_string(
+            credential=creds, conn_str=os.environ["PROJECT_CONNECTION_STRING"]
+        ) as project_client:
+            agent = await project_client.agents.create_agent(
+                model=os.environ["MODEL_DEPLOYMENT_NAME"], name="my-assistant", instructions="You are helpful assistant"
+            )
+            print(f"Created agent, agent ID: {agent.id}")
+
+            # Every question gets its own thread and run; all of them are awaited
+            # concurrently from this one event loop
+            executor = AsyncRunExecutor(project_client, agent.id, max_concurrency=50)
+            try:
+                outcomes = await executor.run_many(questions)
+            finally:
+                await project_client.agents.delete_agent(agent.id)
+                print("Deleted agent")
+
+            for outcome in outcomes:
+                print(f"[{outcome.status}] {outcome.content} ({outcome.elapsed:.1f}s)")
+                print(f"  {outcome.reply or outcome.error}")
+
+            print(f"Run wait summary: {executor.run_waiter.summary()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -31,6 +31,17 @@ from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
+from agent_pool import AgentPool
+from dag_team import DagNode, DagTeam
+from team_termination import (
+    DeadlineTermination,
+    NoveltyTermination,
+    SpecialistsReportedTermination,
+    TerminationTelemetry,
+)
+from tool_progress import ToolProgress, stream_answer
+from usage_ledger import BudgetTermination, UsageBudget, UsageLedger
+
 #pip install azure-identity
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
@@ -57,9 +68,25 @@ project_client = AIProjectClient.from_connection_string(
 )
 
 
+# Sub-agents are created once and reused across tool calls instead of being
+# created and deleted around every question
+agent_pool = AgentPool(project_client, idle_timeout=float(os.getenv("AGENT_POOL_IDLE_TIMEOUT", "300")))
+
+# Tokens of every team turn and sub-agent run; USAGE_MAX_* variables set a budget
+# that stops the team early, USAGE_LEDGER_PATH appends every entry to a JSONL file
+usage_ledger = UsageLedger(UsageBudget.from_env(), export_path=os.getenv("USAGE_LEDGER_PATH"))
+
+# Which termination condition stopped the team; TERMINATION_TELEMETRY_PATH appends it to a JSONL file
+termination_telemetry = TerminationTelemetry(export_path=os.getenv("TERMINATION_TELEMETRY_PATH"))
+
+# Sub-agent answers, streamed into the team output while the tools run
+tool_progress = ToolProgress()
+
+
 async def web_ai_agent(query: str) -> str:
+    usage_ledger.check()
     # with project_client:
-    agent = project_client.agents.create_agent(
+    with agent_pool.lease(
             model=os.getenv("MODEL_DEPLOYMENT_NAME"),
             name="my-assistant",
             instructions="""        
@@ -67,54 +94,50 @@ async def web_ai_agent(query: str) -> str:
                 Once you have the results, you never do calculations based on them.
             """,
             headers={"x-ms-enable-preview": "true"}
+        ) as agent:
+        print(f"Leased agent, ID: {agent.id}")
+
+        # Create thread for communication
+        thread = project_client.agents.create_thread()
+        print(f"Created thread, ID: {thread.id}")
+
+        # Create message to thread
+        message = project_client.agents.create_message(
+                thread_id=thread.id,
+                role="user",
+                content=query,
         )
-    print(f"Created agent, ID: {agent.id}")
-
-    # Create thread for communication
-    thread = project_client.agents.create_thread()
-    print(f"Created thread, ID: {thread.id}")
-
-    # Create message to thread
-    message = project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=query,
-    )
-    print(f"SMS: {message}")
-        # Create and process agent run in thread with tools
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    print(f"Run finished with status: {run.status}")
+        print(f"SMS: {message}")
+            # Create and process agent run in thread with tools, streaming the answer to the team output
+        answer, run = await asyncio.to_thread(
+            stream_answer, project_client.agents, thread.id, agent.id, "web_ai_agent", tool_progress
+        )
+        print(f"Run finished with status: {run.status if run else None}")
+        usage_ledger.record_run("web_ai_agent", run)
 
-    if run.status == "failed":
+    if run is not None and run.status == "failed":
         print(f"Run failed: {run.last_error}")
 
-        # Delete the assistant when done
-    project_client.agents.delete_agent(agent.id)
-    print("Deleted agent")
-
-        # Fetch and log all messages
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-    print("Messages:"+ messages["data"][0]["content"][0]["text"]["value"])
-
         # project_client.close()
 
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return answer
 
 
 async def save_blog_agent(blog_content: str) -> str:
+    usage_ledger.check()
 
-    agent = project_client.agents.create_agent(
+    with agent_pool.lease(
             model=os.getenv("MODEL_DEPLOYMENT_NAME"),
             name="my-agent",
             instructions="You are helpful agent",
-    )
+    ) as agent:
 
-    thread = project_client.agents.create_thread()
+        thread = project_client.agents.create_thread()
 
-    message = project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content="""
+        message = project_client.agents.create_message(
+                thread_id=thread.id,
+                role="user",
+                content="""
         
                     You are my Python programming assistant. Generate code,save """+ blog_content +
                     
@@ -125,20 +148,19 @@ async def save_blog_agent(blog_content: str) -> str:
 
                     2. give me the download this file link
                 """,
-    )
-    # create and execute a run
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    print(f"Run finished with status: {run.status}")
+        )
+        # create and execute a run
+        answer, run = await asyncio.to_thread(
+            stream_answer, project_client.agents, thread.id, agent.id, "save_blog_agent", tool_progress
+        )
+        print(f"Run finished with status: {run.status if run else None}")
+        usage_ledger.record_run("save_blog_agent", run)
 
-    if run.status == "failed":
+    if run is not None and run.status == "failed":
             # Check if you got "Rate limit is exceeded.", then you want to get more quota
         print(f"Run failed: {run.last_error}")
 
-    messages = project_client.agents.get_messages(thread_id=thread.id)
-    print(f"Messages: {messages}")
-        
-    project_client.agents.delete_agent(agent.id)
-    print("Deleted agent")
+    print(f"Messages: {answer}")
 
     return "Saved"
 
@@ -163,21 +185,48 @@ async def main():
         system_message="""You are a blog writer, please help me write a blog based on bing search content."""
     )
 
-    termination = TextMentionTermination("Saved") | MaxMessageTermination(10)
-
-    reflection_team = RoundRobinGroupChat(
-        [summary_search_agent, write_agent, save_blog_content_agent],
-        termination_condition=termination
+    # Besides "Saved" and the message cap, stop once all three agents have reported
+    # or at the deadline. Every agent reports once per round, so only the save agent
+    # is scored for novelty and a single stale reply (one that only repeats the blog)
+    # is enough to flag it in the termination telemetry
+    termination = termination_telemetry.monitor(
+        TextMentionTermination("Saved")
+        | MaxMessageTermination(10)
+        | BudgetTermination(usage_ledger)
+        | SpecialistsReportedTermination(["summary_search_agent", "write_agent", "save_blog_content_agent"])
+        | NoveltyTermination(sources=["save_blog_content_agent"], patience=1)
+        | DeadlineTermination(float(os.getenv("TEAM_DEADLINE_SECONDS", "300")))
     )
 
-    # ✅ Await the run_stream
-    async for output in reflection_team.run_stream(task="""
-        I am writing a blog about machine learning. Write a Hindi blog based on the search results and save it.
-        1. What is Machine Learning?
-        2. The difference between AI and ML
-        3. The history of Machine Learning
-    """):
-        print(output)
+    # TEAM_ORCHESTRATION=dag runs search -> write -> save as a DagTeam: each agent runs
+    # once, as soon as the agent before it has replied, and sees only the task and that reply
+    if os.getenv("TEAM_ORCHESTRATION", "round_robin") == "dag":
+        reflection_team = DagTeam(
+            [
+                DagNode(summary_search_agent),
+                DagNode(write_agent, inputs=["summary_search_agent"]),
+                DagNode(save_blog_content_agent, inputs=["write_agent"]),
+            ],
+            termination_condition=termination,
+        )
+    else:
+        reflection_team = RoundRobinGroupChat(
+            [summary_search_agent, write_agent, save_blog_content_agent],
+            termination_condition=termination
+        )
+
+    # ✅ Await the run_stream; the pooled agents are deleted once the team is done
+    with agent_pool, usage_ledger.task("ml_blog") as usage:
+        async for output in tool_progress.merge(reflection_team.run_stream(task="""
+            I am writing a blog about machine learning. Write a Hindi blog based on the search results and save it.
+            1. What is Machine Learning?
+            2. The difference between AI and ML
+            3. The history of Machine Learning
+        """)):
+            print(output)
+    print(f"Agent pool: {agent_pool.stats}")
+    print(usage.summary())
+    print(termination_telemetry.summary())
 
 # ✅ Use asyncio to run
 if __name__ == "__main__":
@@ -10,6 +10,10 @@ DESCRIPTION:
 USAGE:
     python sample_agents_agent_team.py
 
+    To screen many tickers at once and stream the decisions to a JSONL file:
+
+    python sample_agents_agent_team.py --tickers-file tickers.txt --output decisions.jsonl --max-concurrency 8
+
     Before running the sample:
 
     pip install azure-ai-projects azure-identity
@@ -20,10 +24,15 @@ USAGE:
 """
 
 import os
+import sys
+import argparse
 import asyncio
+from typing import Union
 from azure.ai.projects import AIProjectClient
+from azure.ai.projects.aio import AIProjectClient as AsyncAIProjectClient
 from azure.ai.projects.models import AsyncFunctionTool, CodeInterpreterTool, AsyncToolSet
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -33,6 +42,25 @@ from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_pool import AsyncAgentPool
+from batch_runner import JsonlSink, load_tickers, run_batch
+from dag_team import DagNode, DagTeam
+from research_cache import ResearchCache
+from research_fanout import ResearchFanout
+from team_termination import (
+    DeadlineTermination,
+    NoveltyTermination,
+    SpecialistsReportedTermination,
+    TerminationTelemetry,
+)
+from tool_progress import ToolProgress
+from usage_ledger import BudgetTermination, UsageBudget, UsageLedger
+
 
 #pip install azure-identity
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
@@ -68,38 +96,72 @@ conn_id = bing_connection.id
 ###############################################################################
 #                               BING QUERY TOOLS
 ###############################################################################
+#
+# The five research lookups run concurrently on the async AIProjectClient.
+# The first tool call for a ticker starts the whole fan-out, and every tool
+# then reads its answer from the same merged research bundle, so the team
+# waits for the slowest lookup instead of the sum of all five.
+#
+###############################################################################
+async_project_client = AsyncAIProjectClient.from_connection_string(
+    credential=AsyncDefaultAzureCredential(),
+    conn_str=PROJECT_CONNECTION_STRING,
+)
+
+# Research sub-agents are created once and reused for every lookup and ticker
+agent_pool = AsyncAgentPool(
+    async_project_client,
+    idle_timeout=float(os.getenv("AGENT_POOL_IDLE_TIMEOUT", "300")),
+)
+
+# Research results are reused until they go stale: prices quickly, analyst
+# reports and expert opinions much more slowly. Set RESEARCH_CACHE_DB to keep
+# the cache warm across restarts.
+research_cache = ResearchCache(
+    max_entries=int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "1024")),
+    ttls={
+        "stock_price_trends_tool": 5 * 60,
+        "news_analysis_tool": 15 * 60,
+        "market_sentiment_tool": 30 * 60,
+        "analyst_reports_tool": 6 * 60 * 60,
+        "expert_opinions_tool": 6 * 60 * 60,
+    },
+    db_path=os.getenv("RESEARCH_CACHE_DB"),
+)
+
+# Tokens of every team turn and research run are charged to the ticker being
+# analysed. Set USAGE_MAX_TOTAL_TOKENS (or the other USAGE_MAX_* variables) to
+# stop a team early once a decision has cost too much, and USAGE_LEDGER_PATH to
+# append every ledger entry to a JSONL file.
+usage_ledger = UsageLedger(UsageBudget.from_env(), export_path=os.getenv("USAGE_LEDGER_PATH"))
+
+# Which termination condition stopped each team run; TERMINATION_TELEMETRY_PATH
+# appends one record per run to a JSONL file
+termination_telemetry = TerminationTelemetry(export_path=os.getenv("TERMINATION_TELEMETRY_PATH"))
+
+# Research answers are streamed into the team console while the lookups run;
+# in batch mode nothing is merged and the channel stays silent
+tool_progress = ToolProgress()
+
+research_fanout = ResearchFanout(
+    async_project_client,
+    model="gpt-4o",
+    agent_pool=agent_pool,
+    cache=research_cache,
+    usage_ledger=usage_ledger,
+    progress=tool_progress,
+    max_concurrency=int(os.getenv("RESEARCH_MAX_CONCURRENCY", "5")),
+    tool_timeout=float(os.getenv("RESEARCH_TOOL_TIMEOUT", "60")),
+)
+
+
 async def stock_price_trends_tool(stock_name: str) -> str:
     """
     A dedicated Bing call focusing on real-time stock prices,
     changes over the last few months for 'stock_name'.
     """
     print(f"[stock_price_trends_tool] Fetching stock price trends for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="stock_price_trends_tool_agent",
-        instructions=(
-            f"Focus on retrieving real-time stock prices, changes over the last few months, "
-            f"and summarize market trends for {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    # Create a new thread and send the user query
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=f"Please get stock price trends data for {stock_name}."
-    )
-    # Process the run
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    # Return the Bing result
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await research_fanout.lookup("stock_price_trends_tool", stock_name)
 
 
 async def news_analysis_tool(stock_name: str) -> str:
@@ -107,26 +169,7 @@ async def news_analysis_tool(stock_name: str) -> str:
     A dedicated Bing call focusing on the latest news for 'stock_name'.
     """
     print(f"[news_analysis_tool] Fetching news for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="news_analysis_tool_agent",
-        instructions=f"Focus on the latest news highlights for the stock {stock_name}.",
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=f"Retrieve the latest news articles and summaries about {stock_name}."
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await research_fanout.lookup("news_analysis_tool", stock_name)
 
 
 async def market_sentiment_tool(stock_name: str) -> str:
@@ -135,30 +178,7 @@ async def market_sentiment_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[market_sentiment_tool] Fetching sentiment for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="market_sentiment_tool_agent",
-        instructions=(
-            f"Focus on analyzing general market sentiment regarding {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(
-            f"Gather market sentiment, user opinions, and overall feeling about {stock_name}."
-        )
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await research_fanout.lookup("market_sentiment_tool", stock_name)
 
 
 async def analyst_reports_tool(stock_name: str) -> str:
@@ -167,28 +187,7 @@ async def analyst_reports_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[analyst_reports_tool] Fetching analyst reports for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="analyst_reports_tool_agent",
-        instructions=(
-            f"Focus on any relevant analyst reports or professional analyses about {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(f"Find recent analyst reports, price targets, or professional opinions on {stock_name}.")
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await research_fanout.lookup("analyst_reports_tool", stock_name)
 
 
 async def expert_opinions_tool(stock_name: str) -> str:
@@ -197,28 +196,15 @@ async def expert_opinions_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[expert_opinions_tool] Fetching expert opinions for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="expert_opinions_tool_agent",
-        instructions=(
-            f"Focus on industry expert or thought leader opinions regarding {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(f"Collect expert opinions or quotes about {stock_name}.")
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
+    return await research_fanout.lookup("expert_opinions_tool", stock_name)
 
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
 
-    return messages["data"][0]["content"][0]["text"]["value"]
+async def research_bundle_tool(stock_name: str) -> str:
+    """
+    Returns every research lookup for 'stock_name' merged into one bundle.
+    """
+    bundle = await research_fanout.research(stock_name)
+    return bundle.to_text()
 
 
 ###############################################################################
@@ -257,6 +243,11 @@ async def expert_opinions_agent(stock_name: str) -> str:
     """Agent function for 'expert opinions', calls expert_opinions_tool."""
     return await expert_opinions_tool(stock_name)
 
+# -- Research Bundle
+async def investment_decision_agent(stock_name: str) -> str:
+    """Agent function for the merged research bundle, calls research_bundle_tool."""
+    return await research_bundle_tool(stock_name)
+
 
 ###############################################################################
 #                         ASSISTANT AGENT DEFINITIONS
@@ -266,87 +257,221 @@ async def expert_opinions_agent(stock_name: str) -> str:
 # clarifies each agent’s role, and the 'tools=[...]' argument lists the Python
 # functions that agent can call.
 #
+# Agents and termination conditions keep per-conversation state, so every team
+# run (one per ticker in batch mode) gets its own instances from the factory
+# below. They all share the one model client and project client.
+#
+# By default the agents take turns in a RoundRobinGroupChat and every agent sees
+# the whole conversation. The three research agents do not depend on each other,
+# so with TEAM_ORCHESTRATION=dag they run concurrently in a DagTeam instead and the
+# decision agent starts once all three have reported, seeing only the task and
+# their reports.
+#
 ###############################################################################
-stock_trends_agent_assistant = AssistantAgent(
-    name="stock_trends_agent",
-    model_client=az_model_client,
-    tools=[stock_price_trends_agent],
-    system_message=(
-        "You are the Stock Price Trends Agent. "
-        "You fetch and summarize stock prices, changes over the last few months, and general market trends. "
-        "Do NOT provide any final investment decision."
+TEAM_ORCHESTRATION = os.getenv("TEAM_ORCHESTRATION", "round_robin")
+
+
+def build_investment_team(orchestration: str = TEAM_ORCHESTRATION) -> Union[DagTeam, RoundRobinGroupChat]:
+    """
+    Builds a fresh investment team with its own agents and termination state.
+
+    :param orchestration: "round_robin", or "dag" to run the research agents concurrently.
+    """
+    stock_trends_agent_assistant = AssistantAgent(
+        name="stock_trends_agent",
+        model_client=az_model_client,
+        tools=[stock_price_trends_agent],
+        system_message=(
+            "You are the Stock Price Trends Agent. "
+            "You fetch and summarize stock prices, changes over the last few months, and general market trends. "
+            "Do NOT provide any final investment decision."
+        )
     )
-)
 
-news_agent_assistant = AssistantAgent(
-    name="news_agent",
-    model_client=az_model_client,
-    tools=[news_analysis_agent],
-    system_message=(
-        "You are the News Agent. "
-        "You retrieve and summarize the latest news stories related to the given stock. "
-        "Do NOT provide any final investment decision."
+    news_agent_assistant = AssistantAgent(
+        name="news_agent",
+        model_client=az_model_client,
+        tools=[news_analysis_agent],
+        system_message=(
+            "You are the News Agent. "
+            "You retrieve and summarize the latest news stories related to the given stock. "
+            "Do NOT provide any final investment decision."
+        )
     )
-)
 
-sentiment_agent_assistant = AssistantAgent(
-    name="sentiment_agent",
-    model_client=az_model_client,
-    tools=[
-        market_sentiment_agent,
-        analyst_reports_agent,
-        expert_opinions_agent
-    ],
-    system_message=(
-        "You are the Market Sentiment Agent. "
-        "You gather overall market sentiment, relevant analyst reports, and expert opinions. "
-        "Do NOT provide any final investment decision."
+    sentiment_agent_assistant = AssistantAgent(
+        name="sentiment_agent",
+        model_client=az_model_client,
+        tools=[
+            market_sentiment_agent,
+            analyst_reports_agent,
+            expert_opinions_agent
+        ],
+        system_message=(
+            "You are the Market Sentiment Agent. "
+            "You gather overall market sentiment, relevant analyst reports, and expert opinions. "
+            "Do NOT provide any final investment decision."
+        )
     )
-)
 
-decision_agent_assistant = AssistantAgent(
-    name="decision_agent",
-    model_client=az_model_client,
-    # The final agent typically calls the 'investment_decision_agent' to
-    # synthesize all the data. If you want it to call the other tools directly,
-    # you can also add them here. But typically we rely on the round-robin approach.
-    # tools=[investment_decision_agent],
-    system_message=(
-        "You are the Decision Agent. After reviewing the stock data, news, sentiment, analyst reports, "
-        "and expert opinions from the other agents, you provide the final investment decision. In the final decision make a call to either Invest or Not. Also providethe current stock price. "
-        "End your response with 'Decision Made' once you finalize the decision."
+    decision_agent_assistant = AssistantAgent(
+        name="decision_agent",
+        model_client=az_model_client,
+        # The final agent calls the 'investment_decision_agent' to read the merged
+        # research bundle. It is already fetched by the time the decision agent runs,
+        # so this costs no extra lookups.
+        tools=[investment_decision_agent],
+        system_message=(
+            "You are the Decision Agent. After reviewing the stock data, news, sentiment, analyst reports, "
+            "and expert opinions from the other agents, you provide the final investment decision. In the final decision make a call to either Invest or Not. Also providethe current stock price. "
+            "End your response with 'Decision Made' once you finalize the decision."
+        )
+    )
+
+    ###########################################################################
+    #                    TERMINATION & TEAM CONFIGURATION
+    ###########################################################################
+    # Stop once "Decision Made" is in the response, if 15 messages have passed,
+    # or once the ticker has spent its usage budget. Rather than going round the
+    # table again, also stop once every agent has reported, or at the deadline.
+    # Every agent reports once per round, so only the decision agent is scored for
+    # novelty and a single stale decision (one that only restates the research
+    # reports) is enough to flag it in the termination telemetry.
+    text_termination = TextMentionTermination("Decision Made")
+    max_message_termination = MaxMessageTermination(15)
+    termination = termination_telemetry.monitor(
+        text_termination
+        | max_message_termination
+        | BudgetTermination(usage_ledger)
+        | SpecialistsReportedTermination(
+            ["stock_trends_agent", "news_agent", "sentiment_agent", "decision_agent"]
+        )
+        | NoveltyTermination(sources=["decision_agent"], patience=1)
+        | DeadlineTermination(float(os.getenv("TEAM_DEADLINE_SECONDS", "300")))
+    )
+
+    if orchestration == "dag":
+        # Research agents run side by side; the decision agent reads their reports
+        return DagTeam(
+            [
+                DagNode(stock_trends_agent_assistant),
+                DagNode(news_agent_assistant),
+                DagNode(sentiment_agent_assistant),
+                DagNode(
+                    decision_agent_assistant,
+                    inputs=["stock_trends_agent", "news_agent", "sentiment_agent"],
+                ),
+            ],
+            termination_condition=termination,
+        )
+
+    # Round-robin chat among the four agents
+    return RoundRobinGroupChat(
+        [
+            stock_trends_agent_assistant,
+            news_agent_assistant,
+            sentiment_agent_assistant,
+            decision_agent_assistant,
+        ],
+        termination_condition=termination
     )
-)
 
-###############################################################################
-#                        TERMINATION & TEAM CONFIGURATION
-###############################################################################
-# Stop once "Decision Made" is in the response, or if 15 messages have passed
-text_termination = TextMentionTermination("Decision Made")
-max_message_termination = MaxMessageTermination(15)
-termination = text_termination | max_message_termination
-
-# Round-robin chat among the four agents
-investment_team = RoundRobinGroupChat(
-    [
-        stock_trends_agent_assistant,
-        news_agent_assistant,
-        sentiment_agent_assistant,
-        decision_agent_assistant,
-    ],
-    termination_condition=termination
-)
+
+investment_team = build_investment_team()
 
 ###############################################################################
 #                                   MAIN
 ###############################################################################
 async def main():
     stock_name = "Tesla"
-    await Console(
-        investment_team.run_stream(
-            task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
-        )
+    async with async_project_client:
+        # Deletes the pooled research agents on the way out, even if the team fails
+        async with agent_pool:
+            with usage_ledger.task(stock_name) as usage:
+                # Start the research fan-out while the first agent is still thinking
+                research_fanout.prefetch(stock_name)
+                await Console(
+                    tool_progress.merge(
+                        investment_team.run_stream(
+                            task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
+                        )
+                    )
+                )
+        print(f"Agent pool: {agent_pool.stats}")
+        print(usage.summary())
+        print(termination_telemetry.summary())
+        print(f"Research cache: {research_cache.total}")
+
+###############################################################################
+#                                BATCH MODE
+###############################################################################
+#
+# Screens many tickers in one process. Every ticker gets its own team instance,
+# while the model client, project client, agent pool and research fan-out are
+# shared. Decisions are streamed to a JSONL file as each ticker completes.
+#
+###############################################################################
+async def decide(stock_name: str) -> dict:
+    """Runs a fresh investment team for one ticker and returns its decision record."""
+    team = build_investment_team()
+    with usage_ledger.task(stock_name) as usage:
+        research_fanout.prefetch(stock_name)
+        try:
+            result = await team.run(
+                task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
+            )
+        finally:
+            # Keep memory flat across hundreds of tickers
+            research_fanout.forget(stock_name)
+
+    decision = next(
+        (
+            message.content
+            for message in reversed(result.messages)
+            if message.source == "decision_agent" and isinstance(message.content, str)
+        ),
+        None,
     )
+    return {
+        "decision": decision,
+        "stop_reason": result.stop_reason,
+        "messages": len(result.messages),
+        "usage": usage.to_dict(),
+    }
+
+
+async def batch_main(tickers: list, output_path: str, max_concurrency: int) -> None:
+    print(f"Screening {len(tickers)} tickers, {max_concurrency} at a time, writing to {output_path}")
+    async with async_project_client:
+        async with agent_pool:
+            with JsonlSink(output_path) as sink:
+                stats = await run_batch(tickers, decide, sink, max_concurrency=max_concurrency)
+    print(f"Batch finished: {stats}")
+    print(f"Agent pool: {agent_pool.stats}")
+    print(f"Usage: {usage_ledger.totals}")
+    print(termination_telemetry.summary())
+    for tool_name, cache_stats in research_cache.stats.items():
+        print(f"Research cache [{tool_name}]: {cache_stats}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Investment team for one ticker, or a batch of tickers.")
+    parser.add_argument("--tickers", help="Comma-separated tickers to screen in batch mode.")
+    parser.add_argument("--tickers-file", help="File with one ticker per line to screen in batch mode.")
+    parser.add_argument("--output", default="decisions.jsonl", help="JSONL file receiving batch decisions.")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=int(os.getenv("BATCH_MAX_CONCURRENCY", "4")),
+        help="Maximum number of tickers analysed at once.",
+    )
+    args = parser.parse_args()
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+
+    tickers = load_tickers(args.tickers, args.tickers_file)
+    # Closes the research cache's database connection even if the team fails
+    try:
+        if tickers:
+            asyncio.run(batch_main(tickers, args.output, args.max_concurrency))
+        else:
+            asyncio.run(main())
+    finally:
+        research_cache.close()
\ No newline at end of file
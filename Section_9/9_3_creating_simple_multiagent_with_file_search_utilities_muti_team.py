@@ -32,6 +32,17 @@ from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
+from agent_pool import AgentPool
+from research_fanout import RESEARCH_TOOLS
+from team_termination import (
+    DeadlineTermination,
+    NoveltyTermination,
+    SpecialistsReportedTermination,
+    TerminationTelemetry,
+)
+from tool_progress import ToolProgress, stream_answer
+from usage_ledger import BudgetTermination, UsageBudget, UsageLedger
+
 
 #pip install azure-identity
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
@@ -64,41 +75,70 @@ project_client = AIProjectClient.from_connection_string(
 bing_connection = project_client.connections.get(connection_name=BING_CONNECTION_NAME)
 conn_id = bing_connection.id
 
+# Research sub-agents are created once per tool and reused across tool calls and
+# tickers instead of being created and deleted around every question
+agent_pool = AgentPool(project_client, idle_timeout=float(os.getenv("AGENT_POOL_IDLE_TIMEOUT", "300")))
+RESEARCH_TOOLS_BY_NAME = {tool.name: tool for tool in RESEARCH_TOOLS}
+
+# Tokens of every team turn and Bing sub-agent run; USAGE_MAX_* variables set a
+# budget that stops the team early, USAGE_LEDGER_PATH appends every entry to a JSONL file
+usage_ledger = UsageLedger(UsageBudget.from_env(), export_path=os.getenv("USAGE_LEDGER_PATH"))
+
+# Which termination condition stopped the team; TERMINATION_TELEMETRY_PATH appends it to a JSONL file
+termination_telemetry = TerminationTelemetry(export_path=os.getenv("TERMINATION_TELEMETRY_PATH"))
+
+# Bing sub-agent answers, streamed into the team console while the tools run
+tool_progress = ToolProgress()
+
 ###############################################################################
 #                               BING QUERY TOOLS
 ###############################################################################
-async def stock_price_trends_tool(stock_name: str) -> str:
+async def run_research_tool(tool_name: str, stock_name: str) -> str:
     """
-    A dedicated Bing call focusing on real-time stock prices,
-    changes over the last few months for 'stock_name'.
+    Runs one research tool's sub-agent for 'stock_name' and returns its answer.
+
+    The pooled agent is keyed on the tool's instructions template and the
+    ticker-specific instructions are applied per run, so one agent serves every
+    ticker and is deleted by the pool, even when the run fails.
     """
-    print(f"[stock_price_trends_tool] Fetching stock price trends for {stock_name}...")
-    agent = project_client.agents.create_agent(
+    usage_ledger.check()
+    tool = RESEARCH_TOOLS_BY_NAME[tool_name]
+    with agent_pool.lease(
         model="gpt-4o",
-        name="stock_price_trends_tool_agent",
-        instructions=(
-            f"Focus on retrieving real-time stock prices, changes over the last few months, "
-            f"and summarize market trends for {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
+        instructions=tool.instructions,
+        name=f"{tool_name}_agent",
+        headers={"x-ms-enable-preview": "true"},
+    ) as agent:
+        # Create a new thread and send the user query
+        thread = project_client.agents.create_thread()
+        project_client.agents.create_message(
+            thread_id=thread.id,
+            role="user",
+            content=tool.render_prompt(stock_name),
+        )
+        # Process the run, streaming the answer to the team console as it is written
+        answer, run = await asyncio.to_thread(
+            stream_answer,
+            project_client.agents,
+            thread.id,
+            agent.id,
+            tool_name,
+            tool_progress,
+            instructions=tool.render_instructions(stock_name),
+        )
+        usage_ledger.record_run(tool_name, run)
 
-    # Create a new thread and send the user query
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=f"Please get stock price trends data for {stock_name}."
-    )
-    # Process the run
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
+    # Return the Bing result
+    return answer
 
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
 
-    # Return the Bing result
-    return messages["data"][0]["content"][0]["text"]["value"]
+async def stock_price_trends_tool(stock_name: str) -> str:
+    """
+    A dedicated Bing call focusing on real-time stock prices,
+    changes over the last few months for 'stock_name'.
+    """
+    print(f"[stock_price_trends_tool] Fetching stock price trends for {stock_name}...")
+    return await run_research_tool("stock_price_trends_tool", stock_name)
 
 
 async def news_analysis_tool(stock_name: str) -> str:
@@ -106,26 +146,7 @@ async def news_analysis_tool(stock_name: str) -> str:
     A dedicated Bing call focusing on the latest news for 'stock_name'.
     """
     print(f"[news_analysis_tool] Fetching news for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="news_analysis_tool_agent",
-        instructions=f"Focus on the latest news highlights for the stock {stock_name}.",
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=f"Retrieve the latest news articles and summaries about {stock_name}."
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await run_research_tool("news_analysis_tool", stock_name)
 
 
 async def market_sentiment_tool(stock_name: str) -> str:
@@ -134,30 +155,7 @@ async def market_sentiment_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[market_sentiment_tool] Fetching sentiment for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="market_sentiment_tool_agent",
-        instructions=(
-            f"Focus on analyzing general market sentiment regarding {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(
-            f"Gather market sentiment, user opinions, and overall feeling about {stock_name}."
-        )
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await run_research_tool("market_sentiment_tool", stock_name)
 
 
 async def analyst_reports_tool(stock_name: str) -> str:
@@ -166,28 +164,7 @@ async def analyst_reports_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[analyst_reports_tool] Fetching analyst reports for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="analyst_reports_tool_agent",
-        instructions=(
-            f"Focus on any relevant analyst reports or professional analyses about {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(f"Find recent analyst reports, price targets, or professional opinions on {stock_name}.")
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await run_research_tool("analyst_reports_tool", stock_name)
 
 
 async def expert_opinions_tool(stock_name: str) -> str:
@@ -196,28 +173,7 @@ async def expert_opinions_tool(stock_name: str) -> str:
     for 'stock_name'.
     """
     print(f"[expert_opinions_tool] Fetching expert opinions for {stock_name}...")
-    agent = project_client.agents.create_agent(
-        model="gpt-4o",
-        name="expert_opinions_tool_agent",
-        instructions=(
-            f"Focus on industry expert or thought leader opinions regarding {stock_name}."
-        ),
-        headers={"x-ms-enable-preview": "true"}
-    )
-
-    thread = project_client.agents.create_thread()
-    message = project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(f"Collect expert opinions or quotes about {stock_name}.")
-    )
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-
-    # Clean up
-    project_client.agents.delete_agent(agent.id)
-
-    return messages["data"][0]["content"][0]["text"]["value"]
+    return await run_research_tool("expert_opinions_tool", stock_name)
 
 
 ###############################################################################
@@ -320,10 +276,22 @@ decision_agent_assistant = AssistantAgent(
 ###############################################################################
 #                        TERMINATION & TEAM CONFIGURATION
 ###############################################################################
-# Stop once "Decision Made" is in the response, or if 15 messages have passed
+# Stop once "Decision Made" is in the response, if 15 messages have passed,
+# or once the task has spent its usage budget. Rather than going round the
+# table again, also stop once every agent has reported, or at the deadline.
+# Every agent reports once per round, so only the decision agent is scored for
+# novelty and a single stale decision (one that only restates the research
+# reports) is enough to flag it in the termination telemetry.
 text_termination = TextMentionTermination("Decision Made")
 max_message_termination = MaxMessageTermination(15)
-termination = text_termination | max_message_termination
+termination = termination_telemetry.monitor(
+    text_termination
+    | max_message_termination
+    | BudgetTermination(usage_ledger)
+    | SpecialistsReportedTermination(["stock_trends_agent", "news_agent", "sentiment_agent", "decision_agent"])
+    | NoveltyTermination(sources=["decision_agent"], patience=1)
+    | DeadlineTermination(float(os.getenv("TEAM_DEADLINE_SECONDS", "300")))
+)
 
 # Round-robin chat among the four agents
 investment_team = RoundRobinGroupChat(
@@ -341,11 +309,18 @@ investment_team = RoundRobinGroupChat(
 ###############################################################################
 async def main():
     stock_name = "Tesla"
-    await Console(
-        investment_team.run_stream(
-            task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
+    # The pooled research agents are deleted once the team is done, even if it fails
+    with agent_pool, usage_ledger.task(stock_name) as usage:
+        await Console(
+            tool_progress.merge(
+                investment_team.run_stream(
+                    task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
+                )
+            )
         )
-    )
+    print(f"Agent pool: {agent_pool.stats}")
+    print(usage.summary())
+    print(termination_telemetry.summary())
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
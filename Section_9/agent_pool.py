@@ -0,0 +1,280 @@
+"""
+Pool of reusable sub-agents for the Section_9 teams.
+
+Creating and deleting an agent around every tool call costs two extra
+control-plane round trips per question and leaves an orphaned agent behind
+if anything in between fails. The pools here create each specialised agent
+once per (model, instructions template, tools) key, lease it out for runs,
+and delete it when it has been idle too long or when the pool is closed.
+
+An agent can serve several runs on different threads at the same time, so a
+lease is a reference count rather than exclusive ownership. Per-run details
+(such as the stock name) should be passed as run-level ``instructions``
+instead of being baked into the pooled agent.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+PoolKey = Tuple[str, str, str]
+
+
+def _pool_key(model: str, instructions: str, tools: Optional[List[Any]]) -> PoolKey:
+    tools_key = json.dumps(tools or [], sort_keys=True, default=lambda o: o.as_dict())
+    return (model, instructions, tools_key)
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how well the pool is reusing agents."""
+
+    hits: int = 0
+    misses: int = 0
+    created: int = 0
+    deleted: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        leases = self.hits + self.misses
+        return self.hits / leases if leases else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"hits={self.hits} misses={self.misses} hit_rate={self.hit_rate:.1%} "
+            f"created={self.created} deleted={self.deleted} evicted={self.evicted}"
+        )
+
+
+@dataclass
+class _PooledAgent:
+    agent: Any
+    leases: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class AgentPool:
+    """
+    Agent pool for the sync AIProjectClient.
+
+    :param project_client: AIProjectClient that owns the agents.
+    :param idle_timeout: Seconds an unused agent is kept before it is deleted.
+    """
+
+    def __init__(self, project_client: Any, idle_timeout: float = 300.0) -> None:
+        self.project_client = project_client
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        self._agents: Dict[PoolKey, _PooledAgent] = {}
+        self._creating: Dict[PoolKey, "Future[_PooledAgent]"] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(
+        self,
+        model: str,
+        instructions: str,
+        tools: Optional[List[Any]] = None,
+        name: str = "pooled-agent",
+        **create_kwargs: Any,
+    ) -> Iterator[Any]:
+        """
+        Leases the pooled agent for a key, creating it on first use.
+
+        :param model: Model deployment name.
+        :param instructions: Agent instructions (template) that identify the agent.
+        :param tools: Optional tool definitions for the agent.
+        :param name: Agent name used when the agent is created.
+        :return: Context manager yielding the agent.
+        """
+        key = _pool_key(model, instructions, tools)
+        creating: Optional["Future[_PooledAgent]"] = None
+        owner = False
+        with self._lock:
+            entry = self._agents.get(key)
+            if entry is not None:
+                self.stats.hits += 1
+                entry.leases += 1
+            else:
+                self.stats.misses += 1
+                # Concurrent misses for the same key share one create_agent call
+                creating = self._creating.get(key)
+                owner = creating is None
+                if creating is None:
+                    creating = self._creating[key] = Future()
+        if creating is not None:
+            if owner:
+                # Created outside the lock, so leases of other keys are not held up by the round trip
+                try:
+                    agent = self.project_client.agents.create_agent(
+                        model=model, name=name, instructions=instructions, tools=tools, **create_kwargs
+                    )
+                except BaseException as e:
+                    with self._lock:
+                        self._creating.pop(key, None)
+                    creating.set_exception(e)
+                    raise
+                with self._lock:
+                    self.stats.created += 1
+                    created = self._agents[key] = _PooledAgent(agent)
+                    self._creating.pop(key, None)
+                creating.set_result(created)
+            entry = creating.result()
+            with self._lock:
+                entry.leases += 1
+        try:
+            yield entry.agent
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+            self.evict_idle()
+
+    def _delete(self, entry: _PooledAgent) -> None:
+        try:
+            self.project_client.agents.delete_agent(entry.agent.id)
+            self.stats.deleted += 1
+        except Exception as e:
+            print(f"[agent_pool] Failed to delete agent {entry.agent.id}: {e}")
+
+    def evict_idle(self) -> int:
+        """
+        Deletes agents that have not been leased for longer than the idle timeout.
+
+        :return: The number of agents evicted.
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key
+                for key, entry in self._agents.items()
+                if entry.leases == 0 and now - entry.last_used > self.idle_timeout
+            ]
+            entries = [self._agents.pop(key) for key in idle]
+        for entry in entries:
+            self._delete(entry)
+        self.stats.evicted += len(entries)
+        return len(entries)
+
+    def close(self) -> None:
+        """Deletes every pooled agent."""
+        with self._lock:
+            entries = list(self._agents.values())
+            self._agents.clear()
+        for entry in entries:
+            self._delete(entry)
+
+    def __enter__(self) -> "AgentPool":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
+
+
+class AsyncAgentPool:
+    """
+    Agent pool for the async AIProjectClient.
+
+    :param project_client: Async AIProjectClient that owns the agents.
+    :param idle_timeout: Seconds an unused agent is kept before it is deleted.
+    """
+
+    def __init__(self, project_client: Any, idle_timeout: float = 300.0) -> None:
+        self.project_client = project_client
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        self._agents: Dict[PoolKey, _PooledAgent] = {}
+        self._creating: Dict[PoolKey, "asyncio.Future[_PooledAgent]"] = {}
+
+    async def _create(self, key: PoolKey, name: str, create_kwargs: Dict[str, Any]) -> _PooledAgent:
+        model, instructions, _ = key
+        agent = await self.project_client.agents.create_agent(
+            model=model, name=name, instructions=instructions, **create_kwargs
+        )
+        self.stats.created += 1
+        entry = self._agents[key] = _PooledAgent(agent)
+        return entry
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        model: str,
+        instructions: str,
+        tools: Optional[List[Any]] = None,
+        name: str = "pooled-agent",
+        **create_kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """
+        Leases the pooled agent for a key, creating it on first use.
+
+        :param model: Model deployment name.
+        :param instructions: Agent instructions (template) that identify the agent.
+        :param tools: Optional tool definitions for the agent.
+        :param name: Agent name used when the agent is created.
+        :return: Async context manager yielding the agent.
+        """
+        key = _pool_key(model, instructions, tools)
+        entry = self._agents.get(key)
+        if entry is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            # Concurrent misses for the same key share one create_agent call
+            creating = self._creating.get(key)
+            if creating is None:
+                creating = asyncio.ensure_future(self._create(key, name, dict(create_kwargs, tools=tools)))
+                self._creating[key] = creating
+                creating.add_done_callback(lambda _: self._creating.pop(key, None))
+            entry = await asyncio.shield(creating)
+        entry.leases += 1
+        try:
+            yield entry.agent
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            await self.evict_idle()
+
+    async def _delete(self, entry: _PooledAgent) -> None:
+        try:
+            await self.project_client.agents.delete_agent(entry.agent.id)
+            self.stats.deleted += 1
+        except Exception as e:
+            print(f"[agent_pool] Failed to delete agent {entry.agent.id}: {e}")
+
+    async def evict_idle(self) -> int:
+        """
+        Deletes agents that have not been leased for longer than the idle timeout.
+
+        :return: The number of agents evicted.
+        """
+        now = time.monotonic()
+        idle = [
+            key
+            for key, entry in self._agents.items()
+            if entry.leases == 0 and now - entry.last_used > self.idle_timeout
+        ]
+        entries = [self._agents.pop(key) for key in idle]
+        for entry in entries:
+            await self._delete(entry)
+        self.stats.evicted += len(entries)
+        return len(entries)
+
+    async def close(self) -> None:
+        """Deletes every pooled agent, including any still being created."""
+        if self._creating:
+            await asyncio.gather(*self._creating.values(), return_exceptions=True)
+        entries = list(self._agents.values())
+        self._agents.clear()
+        await asyncio.gather(*(self._delete(entry) for entry in entries))
+
+    async def __aenter__(self) -> "AsyncAgentPool":
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        await self.close()
@@ -0,0 +1,138 @@
+"""
+Batch runner for screening many tickers with the Section_9 teams.
+
+Each ticker runs through its own team instance, up to a concurrency limit.
+Decisions are appended to a JSONL sink as soon as each ticker finishes, and
+the run reports throughput and per-ticker latency percentiles at the end.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TextIO
+
+from agent_utils.stats import percentile
+
+
+def load_tickers(tickers: Optional[str] = None, tickers_file: Optional[str] = None) -> List[str]:
+    """
+    Collects tickers from a comma-separated list and/or a file with one ticker per line.
+
+    Blank lines and lines starting with '#' are ignored, and duplicates are dropped.
+
+    :param tickers: Optional comma-separated tickers, e.g. "Tesla,Apple".
+    :param tickers_file: Optional path to a file with one ticker per line.
+    :return: The tickers in input order.
+    """
+    names: List[str] = []
+    if tickers:
+        names.extend(tickers.split(","))
+    if tickers_file:
+        with open(tickers_file, "r", encoding="utf-8") as file:
+            names.extend(line for line in file if not line.lstrip().startswith("#"))
+    seen = set()
+    result = []
+    for name in (n.strip() for n in names):
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            result.append(name)
+    return result
+
+
+@dataclass
+class BatchStats:
+    """Throughput and latency for one batch run."""
+
+    completed: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def tickers_per_minute(self) -> float:
+        return (self.completed + self.failed) / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.latencies, 95)
+
+    def __str__(self) -> str:
+        return (
+            f"completed={self.completed} failed={self.failed} elapsed={self.elapsed:.1f}s "
+            f"throughput={self.tickers_per_minute:.1f} tickers/min "
+            f"p50={self.p50:.1f}s p95={self.p95:.1f}s"
+        )
+
+
+class JsonlSink:
+    """Appends one JSON record per line and flushes after every write."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
+
+
+async def run_batch(
+    tickers: Iterable[str],
+    decide: Callable[[str], Awaitable[Dict[str, Any]]],
+    sink: JsonlSink,
+    max_concurrency: int = 4,
+) -> BatchStats:
+    """
+    Runs ``decide`` for every ticker concurrently and streams the results to ``sink``.
+
+    A failing ticker is recorded with its error and does not stop the batch.
+
+    :param tickers: Tickers to screen.
+    :param decide: Coroutine function producing the decision record for one ticker.
+    :param sink: JSONL sink receiving one record per ticker as it completes.
+    :param max_concurrency: Maximum number of tickers in flight at once.
+    :return: Throughput and latency statistics for the batch.
+    :raises ValueError: If ``max_concurrency`` is below 1, which would never start a ticker.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    stats = BatchStats()
+
+    async def run_one(ticker: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                record = {"ticker": ticker, **await decide(ticker)}
+                stats.completed += 1
+            except Exception as e:
+                record = {"ticker": ticker, "error": str(e) or type(e).__name__}
+                stats.failed += 1
+            latency = time.perf_counter() - start
+            stats.latencies.append(latency)
+            record["latency_s"] = round(latency, 3)
+            sink.write(record)
+            print(f"[batch] {ticker} done in {latency:.1f}s ({stats.completed + stats.failed} finished)")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(ticker) for ticker in tickers))
+    stats.elapsed = time.perf_counter() - start
+    return stats
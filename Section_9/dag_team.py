@@ -0,0 +1,209 @@
+"""
+Dependency-aware team runner for the Section_9 agents.
+
+RoundRobinGroupChat gives the agents one turn at a time, so research agents
+that do not depend on each other still run back to back, and every agent sees
+the whole conversation. In a DagTeam every agent declares the agents whose
+output it needs. Agents without pending inputs run concurrently, and an agent
+starts as soon as the last of its inputs has replied, seeing only the task and
+those replies:
+
+    team = DagTeam(
+        [
+            DagNode(stock_trends_agent),
+            DagNode(news_agent),
+            DagNode(sentiment_agent),
+            DagNode(decision_agent, inputs=["stock_trends_agent", "news_agent", "sentiment_agent"]),
+        ],
+        termination_condition=TextMentionTermination("Decision Made") | MaxMessageTermination(15),
+    )
+    await Console(team.run_stream(task="..."))
+
+``run_stream`` yields the same messages, events and final TaskResult as the
+autogen teams, so Console renders it unchanged. Events of concurrent agents
+are interleaved as they happen. The termination condition is called with each
+agent's messages when the agent replies, as in a group chat; when it fires,
+agents still running are cancelled. Like the autogen teams, agents keep their
+state across runs until ``reset`` is called.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from autogen_agentchat.base import ChatAgent, Response, TaskResult, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, TextMessage
+from autogen_core import CancellationToken
+
+StreamItem = Union[BaseAgentEvent, BaseChatMessage]
+
+
+@dataclass
+class DagNode:
+    """
+    One agent of a DagTeam.
+
+    :param agent: The agent.
+    :param inputs: Names of the agents whose replies this agent needs before it starts.
+    """
+
+    agent: ChatAgent
+    inputs: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.agent.name
+
+
+class DagTeam:
+    """
+    Runs agents in dependency order, concurrently where the graph allows.
+
+    :param nodes: The agents and their inputs. The graph must be acyclic.
+    :param termination_condition: Optional condition checked after every agent reply.
+    :param max_concurrency: Optional limit on the number of agents running at once.
+    :raises ValueError: If ``max_concurrency`` is below 1, which would never start an agent.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[DagNode],
+        termination_condition: Optional[TerminationCondition] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.nodes: Dict[str, DagNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate agent name {node.name!r}")
+            self.nodes[node.name] = node
+        for node in nodes:
+            unknown = [name for name in node.inputs if name not in self.nodes]
+            if unknown:
+                raise ValueError(f"Agent {node.name!r} depends on unknown agents {unknown}")
+        self.order = self._topological_order()
+        self.termination_condition = termination_condition
+        self.max_concurrency = max_concurrency
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        done: Set[str] = set()
+        pending = list(self.nodes)
+        while pending:
+            ready = [name for name in pending if all(i in done for i in self.nodes[name].inputs)]
+            if not ready:
+                raise ValueError(f"Agent dependencies contain a cycle among {pending}")
+            order.extend(ready)
+            done.update(ready)
+            pending = [name for name in pending if name not in done]
+        return order
+
+    async def _run_node(
+        self,
+        node: DagNode,
+        messages: List[BaseChatMessage],
+        queue: "asyncio.Queue[Tuple[str, Union[StreamItem, Response, BaseException]]]",
+        cancellation_token: CancellationToken,
+    ) -> None:
+        try:
+            async for item in node.agent.on_messages_stream(messages, cancellation_token):
+                await queue.put((node.name, item))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await queue.put((node.name, e))
+
+    async def run_stream(
+        self,
+        task: Union[str, BaseChatMessage],
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[StreamItem, TaskResult], None]:
+        """
+        Runs the graph on a task, yielding every message and event as it happens and a TaskResult last.
+
+        :param task: The task, as text or a chat message.
+        :param cancellation_token: Optional token that cancels the whole run.
+        """
+        cancellation_token = cancellation_token or CancellationToken()
+        task_message = task if isinstance(task, BaseChatMessage) else TextMessage(content=task, source="user")
+        produced: List[StreamItem] = [task_message]
+        yield task_message
+
+        stop_reason: Optional[str] = None
+        if self.termination_condition is not None:
+            stop = await self.termination_condition([task_message])
+            if stop is not None:
+                stop_reason = stop.content
+
+        replies: Dict[str, BaseChatMessage] = {}
+        deltas: Dict[str, List[StreamItem]] = {name: [] for name in self.nodes}
+        running: Dict[str, "asyncio.Task[None]"] = {}
+        queue: "asyncio.Queue[Tuple[str, Union[StreamItem, Response, BaseException]]]" = asyncio.Queue()
+        limit = self.max_concurrency if self.max_concurrency is not None else len(self.nodes)
+
+        def start_ready() -> None:
+            for name in self.order:
+                if len(running) >= limit:
+                    return
+                node = self.nodes[name]
+                if name in running or name in replies or not all(i in replies for i in node.inputs):
+                    continue
+                inputs = [task_message] + [replies[i] for i in node.inputs]
+                running[name] = asyncio.ensure_future(self._run_node(node, inputs, queue, cancellation_token))
+
+        try:
+            if stop_reason is None:
+                start_ready()
+            while running and stop_reason is None:
+                name, item = await queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+                if not isinstance(item, Response):
+                    deltas[name].append(item)
+                    produced.append(item)
+                    yield item
+                    continue
+                running.pop(name)
+                replies[name] = item.chat_message
+                deltas[name].append(item.chat_message)
+                produced.append(item.chat_message)
+                yield item.chat_message
+                if self.termination_condition is not None:
+                    stop = await self.termination_condition(deltas[name])
+                    if stop is not None:
+                        stop_reason = stop.content
+                        break
+                start_ready()
+            if stop_reason is None:
+                stop_reason = f"All {len(self.nodes)} agents have replied"
+        finally:
+            if running:
+                cancellation_token.cancel()
+                for running_task in running.values():
+                    running_task.cancel()
+                await asyncio.gather(*running.values(), return_exceptions=True)
+            if self.termination_condition is not None:
+                await self.termination_condition.reset()
+
+        yield TaskResult(messages=produced, stop_reason=stop_reason)
+
+    async def run(
+        self,
+        task: Union[str, BaseChatMessage],
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> TaskResult:
+        """Runs the graph on a task and returns the TaskResult."""
+        result: Optional[TaskResult] = None
+        async for item in self.run_stream(task, cancellation_token):
+            if isinstance(item, TaskResult):
+                result = item
+        assert result is not None
+        return result
+
+    async def reset(self) -> None:
+        """Resets every agent and the termination condition."""
+        for node in self.nodes.values():
+            await node.agent.on_reset(CancellationToken())
+        if self.termination_condition is not None:
+            await self.termination_condition.reset()
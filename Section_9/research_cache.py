@@ -0,0 +1,227 @@
+"""
+TTL cache for the Section_9 research tool results.
+
+Results are keyed on (tool name, normalised stock name, prompt template hash),
+so editing a tool's instructions or prompt never serves a stale answer. Each
+tool has its own TTL (prices go stale much faster than analyst reports), the
+in-memory layer is LRU-bounded, and an optional SQLite file keeps a warm cache
+across restarts. Concurrent requests for the same key share one upstream run.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one tool, or for the whole cache."""
+
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        # Requests that joined an in-flight fetch did not pay for an upstream run either
+        requests = self.hits + self.shared + self.misses
+        return (self.hits + self.shared) / requests if requests else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"hits={self.hits} shared={self.shared} misses={self.misses} hit_rate={self.hit_rate:.1%} "
+            f"expired={self.expired} evicted={self.evicted}"
+        )
+
+
+def normalize_stock_name(stock_name: str) -> str:
+    return " ".join(stock_name.split()).lower()
+
+
+def template_hash(*templates: str) -> str:
+    return hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()[:16]
+
+
+class ResearchCache:
+    """
+    LRU + TTL cache for research results with single-flight deduplication.
+
+    :param max_entries: Maximum number of results kept in memory.
+    :param default_ttl: TTL in seconds for tools without their own entry in ``ttls``.
+    :param ttls: Optional per-tool TTLs in seconds, keyed by tool name.
+    :param db_path: Optional SQLite file that persists results across restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 900.0,
+        ttls: Optional[Dict[str, float]] = None,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.stats: Dict[str, CacheStats] = {}
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS research_cache "
+                "(key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM research_cache WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    def _stats(self, tool_name: str) -> CacheStats:
+        return self.stats.setdefault(tool_name, CacheStats())
+
+    @property
+    def total(self) -> CacheStats:
+        """Counters summed over every tool."""
+        total = CacheStats()
+        for stats in self.stats.values():
+            total.hits += stats.hits
+            total.misses += stats.misses
+            total.shared += stats.shared
+            total.expired += stats.expired
+            total.evicted += stats.evicted
+        return total
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    def make_key(self, tool_name: str, stock_name: str, *templates: str) -> str:
+        """
+        Builds the cache key for one tool call.
+
+        :param tool_name: Name of the research tool.
+        :param stock_name: The stock being researched; case and whitespace are ignored.
+        :param templates: The tool's instructions and prompt templates.
+        :return: The cache key.
+        """
+        return f"{tool_name}|{normalize_stock_name(stock_name)}|{template_hash(*templates)}"
+
+    def _remember(self, key: str, value: str, expires_at: float, tool_name: str) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats(evicted_key.split("|", 1)[0]).evicted += 1
+
+    def get(self, key: str, tool_name: str) -> Optional[str]:
+        """
+        Returns a fresh cached value, checking memory first and then SQLite.
+
+        :param key: Key from ``make_key``.
+        :param tool_name: Name of the research tool, for the counters.
+        :return: The cached value, or None when missing or expired.
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+            self._stats(tool_name).expired += 1
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM research_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0], row[1], tool_name)
+                return row[0]
+        return None
+
+    def set(self, key: str, tool_name: str, value: str) -> None:
+        """
+        Stores a value with the tool's TTL.
+
+        :param key: Key from ``make_key``.
+        :param tool_name: Name of the research tool, which selects the TTL.
+        :param value: The research result.
+        """
+        expires_at = time.time() + self.ttl_for(tool_name)
+        self._remember(key, value, expires_at, tool_name)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO research_cache (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, tool_name, value, expires_at),
+            )
+            self._db.commit()
+
+    async def get_or_fetch(
+        self,
+        tool_name: str,
+        stock_name: str,
+        templates: Tuple[str, ...],
+        fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Returns the cached result, or runs ``fetch`` once for all concurrent callers.
+
+        Failed fetches are not cached; their exception is raised to every waiting caller.
+
+        :param tool_name: Name of the research tool.
+        :param stock_name: The stock being researched.
+        :param templates: The tool's instructions and prompt templates.
+        :param fetch: Coroutine function that runs the upstream lookup.
+        :return: The research result.
+        """
+        key = self.make_key(tool_name, stock_name, *templates)
+        stats = self._stats(tool_name)
+        value = self.get(key, tool_name)
+        if value is not None:
+            stats.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats.shared += 1
+        else:
+            stats.misses += 1
+
+            async def fetch_and_store() -> str:
+                result = await fetch()
+                self.set(key, tool_name, result)
+                return result
+
+            inflight = asyncio.ensure_future(fetch_and_store())
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(inflight)
+
+    def invalidate(self, stock_name: Optional[str] = None) -> None:
+        """
+        Drops cached results for one stock, or everything when no stock is given.
+
+        :param stock_name: Optional stock whose results should be dropped.
+        """
+        if stock_name is None:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM research_cache")
+                self._db.commit()
+            return
+        marker = f"|{normalize_stock_name(stock_name)}|"
+        for key in [key for key in self._entries if marker in key]:
+            del self._entries[key]
+        if self._db is not None:
+            self._db.execute("DELETE FROM research_cache WHERE instr(key, ?) > 0", (marker,))
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,288 @@
+"""
+Fan-out research stage for the Section_9 investment team.
+
+Every research lookup for a ticker (stock trends, news, market sentiment,
+analyst reports and expert opinions) runs concurrently on the async
+AIProjectClient, bounded by a concurrency limit and a per-tool deadline.
+The answers are merged into one ResearchBundle per ticker, so the team's
+agent functions all read from the same in-flight fan-out instead of running
+their lookups back to back. A single lookup returns as soon as its own
+answer is in, without waiting for the rest of the bundle, and the answers
+are streamed to an optional ToolProgress channel while they are generated.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from azure.ai.projects.aio import AIProjectClient
+
+from agent_pool import AsyncAgentPool
+from research_cache import ResearchCache
+from tool_progress import ToolProgress, stream_answer_async
+from usage_ledger import UsageLedger
+
+
+@dataclass(frozen=True)
+class ResearchTool:
+    """
+    One research lookup: the sub-agent instructions and the user prompt, both
+    templated on ``{stock_name}``.
+    """
+
+    name: str
+    instructions: str
+    prompt: str
+
+    def render_instructions(self, stock_name: str) -> str:
+        return self.instructions.format(stock_name=stock_name)
+
+    def render_prompt(self, stock_name: str) -> str:
+        return self.prompt.format(stock_name=stock_name)
+
+
+RESEARCH_TOOLS: List[ResearchTool] = [
+    ResearchTool(
+        name="stock_price_trends_tool",
+        instructions=(
+            "Focus on retrieving real-time stock prices, changes over the last few months, "
+            "and summarize market trends for {stock_name}."
+        ),
+        prompt="Please get stock price trends data for {stock_name}.",
+    ),
+    ResearchTool(
+        name="news_analysis_tool",
+        instructions="Focus on the latest news highlights for the stock {stock_name}.",
+        prompt="Retrieve the latest news articles and summaries about {stock_name}.",
+    ),
+    ResearchTool(
+        name="market_sentiment_tool",
+        instructions="Focus on analyzing general market sentiment regarding {stock_name}.",
+        prompt="Gather market sentiment, user opinions, and overall feeling about {stock_name}.",
+    ),
+    ResearchTool(
+        name="analyst_reports_tool",
+        instructions="Focus on any relevant analyst reports or professional analyses about {stock_name}.",
+        prompt="Find recent analyst reports, price targets, or professional opinions on {stock_name}.",
+    ),
+    ResearchTool(
+        name="expert_opinions_tool",
+        instructions="Focus on industry expert or thought leader opinions regarding {stock_name}.",
+        prompt="Collect expert opinions or quotes about {stock_name}.",
+    ),
+]
+
+
+@dataclass
+class ResearchResult:
+    """Outcome of a single research lookup."""
+
+    tool: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ResearchBundle:
+    """All research results for one ticker, merged."""
+
+    stock_name: str
+    results: Dict[str, ResearchResult] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def get(self, tool_name: str) -> str:
+        """
+        Returns the text of one lookup, or a short note if it failed or timed out.
+
+        :param tool_name: Name of the research tool.
+        :return: The tool's answer text.
+        """
+        result = self.results.get(tool_name)
+        if result is None:
+            return f"No {tool_name} research was run for {self.stock_name}."
+        if not result.ok:
+            return f"{tool_name} research for {self.stock_name} is unavailable: {result.error}"
+        return result.text or ""
+
+    def to_text(self) -> str:
+        """
+        Merges every lookup into one document, one section per tool.
+
+        :return: The merged research bundle as text.
+        """
+        sections = [f"Research bundle for {self.stock_name}"]
+        for tool_name in self.results:
+            sections.append(f"## {tool_name}\n{self.get(tool_name)}")
+        return "\n\n".join(sections)
+
+
+class ResearchFanout:
+    """
+    Runs research lookups for a ticker concurrently on the async AIProjectClient.
+
+    :param project_client: Async AIProjectClient used for the sub-agent runs.
+    :param model: Model deployment used by the research sub-agents.
+    :param tools: Research lookups to run for each ticker.
+    :param max_concurrency: Maximum number of lookups in flight at once, across all tickers.
+    :param tool_timeout: Deadline in seconds for a single lookup.
+    :param tool_definitions: Optional tool definitions (for example Bing grounding) for the sub-agents.
+    :param agent_pool: Pool the research sub-agents are leased from. A private pool is used if omitted.
+    :param cache: Optional research cache consulted before every lookup.
+    :param usage_ledger: Optional ledger charged with the tokens of every lookup run. Lookups are
+        refused once the current task has spent its budget.
+    :param progress: Optional channel the lookup answers are streamed to as they are generated.
+    """
+
+    def __init__(
+        self,
+        project_client: AIProjectClient,
+        model: str,
+        tools: Optional[List[ResearchTool]] = None,
+        max_concurrency: int = 5,
+        tool_timeout: float = 60.0,
+        tool_definitions: Optional[List[Any]] = None,
+        agent_pool: Optional[AsyncAgentPool] = None,
+        cache: Optional[ResearchCache] = None,
+        usage_ledger: Optional[UsageLedger] = None,
+        progress: Optional[ToolProgress] = None,
+    ) -> None:
+        self.project_client = project_client
+        self.model = model
+        self.tools = {tool.name: tool for tool in (tools or RESEARCH_TOOLS)}
+        self.tool_timeout = tool_timeout
+        self.tool_definitions = tool_definitions
+        self.agent_pool = agent_pool or AsyncAgentPool(project_client)
+        self.cache = cache
+        self.usage_ledger = usage_ledger
+        self.progress = progress
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bundles: Dict[str, "asyncio.Task[ResearchBundle]"] = {}
+        self._lookups: Dict[str, Dict[str, "asyncio.Task[ResearchResult]"]] = {}
+
+    async def _lookup(self, tool: ResearchTool, stock_name: str) -> str:
+        agents = self.project_client.agents
+        if self.usage_ledger is not None:
+            self.usage_ledger.check()
+        # The pooled agent is keyed on the instructions template; the ticker-specific
+        # instructions are applied per run, so one agent serves every ticker.
+        async with self.agent_pool.lease(
+            model=self.model,
+            instructions=tool.instructions,
+            tools=self.tool_definitions,
+            name=f"{tool.name}_agent",
+            headers={"x-ms-enable-preview": "true"},
+        ) as agent:
+            thread = await agents.create_thread()
+            await agents.create_message(thread_id=thread.id, role="user", content=tool.render_prompt(stock_name))
+            start = time.perf_counter()
+            # Streamed, so the answer shows up on the console while it is being written
+            answer, run = await stream_answer_async(
+                agents,
+                thread.id,
+                agent.id,
+                tool.name,
+                self.progress,
+                instructions=tool.render_instructions(stock_name),
+            )
+            if self.usage_ledger is not None and run is not None:
+                self.usage_ledger.record_run(tool.name, run, time.perf_counter() - start)
+            if run is None or run.status != "completed":
+                error = run.last_error if run is not None else "stream ended without a run"
+                raise RuntimeError(f"Run failed: {error}")
+            return answer
+
+    async def _fetch(self, tool: ResearchTool, stock_name: str) -> str:
+        async with self._semaphore:
+            print(f"[{tool.name}] Fetching research for {stock_name}...")
+            return await asyncio.wait_for(self._lookup(tool, stock_name), timeout=self.tool_timeout)
+
+    async def run_tool(self, tool_name: str, stock_name: str) -> ResearchResult:
+        """
+        Runs a single research lookup under the concurrency limit and deadline,
+        answering from the research cache when a fresh result is available.
+
+        :param tool_name: Name of the research tool to run.
+        :param stock_name: The stock to research.
+        :return: The lookup result; failures and timeouts are recorded, not raised.
+        """
+        tool = self.tools[tool_name]
+        start = time.perf_counter()
+        try:
+            if self.cache is None:
+                text = await self._fetch(tool, stock_name)
+            else:
+                text = await self.cache.get_or_fetch(
+                    tool.name, stock_name, (tool.instructions, tool.prompt), lambda: self._fetch(tool, stock_name)
+                )
+            return ResearchResult(tool=tool.name, text=text, elapsed=time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.tool_timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        print(f"[{tool.name}] Research for {stock_name} failed: {error}")
+        return ResearchResult(tool=tool.name, error=error, elapsed=time.perf_counter() - start)
+
+    async def _research(self, stock_name: str, lookups: Dict[str, "asyncio.Task[ResearchResult]"]) -> ResearchBundle:
+        start = time.perf_counter()
+        results = await asyncio.gather(*lookups.values())
+        bundle = ResearchBundle(
+            stock_name=stock_name,
+            results={result.tool: result for result in results},
+            elapsed=time.perf_counter() - start,
+        )
+        print(f"[research_fanout] Research bundle for {stock_name} ready in {bundle.elapsed:.2f}s")
+        return bundle
+
+    def prefetch(self, stock_name: str) -> "asyncio.Task[ResearchBundle]":
+        """
+        Starts the fan-out for a ticker if it is not already running.
+
+        :param stock_name: The stock to research.
+        :return: The task producing the ticker's research bundle.
+        """
+        key = stock_name.strip().lower()
+        task = self._bundles.get(key)
+        if task is None:
+            lookups = {name: asyncio.ensure_future(self.run_tool(name, stock_name)) for name in self.tools}
+            self._lookups[key] = lookups
+            task = asyncio.ensure_future(self._research(stock_name, lookups))
+            self._bundles[key] = task
+        return task
+
+    async def research(self, stock_name: str) -> ResearchBundle:
+        """
+        Returns the merged research bundle for a ticker, sharing one fan-out
+        between all callers.
+
+        :param stock_name: The stock to research.
+        :return: The ticker's research bundle.
+        """
+        return await self.prefetch(stock_name)
+
+    async def lookup(self, tool_name: str, stock_name: str) -> str:
+        """
+        Returns one tool's answer as soon as it is in, starting the ticker's
+        fan-out if needed; the other lookups keep running for the bundle.
+
+        :param tool_name: Name of the research tool.
+        :param stock_name: The stock to research.
+        :return: The tool's answer text.
+        """
+        self.prefetch(stock_name)
+        lookup = self._lookups[stock_name.strip().lower()].get(tool_name)
+        if lookup is None:
+            return ResearchBundle(stock_name=stock_name).get(tool_name)
+        # Shielded, so a cancelled tool call does not cancel the shared lookup
+        result = await asyncio.shield(lookup)
+        return ResearchBundle(stock_name=stock_name, results={tool_name: result}).get(tool_name)
+
+    def forget(self, stock_name: str) -> None:
+        """Drops a ticker's bundle so the next call researches it again."""
+        self._bundles.pop(stock_name.strip().lower(), None)
+        self._lookups.pop(stock_name.strip().lower(), None)
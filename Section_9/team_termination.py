@@ -0,0 +1,296 @@
+"""
+Extra termination conditions for the Section_9 round-robin teams, with telemetry.
+
+``TextMentionTermination`` and ``MaxMessageTermination`` let a team keep going
+round the table when an agent forgets the stop phrase, and every extra turn
+re-calls the tools without adding anything. These conditions stop the team as
+soon as further turns are unlikely to help:
+
+- NoveltyTermination: consecutive messages stop adding new facts, approximated
+  by word trigrams and numbers not seen earlier in the conversation
+- SpecialistsReportedTermination: every required agent has reported once
+- DeadlineTermination: a wall-clock deadline, counted from the task's first
+  message rather than from when the team was built
+
+TerminationTelemetry wraps the combined condition and records which condition
+fired, after how many messages and how long, per task:
+
+    telemetry = TerminationTelemetry(export_path=os.getenv("TERMINATION_TELEMETRY_PATH"))
+    termination = telemetry.monitor(
+        TextMentionTermination("Decision Made")
+        | MaxMessageTermination(15)
+        | SpecialistsReportedTermination(["stock_trends_agent", "news_agent", "sentiment_agent", "decision_agent"])
+        | NoveltyTermination(sources=["decision_agent"], patience=1)
+        | DeadlineTermination(300)
+    )
+"""
+
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+
+_WORDS = re.compile(r"\$?\d[\d,.]*%?|[a-z][a-z'\-]*")
+
+
+def message_facts(text: str, ngram: int = 3) -> Set[Tuple[str, ...]]:
+    """
+    Approximates the facts in a message: its word n-grams plus every number
+    (prices, percentages, dates) on its own.
+
+    :param text: Message text.
+    :param ngram: Words per n-gram.
+    """
+    words = _WORDS.findall(text.lower())
+    facts = {tuple(words[i : i + ngram]) for i in range(len(words) - ngram + 1)}
+    facts.update((word,) for word in words if word[0].isdigit() or word[0] == "$")
+    return facts
+
+
+class NoveltyTermination(TerminationCondition):
+    """
+    Stops when ``patience`` consecutive agent messages each add less than
+    ``min_novelty`` new facts, i.e. the conversation has converged. Specialist
+    reports on the same topic often overlap, so in a team that ends with a
+    deciding agent, score only that agent with ``sources``; otherwise two
+    similar reports can stop the team before the decision. When that agent is
+    also required by a SpecialistsReportedTermination it speaks only once per
+    task, so use ``patience=1`` or the condition can never fire.
+
+    :param min_novelty: Fraction of a message's facts that must be new for it to count as novel.
+    :param patience: Consecutive non-novel messages that stop the team.
+    :param sources: Only messages of these agents are scored; all agents if omitted.
+    :param ngram: Words per n-gram used as a fact.
+    """
+
+    def __init__(
+        self,
+        min_novelty: float = 0.2,
+        patience: int = 2,
+        sources: Optional[Sequence[str]] = None,
+        ngram: int = 3,
+    ) -> None:
+        self.min_novelty = min_novelty
+        self.patience = patience
+        self.sources = set(sources) if sources else None
+        self.ngram = ngram
+        self._seen: Set[Tuple[str, ...]] = set()
+        self._stale = 0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[StopMessage]:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if not isinstance(message, BaseChatMessage):
+                continue
+            facts = message_facts(message.to_text(), self.ngram)
+            new = facts - self._seen
+            self._seen |= facts
+            # The task itself only seeds what is already known
+            if message.source == "user" or (self.sources is not None and message.source not in self.sources):
+                continue
+            novelty = len(new) / len(facts) if facts else 0.0
+            self._stale = self._stale + 1 if novelty < self.min_novelty else 0
+        if self._stale >= self.patience:
+            self._terminated = True
+            return StopMessage(
+                content=f"{self._stale} consecutive messages added less than {self.min_novelty:.0%} new facts",
+                source="NoveltyTermination",
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._seen.clear()
+        self._stale = 0
+        self._terminated = False
+
+
+class SpecialistsReportedTermination(TerminationCondition):
+    """
+    Stops once every required agent has produced at least one chat message
+    (a text reply or a tool-call summary) in the current task.
+
+    :param required: Names of the agents that have to report.
+    """
+
+    def __init__(self, required: Iterable[str]) -> None:
+        self.required = list(required)
+        if not self.required:
+            raise ValueError("At least one required agent must be given")
+        self._reported: Set[str] = set()
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    @property
+    def missing(self) -> List[str]:
+        return [name for name in self.required if name not in self._reported]
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[StopMessage]:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        self._reported.update(m.source for m in messages if isinstance(m, BaseChatMessage))
+        if not self.missing:
+            self._terminated = True
+            return StopMessage(
+                content=f"All {len(self.required)} required agents have reported", source="SpecialistsReportedTermination"
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._reported.clear()
+        self._terminated = False
+
+
+class DeadlineTermination(TerminationCondition):
+    """
+    Stops at the first message or event after a wall-clock deadline. The clock
+    starts at the task's first message, so a team built long before it runs
+    (or reused across tasks) still gets the full deadline per task. Group chats
+    check termination only between agent turns, so a deadline that passes
+    mid-turn stops the team once that agent's turn has finished, not while its
+    tools are still running.
+
+    :param seconds: Deadline in seconds from the start of the task.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self._started: Optional[float] = None
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[StopMessage]:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        if now - self._started >= self.seconds:
+            self._terminated = True
+            return StopMessage(content=f"Deadline of {self.seconds:g}s reached", source="DeadlineTermination")
+        return None
+
+    async def reset(self) -> None:
+        self._started = None
+        self._terminated = False
+
+
+@dataclass
+class TerminationRecord:
+    """Which condition(s) stopped one task, and when."""
+
+    task: str
+    fired: List[str]
+    reason: str
+    messages: int
+    elapsed: float
+    recorded_at: float = field(default_factory=time.time)
+
+
+class TerminationTelemetry:
+    """
+    Records which termination condition stopped each task, with the number of
+    chat messages and the wall time it took.
+
+    :param export_path: Optional JSONL file that every record is appended to.
+    """
+
+    def __init__(self, export_path: Optional[str] = None) -> None:
+        self.export_path = export_path
+        self.records: List[TerminationRecord] = []
+        self._lock = threading.Lock()
+
+    def monitor(self, condition: TerminationCondition, task: Optional[str] = None) -> "MonitoredTermination":
+        """
+        Wraps a (combined) termination condition so that every stop is recorded.
+
+        :param condition: The team's termination condition.
+        :param task: Task label for the records; the first 80 characters of the task message if omitted.
+        """
+        return MonitoredTermination(condition, self, task)
+
+    def record(self, record: TerminationRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    @property
+    def fired_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for record in list(self.records):
+            for name in record.fired:
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        records = list(self.records)
+        if not records:
+            return "No tasks stopped yet"
+        mean_messages = sum(r.messages for r in records) / len(records)
+        mean_elapsed = sum(r.elapsed for r in records) / len(records)
+        lines = [
+            f"{len(records)} tasks, {mean_messages:.1f} messages and {mean_elapsed:.1f}s per task",
+            f"{'condition':<34}{'fired':>7}{'share':>8}",
+        ]
+        for name, count in sorted(self.fired_counts.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<34}{count:>7}{count / len(records):>8.0%}")
+        return "\n".join(lines)
+
+
+class MonitoredTermination(TerminationCondition):
+    """Delegates to a termination condition and reports every stop to a TerminationTelemetry."""
+
+    def __init__(self, condition: TerminationCondition, telemetry: TerminationTelemetry, task: Optional[str] = None) -> None:
+        self.condition = condition
+        self.telemetry = telemetry
+        self.task = task
+        self._label: Optional[str] = None
+        self._started: Optional[float] = None
+        self._messages = 0
+
+    @property
+    def terminated(self) -> bool:
+        return self.condition.terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[StopMessage]:
+        if self._started is None:
+            self._started = time.perf_counter()
+            first = next((m for m in messages if isinstance(m, BaseChatMessage)), None)
+            self._label = self.task or (" ".join(first.to_text().split())[:80] if first is not None else "")
+        self._messages += sum(1 for m in messages if isinstance(m, BaseChatMessage))
+        stop = await self.condition(messages)
+        if stop is not None:
+            self.telemetry.record(
+                TerminationRecord(
+                    task=self._label or "",
+                    fired=[source.strip() for source in stop.source.split(",")],
+                    reason=stop.content,
+                    messages=self._messages,
+                    elapsed=time.perf_counter() - self._started,
+                )
+            )
+        return stop
+
+    async def reset(self) -> None:
+        await self.condition.reset()
+        self._label = None
+        self._started = None
+        self._messages = 0
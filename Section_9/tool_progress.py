@@ -0,0 +1,272 @@
+"""
+Streams the answers of Section_9 sub-agent tools into a team's output.
+
+The research tools used to wait for ``create_and_process_run`` to finish and
+only then return the sub-agent's answer, so nothing appeared on the console
+for tens of seconds. The helpers here run the sub-agent with ``create_stream``
+instead and forward its message deltas to a ToolProgress channel. ``merge``
+wraps a team's ``run_stream`` and prints the forwarded output between the
+team's messages as it arrives, so Console still sees only the team's own
+messages and events:
+
+    tool_progress = ToolProgress()
+
+    async def news_analysis_tool(stock_name: str) -> str:
+        ...
+        answer, run = await stream_answer_async(agents, thread.id, agent.id, "news_analysis_tool", tool_progress)
+        return answer
+
+    await Console(tool_progress.merge(team.run_stream(task=...)))
+
+Deltas are buffered per tool and forwarded a line (or ``flush_chars``
+characters) at a time, prefixed with the tool name, so concurrent tools stay
+readable. Nothing is buffered while no team stream is being merged, e.g. in
+batch mode. A ToolProgress is merged into one team stream at a time; teams
+running concurrently each need their own. ``delta`` may be called from worker
+threads, so sync sub-agent calls can run in ``asyncio.to_thread`` and still
+stream.
+"""
+
+import asyncio
+import threading
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from azure.ai.projects.models import (
+    AgentEventHandler,
+    AsyncAgentEventHandler,
+    MessageDeltaChunk,
+    ThreadMessage,
+    ThreadRun,
+)
+
+
+class _ProgressLine(NamedTuple):
+    source: str
+    text: str
+
+
+class ToolProgress:
+    """
+    Channel carrying partial tool output into a merged team stream.
+
+    :param flush_chars: Buffered characters after which a partial line is forwarded at the last space.
+    """
+
+    def __init__(self, flush_chars: int = 100) -> None:
+        self.flush_chars = flush_chars
+        self._queue: Optional["asyncio.Queue[Any]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def listening(self) -> bool:
+        return self._queue is not None
+
+    def _close(self, queue: "asyncio.Queue[Any]") -> None:
+        with self._lock:
+            if self._queue is queue:
+                self._queue = self._loop = None
+                self._buffers.clear()
+
+    def _put(self, source: str, text: str) -> None:
+        queue, loop = self._queue, self._loop
+        if queue is None or loop is None:
+            return
+        line = _ProgressLine(source, text)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            queue.put_nowait(line)
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, line)
+
+    def delta(self, source: str, text: str) -> None:
+        """
+        Adds a piece of a tool's output; complete lines are forwarded right away.
+
+        :param source: Tool name shown in front of the output.
+        :param text: The new text.
+        """
+        if not self.listening or not text:
+            return
+        lines: List[str] = []
+        with self._lock:
+            buffer = self._buffers.get(source, "") + text
+            *complete, buffer = buffer.split("\n")
+            lines.extend(line for line in complete if line.strip())
+            if len(buffer) >= self.flush_chars:
+                cut = buffer.rfind(" ", 0, len(buffer))
+                cut = cut if cut > 0 else len(buffer)
+                lines.append(buffer[:cut])
+                buffer = buffer[cut:].lstrip()
+            self._buffers[source] = buffer
+        for line in lines:
+            self._put(source, line)
+
+    def done(self, source: str) -> None:
+        """Forwards whatever is left of a tool's output."""
+        with self._lock:
+            rest = self._buffers.pop(source, "")
+        if rest.strip():
+            self._put(source, rest)
+
+    async def merge(self, stream: AsyncIterator[Any]) -> AsyncGenerator[Any, None]:
+        """
+        Yields the items of a team's ``run_stream`` unchanged and prints the tool
+        output forwarded while it runs. The team's TaskResult is still the last item.
+
+        :param stream: The team stream, e.g. ``team.run_stream(task=...)``.
+        :raises RuntimeError: If this ToolProgress is already merged into another stream.
+        """
+        if self._queue is not None:
+            raise RuntimeError("ToolProgress is already merged into another team stream; use one per concurrent team")
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        finished = object()
+        failure: List[BaseException] = []
+
+        async def pump() -> None:
+            try:
+                async for item in stream:
+                    await queue.put(item)
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                self._close(queue)
+                await queue.put(finished)
+
+        self._loop, self._queue = asyncio.get_running_loop(), queue
+        task = asyncio.ensure_future(pump())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, _ProgressLine):
+                    print(f"[{item.source}] {item.text}", flush=True)
+                    continue
+                yield item
+            if failure:
+                raise failure[0]
+        finally:
+            self._close(queue)
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+
+def _message_text(message: ThreadMessage) -> Optional[str]:
+    for content in message.content or []:
+        text = getattr(content, "text", None)
+        if text is not None and getattr(text, "value", None) is not None:
+            return text.value
+    return None
+
+
+class StreamedAnswerHandler(AgentEventHandler[None]):
+    """
+    Collects a streamed sub-agent answer and forwards its deltas to a ToolProgress.
+
+    :param source: Tool name the output is shown under.
+    :param progress: Optional channel receiving the deltas.
+    """
+
+    def __init__(self, source: str, progress: Optional[ToolProgress] = None) -> None:
+        super().__init__()
+        self.source = source
+        self.progress = progress
+        self.parts: List[str] = []
+        self.message_text: Optional[str] = None
+        self.run: Optional[ThreadRun] = None
+
+    @property
+    def answer(self) -> str:
+        return self.message_text if self.message_text is not None else "".join(self.parts)
+
+    def on_message_delta(self, delta: "MessageDeltaChunk") -> None:
+        self.parts.append(delta.text)
+        if self.progress is not None:
+            self.progress.delta(self.source, delta.text)
+
+    def on_thread_message(self, message: "ThreadMessage") -> None:
+        if message.status == "completed" and message.role == "assistant":
+            self.message_text = _message_text(message)
+
+    def on_thread_run(self, run: "ThreadRun") -> None:
+        self.run = run
+
+
+class AsyncStreamedAnswerHandler(AsyncAgentEventHandler[None]):
+    """
+    Async form of StreamedAnswerHandler.
+
+    :param source: Tool name the output is shown under.
+    :param progress: Optional channel receiving the deltas.
+    """
+
+    def __init__(self, source: str, progress: Optional[ToolProgress] = None) -> None:
+        super().__init__()
+        self.source = source
+        self.progress = progress
+        self.parts: List[str] = []
+        self.message_text: Optional[str] = None
+        self.run: Optional[ThreadRun] = None
+
+    @property
+    def answer(self) -> str:
+        return self.message_text if self.message_text is not None else "".join(self.parts)
+
+    async def on_message_delta(self, delta: "MessageDeltaChunk") -> None:
+        self.parts.append(delta.text)
+        if self.progress is not None:
+            self.progress.delta(self.source, delta.text)
+
+    async def on_thread_message(self, message: "ThreadMessage") -> None:
+        if message.status == "completed" and message.role == "assistant":
+            self.message_text = _message_text(message)
+
+    async def on_thread_run(self, run: "ThreadRun") -> None:
+        self.run = run
+
+
+def stream_answer(
+    agents: Any, thread_id: str, agent_id: str, source: str, progress: Optional[ToolProgress] = None, **run_kwargs: Any
+) -> Tuple[str, Optional[ThreadRun]]:
+    """
+    Runs a sub-agent on a thread with ``create_stream`` and returns its answer and final run.
+
+    :param agents: ``project_client.agents`` of the sync client.
+    :param thread_id: Thread holding the question.
+    :param agent_id: The sub-agent.
+    :param source: Tool name the streamed output is shown under.
+    :param progress: Optional channel receiving the deltas.
+    :param run_kwargs: Further ``create_stream`` arguments, e.g. run-level ``instructions``.
+    """
+    handler = StreamedAnswerHandler(source, progress)
+    try:
+        with agents.create_stream(thread_id=thread_id, agent_id=agent_id, event_handler=handler, **run_kwargs) as stream:
+            stream.until_done()
+    finally:
+        if progress is not None:
+            progress.done(source)
+    return handler.answer, handler.run
+
+
+async def stream_answer_async(
+    agents: Any, thread_id: str, agent_id: str, source: str, progress: Optional[ToolProgress] = None, **run_kwargs: Any
+) -> Tuple[str, Optional[ThreadRun]]:
+    """
+    Async form of ``stream_answer``, for ``project_client.agents`` of the async client.
+    """
+    handler = AsyncStreamedAnswerHandler(source, progress)
+    try:
+        async with await agents.create_stream(
+            thread_id=thread_id, agent_id=agent_id, event_handler=handler, **run_kwargs
+        ) as stream:
+            await stream.until_done()
+    finally:
+        if progress is not None:
+            progress.done(source)
+    return handler.answer, handler.run
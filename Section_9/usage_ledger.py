@@ -0,0 +1,409 @@
+"""
+Token usage ledger and budgets for the Section_9 teams.
+
+A team task multiplies model calls: every AssistantAgent turn calls the team's
+model client, and its tools start Azure AI agent runs of their own. The
+ledger collects the prompt and completion tokens of both, per team turn (from
+the ``models_usage`` of the team's messages) and per sub-agent run (from the
+``usage`` of the finished ThreadRun), and totals them per task.
+
+A UsageBudget bounds a task by tokens, sub-agent runs or cost. Once the budget
+is spent, BudgetTermination stops the RoundRobinGroupChat at the end of the
+current turn, and ``TaskLedger.check`` makes sub-agent tools refuse to start
+new runs. The task being recorded is tracked with a context variable, so tool
+functions called by the team record into the right task without extra
+arguments:
+
+    usage_ledger = UsageLedger(UsageBudget.from_env(), export_path="usage.jsonl")
+    team = RoundRobinGroupChat(agents, termination_condition=text_termination | BudgetTermination(usage_ledger))
+
+    with usage_ledger.task("Tesla") as task:
+        await Console(team.run_stream(task=...))
+    print(task.summary())
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+
+
+def _env_number(name: str, cast: Any) -> Any:
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised by ``TaskLedger.check`` when a task has spent its budget."""
+
+
+@dataclass
+class UsageBudget:
+    """
+    Hard limits for one task. Unset limits are not enforced.
+
+    :param max_total_tokens: Prompt plus completion tokens across the team and its sub-agents.
+    :param max_prompt_tokens: Prompt tokens across the team and its sub-agents.
+    :param max_completion_tokens: Completion tokens across the team and its sub-agents.
+    :param max_sub_agent_runs: Number of sub-agent runs the task may start.
+    :param max_cost: Cost in the currency of the ledger's prices.
+    """
+
+    max_total_tokens: Optional[int] = None
+    max_prompt_tokens: Optional[int] = None
+    max_completion_tokens: Optional[int] = None
+    max_sub_agent_runs: Optional[int] = None
+    max_cost: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "UsageBudget":
+        """Reads the limits from USAGE_MAX_TOTAL_TOKENS, USAGE_MAX_PROMPT_TOKENS, USAGE_MAX_COMPLETION_TOKENS,
+        USAGE_MAX_SUB_AGENT_RUNS and USAGE_MAX_COST."""
+        return cls(
+            max_total_tokens=_env_number("USAGE_MAX_TOTAL_TOKENS", int),
+            max_prompt_tokens=_env_number("USAGE_MAX_PROMPT_TOKENS", int),
+            max_completion_tokens=_env_number("USAGE_MAX_COMPLETION_TOKENS", int),
+            max_sub_agent_runs=_env_number("USAGE_MAX_SUB_AGENT_RUNS", int),
+            max_cost=_env_number("USAGE_MAX_COST", float),
+        )
+
+
+@dataclass
+class TokenPrices:
+    """Prices per 1,000 tokens, used to put a cost on the ledger."""
+
+    prompt_per_1k: float = 0.0
+    completion_per_1k: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "TokenPrices":
+        """Reads USAGE_PROMPT_PRICE_PER_1K and USAGE_COMPLETION_PRICE_PER_1K."""
+        return cls(
+            prompt_per_1k=float(os.getenv("USAGE_PROMPT_PRICE_PER_1K", "0")),
+            completion_per_1k=float(os.getenv("USAGE_COMPLETION_PRICE_PER_1K", "0")),
+        )
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.prompt_per_1k + completion_tokens * self.completion_per_1k) / 1000
+
+
+@dataclass
+class UsageEntry:
+    """
+    Tokens of one team turn (``kind="turn"``) or one sub-agent run (``kind="sub_agent_run"``).
+    ``turn`` is the team turn the entry belongs to; sub-agent runs belong to the turn that called them.
+    """
+
+    task: str
+    kind: str
+    source: str
+    turn: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    run_id: Optional[str] = None
+    status: Optional[str] = None
+    elapsed: float = 0.0
+    recorded_at: float = field(default_factory=time.time)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class UsageTotals:
+    """Token, run and cost totals of a task or of one source within it."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    turns: int = 0
+    sub_agent_runs: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, entry: UsageEntry) -> None:
+        self.prompt_tokens += entry.prompt_tokens
+        self.completion_tokens += entry.completion_tokens
+        self.cost += entry.cost
+        if entry.kind == "turn":
+            self.turns += 1
+        else:
+            self.sub_agent_runs += 1
+
+    def __str__(self) -> str:
+        return (
+            f"prompt={self.prompt_tokens} completion={self.completion_tokens} total={self.total_tokens} "
+            f"cost={self.cost:.4f} turns={self.turns} sub_agent_runs={self.sub_agent_runs}"
+        )
+
+
+class TaskLedger:
+    """
+    Usage of one team task, by team turn and by sub-agent run.
+
+    :param name: Task name, e.g. the ticker being analysed.
+    :param budget: Limits for the task.
+    :param prices: Token prices used for the cost column.
+    :param on_entry: Optional callback receiving every entry as it is recorded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: Optional[UsageBudget] = None,
+        prices: Optional[TokenPrices] = None,
+        on_entry: Optional[Any] = None,
+    ) -> None:
+        self.name = name
+        self.budget = budget or UsageBudget()
+        self.prices = prices or TokenPrices()
+        self.entries: List[UsageEntry] = []
+        self.totals = UsageTotals()
+        self.by_source: Dict[str, UsageTotals] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._on_entry = on_entry
+        self._lock = threading.Lock()
+
+    def _add(self, entry: UsageEntry) -> UsageEntry:
+        with self._lock:
+            self.entries.append(entry)
+            self.totals.add(entry)
+            self.by_source.setdefault(entry.source, UsageTotals()).add(entry)
+        if self._on_entry is not None:
+            self._on_entry(entry)
+        return entry
+
+    def record_turn(self, source: str, messages: Sequence[Any]) -> UsageEntry:
+        """
+        Records one team turn from the messages and events the agent produced in it.
+
+        :param source: Name of the agent that took the turn.
+        :param messages: The turn's messages; those with ``models_usage`` are counted.
+        """
+        prompt_tokens = completion_tokens = 0
+        for message in messages:
+            usage = getattr(message, "models_usage", None)
+            if usage is not None:
+                prompt_tokens += usage.prompt_tokens
+                completion_tokens += usage.completion_tokens
+        return self._add(
+            UsageEntry(
+                task=self.name,
+                kind="turn",
+                source=source,
+                turn=self.totals.turns + 1,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cost=self.prices.cost(prompt_tokens, completion_tokens),
+            )
+        )
+
+    def record_run(self, source: str, run: Any, elapsed: float = 0.0) -> UsageEntry:
+        """
+        Records a finished sub-agent run from its ``usage``, which is empty for runs that never started.
+
+        :param source: Tool or sub-agent that started the run.
+        :param run: The ThreadRun returned by ``create_and_process_run`` or the last streamed run event.
+        :param elapsed: Wall time of the run in seconds.
+        """
+        usage = getattr(run, "usage", None)
+        prompt_tokens = (getattr(usage, "prompt_tokens", 0) or 0) if usage is not None else 0
+        completion_tokens = (getattr(usage, "completion_tokens", 0) or 0) if usage is not None else 0
+        return self._add(
+            UsageEntry(
+                task=self.name,
+                kind="sub_agent_run",
+                source=source,
+                turn=self.totals.turns + 1,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cost=self.prices.cost(prompt_tokens, completion_tokens),
+                run_id=getattr(run, "id", None),
+                status=str(getattr(run.status, "value", run.status)) if getattr(run, "status", None) else None,
+                elapsed=elapsed,
+            )
+        )
+
+    @property
+    def exhausted(self) -> Optional[str]:
+        """The first limit the task has reached, or None while it is within budget."""
+        budget, totals = self.budget, self.totals
+        if budget.max_total_tokens is not None and totals.total_tokens >= budget.max_total_tokens:
+            return f"total tokens {totals.total_tokens} >= {budget.max_total_tokens}"
+        if budget.max_prompt_tokens is not None and totals.prompt_tokens >= budget.max_prompt_tokens:
+            return f"prompt tokens {totals.prompt_tokens} >= {budget.max_prompt_tokens}"
+        if budget.max_completion_tokens is not None and totals.completion_tokens >= budget.max_completion_tokens:
+            return f"completion tokens {totals.completion_tokens} >= {budget.max_completion_tokens}"
+        if budget.max_sub_agent_runs is not None and totals.sub_agent_runs >= budget.max_sub_agent_runs:
+            return f"sub-agent runs {totals.sub_agent_runs} >= {budget.max_sub_agent_runs}"
+        if budget.max_cost is not None and totals.cost >= budget.max_cost:
+            return f"cost {totals.cost:.4f} >= {budget.max_cost:g}"
+        return None
+
+    def check(self) -> None:
+        """Raises BudgetExceeded if the task has spent its budget; call before starting a sub-agent run."""
+        reason = self.exhausted
+        if reason is not None:
+            raise BudgetExceeded(f"Usage budget of task {self.name} exhausted: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Task totals, per-source totals and the limit reached, for decision records."""
+        return {
+            "task": self.name,
+            **asdict(self.totals),
+            "total_tokens": self.totals.total_tokens,
+            "elapsed": round(self.elapsed or time.perf_counter() - self.started, 3),
+            "budget_exhausted": self.exhausted,
+            "by_source": {source: {**asdict(t), "total_tokens": t.total_tokens} for source, t in self.by_source.items()},
+        }
+
+    def summary(self) -> str:
+        lines = [
+            f"Usage of {self.name}: {self.totals}",
+            f"{'source':<28}{'turns':>6}{'runs':>6}{'prompt':>10}{'completion':>12}{'total':>10}{'cost':>10}",
+        ]
+        for source, t in sorted(self.by_source.items(), key=lambda item: -item[1].total_tokens):
+            lines.append(
+                f"{source:<28}{t.turns:>6}{t.sub_agent_runs:>6}{t.prompt_tokens:>10}"
+                f"{t.completion_tokens:>12}{t.total_tokens:>10}{t.cost:>10.4f}"
+            )
+        if self.exhausted:
+            lines.append(f"Budget exhausted: {self.exhausted}")
+        return "\n".join(lines)
+
+
+_current_task: "contextvars.ContextVar[Optional[TaskLedger]]" = contextvars.ContextVar("usage_task", default=None)
+
+
+class UsageLedger:
+    """
+    Per-task ledgers for every task run in the process, with JSONL export.
+
+    :param budget: Limits applied to every task.
+    :param prices: Token prices; read from the environment if omitted.
+    :param export_path: Optional JSONL file that every entry is appended to as it is recorded.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[UsageBudget] = None,
+        prices: Optional[TokenPrices] = None,
+        export_path: Optional[str] = None,
+    ) -> None:
+        self.budget = budget or UsageBudget()
+        self.prices = prices or TokenPrices.from_env()
+        self.export_path = export_path
+        self.tasks: Dict[str, TaskLedger] = {}
+        self._default: Optional[TaskLedger] = None
+        self._lock = threading.Lock()
+
+    def _write(self, entry: UsageEntry) -> None:
+        if self.export_path:
+            with self._lock:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({**asdict(entry), "total_tokens": entry.total_tokens}) + "\n")
+
+    @contextmanager
+    def task(self, name: str, budget: Optional[UsageBudget] = None) -> Iterator[TaskLedger]:
+        """
+        Makes a new task ledger current for the duration of the block. Team runs and
+        sub-agent tools started inside the block record into it.
+
+        :param name: Task name; a numeric suffix is added if it was used before.
+        :param budget: Limits for this task instead of the ledger's default budget.
+        """
+        with self._lock:
+            key = name
+            while key in self.tasks:
+                key = f"{name}#{len(self.tasks)}"
+            ledger = self.tasks[key] = TaskLedger(key, budget or self.budget, self.prices, self._write)
+        token = _current_task.set(ledger)
+        try:
+            yield ledger
+        finally:
+            _current_task.reset(token)
+            ledger.elapsed = time.perf_counter() - ledger.started
+
+    def current(self) -> TaskLedger:
+        """The task ledger of the running task, or a shared ``default`` task outside ``task()`` blocks."""
+        ledger = _current_task.get()
+        if ledger is not None:
+            return ledger
+        with self._lock:
+            if self._default is None:
+                self._default = self.tasks["default"] = TaskLedger("default", self.budget, self.prices, self._write)
+            return self._default
+
+    def record_run(self, source: str, run: Any, elapsed: float = 0.0) -> UsageEntry:
+        """Records a sub-agent run into the current task."""
+        return self.current().record_run(source, run, elapsed)
+
+    def check(self) -> None:
+        """Raises BudgetExceeded if the current task has spent its budget."""
+        self.current().check()
+
+    @property
+    def totals(self) -> UsageTotals:
+        totals = UsageTotals()
+        for ledger in list(self.tasks.values()):
+            for entry in list(ledger.entries):
+                totals.add(entry)
+        return totals
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        Writes every entry of every task to a JSONL file, one entry per line.
+
+        :return: The number of entries written.
+        """
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for ledger in list(self.tasks.values()):
+                for entry in list(ledger.entries):
+                    f.write(json.dumps({**asdict(entry), "total_tokens": entry.total_tokens}) + "\n")
+                    count += 1
+        return count
+
+
+class BudgetTermination(TerminationCondition):
+    """
+    Records the usage of every team turn into the current task and stops the team
+    once the task has spent its budget, including tokens spent by sub-agent runs.
+
+    :param usage_ledger: Ledger whose current task is charged.
+    """
+
+    def __init__(self, usage_ledger: UsageLedger) -> None:
+        self.usage_ledger = usage_ledger
+        self._reason: Optional[str] = None
+
+    @property
+    def terminated(self) -> bool:
+        return self._reason is not None
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[StopMessage]:
+        if self.terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        ledger = self.usage_ledger.current()
+        sources = [m.source for m in messages if isinstance(m, BaseChatMessage) and m.source != "user"]
+        if sources:
+            ledger.record_turn(sources[-1], messages)
+        self._reason = ledger.exhausted
+        if self._reason is not None:
+            return StopMessage(content=f"Usage budget exhausted: {self._reason}", source="BudgetTermination")
+        return None
+
+    async def reset(self) -> None:
+        self._reason = None
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the section samples.
+
+The samples are run from the repository root (for example
+``python Section_5/5_1_building_first_agent.py``), so each script adds the
+repository root to ``sys.path`` before importing from this package.
+"""
@@ -0,0 +1,95 @@
+"""
+Concurrent run execution on the async AIProjectClient.
+
+AsyncRunExecutor drives many independent conversations (one thread and one run
+each) from a single event loop. Waiting is done with RunWaiter.wait_async, so
+no run ever blocks the loop, and a semaphore bounds how many conversations
+are in flight at once.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+from agent_utils.run_waiter import RunWaiter
+
+
+@dataclass
+class RunOutcome:
+    """Result of one conversation run by AsyncRunExecutor."""
+
+    content: str
+    thread_id: Optional[str] = None
+    run_id: Optional[str] = None
+    status: Optional[str] = None
+    reply: Optional[str] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+class AsyncRunExecutor:
+    """
+    Runs prompts against one agent concurrently, each on its own thread.
+
+    :param project_client: Async AIProjectClient.
+    :param agent_id: Agent that answers every prompt.
+    :param max_concurrency: Maximum number of conversations in flight at once.
+    :param run_waiter: Waiter used for the runs. Defaults to polling with backoff; streaming
+        is not used here because hundreds of open streams cost more than sparse polls.
+    :param fetch_reply: Whether to read the agent's reply from the thread after the run.
+    """
+
+    def __init__(
+        self,
+        project_client: Any,
+        agent_id: str,
+        max_concurrency: int = 100,
+        run_waiter: Optional[RunWaiter] = None,
+        fetch_reply: bool = True,
+    ) -> None:
+        self.project_client = project_client
+        self.agent_id = agent_id
+        self.run_waiter = run_waiter or RunWaiter()
+        self.fetch_reply = fetch_reply
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, content: str) -> RunOutcome:
+        """
+        Sends one prompt on a new thread and awaits the run without blocking the loop.
+
+        :param content: The user message.
+        :return: The outcome; failures are recorded in ``error`` rather than raised.
+        """
+        agents = self.project_client.agents
+        outcome = RunOutcome(content=content)
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                thread = await agents.create_thread()
+                outcome.thread_id = thread.id
+                await agents.create_message(thread_id=thread.id, role="user", content=content)
+                run = await self.run_waiter.create_and_wait_async(
+                    agents, thread_id=thread.id, agent_id=self.agent_id, prefer_stream=False
+                )
+                outcome.run_id = run.id
+                outcome.status = str(getattr(run.status, "value", run.status))
+                if outcome.status == "failed":
+                    outcome.error = str(run.last_error)
+                elif self.fetch_reply:
+                    messages = await agents.list_messages(thread_id=thread.id)
+                    reply = messages.get_last_text_message_by_role("assistant")
+                    outcome.reply = reply.text.value if reply else None
+            except Exception as e:
+                outcome.error = str(e) or type(e).__name__
+            outcome.elapsed = time.perf_counter() - start
+        return outcome
+
+    async def run_many(self, contents: Iterable[str]) -> List[RunOutcome]:
+        """
+        Runs every prompt concurrently, up to ``max_concurrency`` at a time.
+
+        :param contents: The user messages.
+        :return: One outcome per prompt, in input order.
+        """
+        return await asyncio.gather(*(self.run(content) for content in contents))
@@ -0,0 +1,252 @@
+"""
+Concurrency-aware adapter for async function tools.
+
+AsyncFunctionTool calls sync tools (such as ``get_weather_by_location``)
+directly on the event loop, so one slow sync tool stalls every other
+thread and run served by the process. AsyncToolAdapter wraps every tool in
+a coroutine that
+
+* offloads sync tools to a bounded thread pool,
+* waits for a per-tool concurrency slot and rate-limit token, for example
+  an email quota of 10 sends per minute, and
+* records how long each call queued for those limits, separately from the
+  time the tool itself ran.
+
+The wrapped tools keep their names, signatures and docstrings, so the tool
+definitions sent to the service are unchanged.
+"""
+
+import asyncio
+import collections
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from azure.ai.projects.models import AsyncFunctionTool, FunctionTool
+
+
+@dataclass
+class ToolLimits:
+    """
+    Limits applied to one tool.
+
+    :param max_concurrency: Calls allowed to run at once, or None for no limit.
+    :param calls: Calls allowed per ``per_seconds`` window, or None for no rate limit.
+    :param per_seconds: Length of the rate-limit window.
+    """
+
+    max_concurrency: Optional[int] = None
+    calls: Optional[int] = None
+    per_seconds: float = 1.0
+
+
+@dataclass
+class ToolMetrics:
+    """Per-tool counters. Queue delay is the time spent waiting for a concurrency slot or rate token."""
+
+    calls: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    queue_seconds: float = 0.0
+    max_queue_seconds: float = 0.0
+    run_seconds: float = 0.0
+    recent_queue_delays: Deque[float] = field(default_factory=lambda: collections.deque(maxlen=1000))
+
+    @property
+    def mean_queue_delay(self) -> float:
+        return self.queue_seconds / self.calls if self.calls else 0.0
+
+    @property
+    def p95_queue_delay(self) -> float:
+        if not self.recent_queue_delays:
+            return 0.0
+        delays = sorted(self.recent_queue_delays)
+        return delays[min(len(delays) - 1, int(len(delays) * 0.95))]
+
+    @property
+    def mean_run_time(self) -> float:
+        return self.run_seconds / self.calls if self.calls else 0.0
+
+
+class _RateLimiter:
+    # Token bucket refilled continuously; waiters are served in arrival order
+
+    def __init__(self, calls: int, per_seconds: float) -> None:
+        self.capacity = float(calls)
+        self.refill_rate = calls / per_seconds
+        self.tokens = float(calls)
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.refill_rate)
+
+
+class _AdaptedFunctions(Mapping[str, Callable[..., Any]]):
+    # Wraps the functions of a FunctionTool on first lookup, so lazily imported tools stay lazy
+
+    def __init__(self, adapter: "AsyncToolAdapter", functions: Mapping[str, Callable[..., Any]]) -> None:
+        self._adapter = adapter
+        self._functions = functions
+        self._wrapped: Dict[str, Callable[..., Any]] = {}
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrapped[name] = self._adapter.wrap(self._functions[name])
+        return wrapped
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._functions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._functions)
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+
+class AdaptedAsyncFunctionTool(AsyncFunctionTool):
+    """
+    AsyncFunctionTool whose calls go through an AsyncToolAdapter.
+
+    :param adapter: Adapter that applies the offloading and limits.
+    :param function_tool: Tool that provides the definitions and the underlying functions.
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, adapter: "AsyncToolAdapter", function_tool: Union[FunctionTool, AsyncFunctionTool]
+    ) -> None:
+        self._functions = _AdaptedFunctions(adapter, function_tool._functions)  # type: ignore[assignment]
+        self._definitions = function_tool.definitions
+
+
+class AsyncToolAdapter:
+    """
+    Runs async tool calls without blocking the event loop, within per-tool limits.
+
+    :param max_workers: Threads available to sync tools, shared by all tools.
+    :param limits: Per-tool limits by function name.
+    :param default_limits: Limits for tools not listed in ``limits``.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        limits: Optional[Dict[str, ToolLimits]] = None,
+        default_limits: Optional[ToolLimits] = None,
+    ) -> None:
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or ToolLimits()
+        self.metrics: Dict[str, ToolMetrics] = collections.defaultdict(ToolMetrics)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-tool")
+        # Created on first call, so they belong to the loop that runs the tools
+        self._gates_by_tool: Dict[str, Tuple[Optional[asyncio.Semaphore], Optional[_RateLimiter]]] = {}
+        self._setup_lock = threading.Lock()
+
+    def _gates(self, name: str) -> Tuple[Optional[asyncio.Semaphore], Optional[_RateLimiter]]:
+        with self._setup_lock:
+            gates = self._gates_by_tool.get(name)
+            if gates is None:
+                limits = self.limits.get(name, self.default_limits)
+                gates = self._gates_by_tool[name] = (
+                    asyncio.Semaphore(limits.max_concurrency) if limits.max_concurrency else None,
+                    _RateLimiter(limits.calls, limits.per_seconds) if limits.calls else None,
+                )
+            return gates
+
+    def wrap(self, function: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Returns a coroutine function that calls ``function`` within its tool's limits.
+
+        :param function: Sync or async tool function; its name selects the limits.
+        """
+        name = function.__name__
+        is_async = inspect.iscoroutinefunction(function)
+
+        def run_in_thread(*args: Any, **kwargs: Any) -> Tuple[float, Any]:
+            # Reports when a worker picked the call up, so time spent waiting for a thread counts as queueing
+            return time.monotonic(), function(*args, **kwargs)
+
+        @functools.wraps(function)
+        async def adapted(*args: Any, **kwargs: Any) -> Any:
+            semaphore, rate_limiter = self._gates(name)
+            metrics = self.metrics[name]
+            queued = time.monotonic()
+            # Rate-limit first, so calls waiting for a token do not hold a concurrency slot
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            if semaphore is not None:
+                await semaphore.acquire()
+            metrics.in_flight += 1
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            started = queued
+            try:
+                if is_async:
+                    started = time.monotonic()
+                    return await function(*args, **kwargs)
+                loop = asyncio.get_running_loop()
+                started, result = await loop.run_in_executor(self._pool, functools.partial(run_in_thread, *args, **kwargs))
+                return result
+            except Exception:
+                metrics.failures += 1
+                raise
+            finally:
+                finished = time.monotonic()
+                delay = started - queued if started > queued else 0.0
+                metrics.calls += 1
+                metrics.in_flight -= 1
+                metrics.queue_seconds += delay
+                metrics.max_queue_seconds = max(metrics.max_queue_seconds, delay)
+                metrics.recent_queue_delays.append(delay)
+                metrics.run_seconds += finished - max(started, queued)
+                if semaphore is not None:
+                    semaphore.release()
+
+        return adapted
+
+    def function_tool(
+        self, functions: Union[FunctionTool, AsyncFunctionTool, Iterable[Callable[..., Any]]]
+    ) -> AdaptedAsyncFunctionTool:
+        """
+        Adapts a set of tools for AsyncToolSet.
+
+        :param functions: Tool functions, or a FunctionTool/AsyncFunctionTool (including a registry's lazy tools).
+        :return: An AsyncFunctionTool with the same definitions.
+        """
+        if not isinstance(functions, (FunctionTool, AsyncFunctionTool)):
+            functions = AsyncFunctionTool(set(functions))
+        return AdaptedAsyncFunctionTool(self, functions)
+
+    def summary(self) -> str:
+        lines = [f"{'tool':<32}{'calls':>7}{'fail':>6}{'peak':>6}{'queue_mean_ms':>15}{'queue_p95_ms':>14}{'run_mean_ms':>13}"]
+        for name, m in sorted(self.metrics.items()):
+            lines.append(
+                f"{name:<32}{m.calls:>7}{m.failures:>6}{m.max_in_flight:>6}"
+                f"{m.mean_queue_delay * 1000:>15.1f}{m.p95_queue_delay * 1000:>14.1f}{m.mean_run_time * 1000:>13.1f}"
+            )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self) -> "AsyncToolAdapter":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
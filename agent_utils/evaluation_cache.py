@@ -0,0 +1,338 @@
+"""
+Persistent cache of evaluator scores.
+
+Every run of 7_6 used to send every record to every LLM-judged evaluator
+again, although most records, evaluators and the judge deployment had not
+changed. EvaluationScoreCache stores each score under
+
+    (record hash, evaluator name, evaluator version, judge deployment)
+
+where the record hash is the SHA-256 of the record as canonical JSON. A
+changed conversation, a new evaluator release or a different judge model
+therefore misses the cache, and everything else is answered from it.
+
+The cache is a SQLite file (standard library; safe to share between the
+threads of a runner and between processes). Entries are dropped with the
+invalidation command:
+
+    python -m agent_utils.evaluation_cache stats
+    python -m agent_utils.evaluation_cache invalidate --evaluator tool_call_accuracy
+    python -m agent_utils.evaluation_cache invalidate --judge gpt-4o --older-than-days 30
+    python -m agent_utils.evaluation_cache invalidate --all
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agent_utils.trace_format import read_trace
+
+DEFAULT_SCORE_CACHE_PATH = os.getenv("EVAL_SCORE_CACHE_PATH", ".evaluation_scores.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    record_hash TEXT NOT NULL,
+    evaluator TEXT NOT NULL,
+    evaluator_version TEXT NOT NULL,
+    judge TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (record_hash, evaluator, evaluator_version, judge)
+)
+"""
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """SHA-256 of a record as canonical JSON, so key order and whitespace do not matter."""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _package_version(module_name: str) -> str:
+    # Nearest __version__ up the module path, e.g. azure.ai.evaluation.__version__
+    parts = module_name.split(".")
+    for i in range(len(parts), 0, -1):
+        version = getattr(sys.modules.get(".".join(parts[:i])), "__version__", None)
+        if version:
+            return str(version)
+    return "unknown"
+
+
+def evaluator_version(evaluator: Any) -> str:
+    """
+    Version string of an evaluator: its ``version`` attribute if it has one, otherwise its
+    class and the version of the package that ships it.
+    """
+    explicit = getattr(evaluator, "version", None)
+    if isinstance(explicit, str):
+        return explicit
+    # Plain functions are versioned by their own name, evaluator objects by their class
+    owner = evaluator if inspect.isfunction(evaluator) or isinstance(evaluator, type) else type(evaluator)
+    return f"{owner.__module__}.{owner.__qualname__}@{_package_version(owner.__module__)}"
+
+
+def judge_deployment(model_config: Any) -> str:
+    """Deployment name of an evaluator model config (dict or object), used as the judge part of the key."""
+    if isinstance(model_config, dict):
+        return str(model_config.get("azure_deployment") or model_config.get("model") or "")
+    return str(getattr(model_config, "azure_deployment", "") or "")
+
+
+@dataclass
+class ScoreCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EvaluationScoreCache:
+    """
+    SQLite-backed evaluator score cache.
+
+    :param path: Location of the cache file; created if missing.
+    :param judge: Judge deployment the evaluators use, e.g. ``judge_deployment(model_config)``.
+    """
+
+    def __init__(self, path: str = DEFAULT_SCORE_CACHE_PATH, judge: str = "") -> None:
+        self.path = path
+        self.judge = judge
+        self.stats = ScoreCacheStats()
+        self._versions: Dict[int, str] = {}
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite connections are not shared across threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _version(self, evaluator: Any) -> str:
+        version = self._versions.get(id(evaluator))
+        if version is None:
+            version = self._versions[id(evaluator)] = evaluator_version(evaluator)
+        return version
+
+    def get(self, digest: str, name: str, evaluator: Any) -> Tuple[bool, Any]:
+        """
+        Looks up a score.
+
+        :param digest: ``record_hash`` of the record.
+        :param name: Evaluator name, as used in the result rows.
+        :param evaluator: The evaluator, for its version.
+        :return: ``(True, result)`` on a hit, ``(False, None)`` otherwise.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT result FROM scores WHERE record_hash=? AND evaluator=? AND evaluator_version=? AND judge=?",
+                (digest, name, self._version(evaluator), self.judge),
+            )
+            .fetchone()
+        )
+        with self._stats_lock:
+            if row is None:
+                self.stats.misses += 1
+                return False, None
+            self.stats.hits += 1
+        return True, json.loads(row[0])
+
+    def put(self, digest: str, name: str, evaluator: Any, result: Any) -> None:
+        """Stores a successful evaluator result."""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, name, self._version(evaluator), self.judge, json.dumps(result, default=str), time.time()),
+            )
+        with self._stats_lock:
+            self.stats.stored += 1
+
+    def invalidate(
+        self,
+        evaluator: Optional[str] = None,
+        judge: Optional[str] = None,
+        record: Optional[str] = None,
+        older_than: Optional[float] = None,
+    ) -> int:
+        """
+        Deletes matching entries; with no filter, deletes everything.
+
+        :param evaluator: Evaluator name.
+        :param judge: Judge deployment.
+        :param record: Record hash.
+        :param older_than: Only entries created more than this many seconds ago.
+        :return: Number of entries deleted.
+        """
+        clauses, params = [], []
+        for column, value in (("evaluator", evaluator), ("judge", judge), ("record_hash", record)):
+            if value is not None:
+                clauses.append(f"{column}=?")
+                params.append(value)
+        if older_than is not None:
+            clauses.append("created_at<?")
+            params.append(time.time() - older_than)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connection() as connection:
+            return connection.execute(f"DELETE FROM scores{where}", params).rowcount
+
+    def counts(self) -> List[Tuple[str, str, str, int]]:
+        """Entries per (evaluator, version, judge)."""
+        return self._connection().execute(
+            "SELECT evaluator, evaluator_version, judge, COUNT(*) FROM scores GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+        ).fetchall()
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the records of an evaluation JSONL file such as ``evaluation_input_data.jsonl``.
+
+    Trace files written by ``agent_utils.trace_format`` and gzip-compressed files are read too.
+    """
+    return read_trace(path)
+
+
+def record_tool_names(record: Dict[str, Any]) -> List[str]:
+    """Names of the tools a converted record called, in call order and without repeats."""
+    names: Dict[str, None] = {}
+    for message in record.get("response") or []:
+        if isinstance(message, dict) and isinstance(message.get("content"), list):
+            for content in message["content"]:
+                if isinstance(content, dict) and content.get("type") == "tool_call" and content.get("name"):
+                    names[content["name"]] = None
+    return list(names)
+
+
+def evaluate_with_cache(
+    name: str, evaluator: Callable[..., Any], record: Dict[str, Any], cache: Optional[EvaluationScoreCache], digest: str
+) -> Tuple[Any, Optional[str], bool]:
+    """
+    Scores one record with one evaluator, through the cache when one is given.
+
+    :return: ``(result, error, cached)``; failures are returned as an error string and never cached.
+    """
+    if cache is not None:
+        hit, result = cache.get(digest, name, evaluator)
+        if hit:
+            return result, None, True
+    try:
+        result = evaluator(**record)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", False
+    if cache is not None:
+        cache.put(digest, name, evaluator, result)
+    return result, None, False
+
+
+def score_records(
+    records: Iterable[Dict[str, Any]],
+    evaluators: Dict[str, Callable[..., Any]],
+    cache: Optional[EvaluationScoreCache] = None,
+    max_workers: int = 16,
+) -> List[Dict[str, Any]]:
+    """
+    Scores records with every evaluator in parallel, paying only for cache misses.
+
+    :return: One row per record, in input order, with ``record_hash``, ``tools`` (tools the record called),
+        ``scores``, ``cached`` (evaluators answered from the cache) and ``errors`` when any evaluator failed.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evaluator") as pool:
+        submitted = []
+        for record in records:
+            digest = record_hash(record)
+            futures = {
+                name: pool.submit(evaluate_with_cache, name, evaluator, record, cache, digest)
+                for name, evaluator in evaluators.items()
+            }
+            submitted.append((digest, record_tool_names(record), futures))
+
+        rows = []
+        for digest, tools, futures in submitted:
+            row: Dict[str, Any] = {"record_hash": digest, "tools": tools, "scores": {}, "cached": []}
+            for name, future in futures.items():
+                result, error, cached = future.result()
+                if error is not None:
+                    row.setdefault("errors", {})[name] = error
+                    continue
+                row["scores"][name] = result
+                if cached:
+                    row["cached"].append(name)
+            rows.append(row)
+    return rows
+
+
+def aggregate_scores(rows: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Recomputes aggregate metrics from result rows, whether their scores were cached or fresh.
+
+    Numeric fields (other than thresholds) are averaged as ``<evaluator>.<field>``; ``*_result`` fields holding
+    ``pass``/``fail`` become ``<evaluator>.<field>_pass_rate``.
+    """
+    totals: Dict[str, List[float]] = {}
+    for row in rows:
+        for name, result in (row.get("scores") or {}).items():
+            if not isinstance(result, dict):
+                continue
+            for field, value in result.items():
+                if isinstance(value, bool) or field.endswith("_threshold"):
+                    continue
+                if isinstance(value, (int, float)):
+                    totals.setdefault(f"{name}.{field}", []).append(float(value))
+                elif field.endswith("_result") and value in ("pass", "fail"):
+                    totals.setdefault(f"{name}.{field}_pass_rate", []).append(1.0 if value == "pass" else 0.0)
+    return {metric: sum(values) / len(values) for metric, values in sorted(totals.items())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the evaluation score cache.")
+    parser.add_argument("--path", default=DEFAULT_SCORE_CACHE_PATH, help="Cache file (EVAL_SCORE_CACHE_PATH).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show entries per evaluator, version and judge.")
+    invalidate = commands.add_parser("invalidate", help="Delete cached scores.")
+    invalidate.add_argument("--evaluator", help="Only this evaluator name.")
+    invalidate.add_argument("--judge", help="Only this judge deployment.")
+    invalidate.add_argument("--record", help="Only this record hash.")
+    invalidate.add_argument("--older-than-days", type=float, help="Only entries older than this.")
+    invalidate.add_argument("--all", action="store_true", help="Delete every entry.")
+    args = parser.parse_args()
+
+    cache = EvaluationScoreCache(args.path)
+    if args.command == "stats":
+        for name, version, judge, count in cache.counts():
+            print(f"{name:<28}{judge or '-':<16}{count:>8}  {version}")
+        return
+    filters = (args.evaluator, args.judge, args.record, args.older_than_days)
+    if all(value is None for value in filters) and not args.all:
+        parser.error("invalidate needs a filter, or --all to delete everything")
+    older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+    deleted = cache.invalidate(args.evaluator, args.judge, args.record, older_than)
+    print(f"[evaluation_cache] Deleted {deleted} cached scores from {args.path}")
+
+
+if __name__ == "__main__":
+    main()
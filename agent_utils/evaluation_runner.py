@@ -0,0 +1,296 @@
+"""
+Streaming, resumable evaluation of agent threads.
+
+The 7_6 sample converts one thread and runs each evaluator on it in turn.
+EvaluationRunner handles thousands of threads:
+
+* thread IDs are streamed from any iterable (for example a file read line by
+  line), and only a bounded number are in flight at once,
+* threads are converted concurrently with ``AIAgentConverter``,
+* each converted record is fanned out to all evaluators in parallel on a
+  bounded pool,
+* one JSONL row per record is appended and flushed as soon as its scores
+  are in.
+
+Rows carry the thread ID, run ID, whether the whole thread or a single run
+was asked for, the number of records in the thread, the record hash and the
+tools the record called. A rerun over the same output file skips threads
+that are complete and the records already scored in threads that are not;
+runs given as (thread ID, run ID) pairs are skipped one by one and never
+mark their thread complete. A row cut short by a crash is truncated before new
+rows are appended, and scored again. With an EvaluationScoreCache, records
+whose content was already scored by the same evaluator version and judge
+(in any earlier run or thread) are answered from the cache.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from agent_utils.evaluation_cache import EvaluationScoreCache, evaluate_with_cache, record_hash, record_tool_names
+
+# A thread ID, or a (thread ID, run ID) pair to evaluate a single run
+ThreadSource = Iterable[Union[str, Tuple[str, str]]]
+
+
+def read_thread_ids(path: str) -> Iterator[str]:
+    """
+    Streams thread IDs from a file, one per line, without loading the file.
+
+    Lines may also be JSON objects with a ``thread_id`` field, such as a previous score file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield json.loads(line)["thread_id"] if line.startswith("{") else line
+
+
+def drop_partial_line(path: str) -> None:
+    """
+    Truncates an unterminated last line, e.g. a row cut short by a crash, so
+    that the next appended row starts on a line of its own.
+
+    :param path: JSONL file; nothing happens if it does not exist.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(1 << 16, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            if pos == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(pos - step + newline + 1)
+                return
+            pos -= step
+        f.truncate(0)
+
+
+def record_run_id(record: Dict[str, Any]) -> Optional[str]:
+    """Returns the run a converted record belongs to, from its response messages."""
+    for message in record.get("response") or []:
+        if isinstance(message, dict) and message.get("run_id"):
+            return message["run_id"]
+    return None
+
+
+@dataclass
+class EvaluationReport:
+    """Counters of one ``EvaluationRunner.run`` call."""
+
+    threads: int = 0
+    threads_skipped: int = 0
+    records: int = 0
+    records_skipped: int = 0
+    evaluations: int = 0
+    cache_hits: int = 0
+    evaluation_errors: int = 0
+    conversion_errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.threads} threads ({self.threads_skipped} already done), {self.records} records scored "
+            f"({self.records_skipped} already done), {self.evaluations} evaluations "
+            f"({self.cache_hits} from cache), "
+            f"{self.evaluation_errors} evaluator errors, {self.conversion_errors} conversion errors "
+            f"in {self.elapsed:.1f}s; {self.records_per_sec:.2f} records/s"
+        )
+
+
+class EvaluationRunner:
+    """
+    Evaluates agent threads concurrently and appends the scores to a JSONL file.
+
+    :param converter: ``AIAgentConverter`` (or anything with ``prepare_evaluation_data`` and ``convert``).
+    :param evaluators: Evaluators by name, created once and shared by all records.
+    :param output_path: JSONL file the scores are appended to; also the resume state.
+    :param max_workers: Evaluator calls in flight at once, across all records.
+    :param convert_workers: Threads converted at once.
+    :param score_cache: Persistent score cache, or None to always call the evaluators.
+    :param retry_errors: On resume, score again the records whose evaluators failed; the new row
+        is appended after the failed one, so readers keep the last row per (thread ID, run ID).
+    """
+
+    def __init__(
+        self,
+        converter: Any,
+        evaluators: Dict[str, Callable[..., Any]],
+        output_path: str,
+        max_workers: int = 16,
+        convert_workers: int = 8,
+        score_cache: Optional[EvaluationScoreCache] = None,
+        retry_errors: bool = False,
+    ) -> None:
+        self.converter = converter
+        self.evaluators = dict(evaluators)
+        self.output_path = output_path
+        self.max_workers = max_workers
+        self.convert_workers = convert_workers
+        self.score_cache = score_cache
+        self.retry_errors = retry_errors
+        self._write_lock = threading.Lock()
+
+    def _load_progress(self) -> Tuple[Set[str], Set[Tuple[str, Optional[str]]]]:
+        # Completed threads, and scored (thread ID, run ID) records of incomplete ones. Only
+        # whole-thread rows say how many records a thread has: a run scored on its own says
+        # nothing about the thread's other runs
+        if not os.path.exists(self.output_path):
+            return set(), set()
+        scored: Set[Tuple[str, Optional[str]]] = set()
+        expected: Dict[str, int] = {}
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # partial line from an interrupted write
+                if self.retry_errors and row.get("errors"):
+                    continue
+                thread_id = row["thread_id"]
+                if row.get("scope", "thread") == "thread":
+                    expected[thread_id] = row.get("records_in_thread", 1)
+                if row.get("records_in_thread") != 0:
+                    scored.add((thread_id, row.get("run_id")))
+        counts: Dict[str, int] = {}
+        for thread_id, _ in scored:
+            counts[thread_id] = counts.get(thread_id, 0) + 1
+        done = {thread_id for thread_id, total in expected.items() if counts.get(thread_id, 0) >= total}
+        return done, {key for key in scored if key[0] not in done}
+
+    def _convert(self, thread_id: str, run_id: Optional[str]) -> List[Dict[str, Any]]:
+        if run_id is not None:
+            return [self.converter.convert(thread_id, run_id)]
+        return list(self.converter.prepare_evaluation_data(thread_ids=thread_id) or [])
+
+    def _evaluate(self, name: str, record: Dict[str, Any], digest: str) -> Tuple[str, Any, Optional[str], bool]:
+        # Evaluator errors (e.g. ToolCallAccuracyEvaluator on a run without tool calls) come back as strings
+        result, error, cached = evaluate_with_cache(name, self.evaluators[name], record, self.score_cache, digest)
+        return name, result, error, cached
+
+    def _write(self, out: Any, row: Dict[str, Any]) -> None:
+        line = json.dumps(row, default=str) + "\n"
+        with self._write_lock:
+            out.write(line)
+            out.flush()
+
+    def _process_thread(
+        self,
+        source_item: Union[str, Tuple[str, str]],
+        scored: Set[Tuple[str, Optional[str]]],
+        eval_pool: ThreadPoolExecutor,
+        out: Any,
+        report: EvaluationReport,
+    ) -> None:
+        thread_id, run_id = (source_item, None) if isinstance(source_item, str) else source_item
+        scope = "thread" if run_id is None else "run"
+        try:
+            records = self._convert(thread_id, run_id)
+        except Exception as e:
+            with self._write_lock:
+                report.conversion_errors += 1
+            print(f"[evaluation_runner] Could not convert thread {thread_id}: {e}")
+            return
+        if not records:
+            self._write(out, {"thread_id": thread_id, "run_id": run_id, "scope": scope, "records_in_thread": 0, "scores": {}})
+            return
+
+        # Fan every record out to all evaluators before waiting on any of them
+        submitted = []
+        for record in records:
+            key = (thread_id, run_id or record_run_id(record))
+            if key in scored:
+                with self._write_lock:
+                    report.records_skipped += 1
+                continue
+            digest = record_hash(record)
+            futures = [eval_pool.submit(self._evaluate, name, record, digest) for name in self.evaluators]
+            submitted.append((key, digest, record_tool_names(record), futures, time.perf_counter()))
+
+        for (thread_id, record_run), digest, tools, futures, started in submitted:
+            scores: Dict[str, Any] = {}
+            errors: Dict[str, str] = {}
+            cached: List[str] = []
+            for future in futures:
+                name, result, error, from_cache = future.result()
+                if error is None:
+                    scores[name] = result
+                else:
+                    errors[name] = error
+                if from_cache:
+                    cached.append(name)
+            row = {
+                "thread_id": thread_id,
+                "run_id": record_run,
+                "scope": scope,
+                "records_in_thread": len(records),
+                "record_hash": digest,
+                "tools": tools,
+                "scores": scores,
+                "cached": cached,
+                "elapsed": round(time.perf_counter() - started, 3),
+            }
+            if errors:
+                row["errors"] = errors
+            self._write(out, row)
+            with self._write_lock:
+                report.records += 1
+                report.evaluations += len(futures)
+                report.cache_hits += len(cached)
+                report.evaluation_errors += len(errors)
+
+    def run(self, thread_ids: ThreadSource) -> EvaluationReport:
+        """
+        Scores every record of the given threads, skipping what the output file already has.
+
+        :param thread_ids: Thread IDs, or (thread ID, run ID) pairs; consumed lazily.
+        :return: Counters and throughput of this call.
+        """
+        start = time.perf_counter()
+        report = EvaluationReport()
+        drop_partial_line(self.output_path)
+        done, scored = self._load_progress()
+        # Bounds the threads submitted but not finished, so the source is read as work completes
+        window = threading.BoundedSemaphore(self.convert_workers * 2)
+
+        directory = os.path.dirname(os.path.abspath(self.output_path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="evaluator"
+        ) as eval_pool, ThreadPoolExecutor(max_workers=self.convert_workers, thread_name_prefix="convert") as convert_pool:
+            futures = []
+            for source_item in thread_ids:
+                report.threads += 1
+                # A bare thread ID is skipped once its thread is complete, a (thread ID, run ID)
+                # pair once that run is scored
+                thread_id = source_item if isinstance(source_item, str) else source_item[0]
+                if thread_id in done or (not isinstance(source_item, str) and tuple(source_item) in scored):
+                    report.threads_skipped += 1
+                    continue
+                window.acquire()
+                future = convert_pool.submit(self._process_thread, source_item, scored, eval_pool, out, report)
+                future.add_done_callback(lambda _: window.release())
+                futures.append(future)
+                if report.threads % 100 == 0:
+                    futures = [f for f in futures if not f.done() or f.exception() is not None]
+                    print(f"[evaluation_runner] {report.threads} threads read, {report.records} records scored")
+            for future in futures:
+                future.result()
+
+        report.elapsed = time.perf_counter() - start
+        return report
@@ -0,0 +1,453 @@
+"""
+Columnar store of evaluation results.
+
+``evaluate()`` returns per-row results, but 7_6 only kept the run-level
+metrics, and the score JSONL files can only be queried with a Python loop
+over every line. EvaluationStore keeps one row per (record, evaluator,
+metric) in Parquet, with the thread, run, agent, record hash and the tools
+the record called:
+
+    <root>/eval_run=<name>/part-<timestamp>-<id>.parquet
+
+Queries read only the needed columns and partitions, and aggregate with
+Arrow compute kernels, so summarising or comparing evaluation runs of
+hundreds of thousands of rows takes well under a second:
+
+* ``summary``: count, mean, min, max, t-digest percentiles and pass rate per
+  evaluator and metric, optionally per tool,
+* ``diff``: the same aggregates for two evaluation runs side by side, with deltas,
+* ``regressions``: records whose score dropped or whose result flipped from
+  pass to fail between two evaluation runs.
+
+From the command line:
+
+    python -m agent_utils.evaluation_store import baseline evaluation_scores.jsonl
+    python -m agent_utils.evaluation_store summary baseline --by evaluator,metric,tool
+    python -m agent_utils.evaluation_store diff baseline candidate
+    python -m agent_utils.evaluation_store regressions baseline candidate --tool send_email_to_address
+
+Requires ``pyarrow``.
+"""
+
+import argparse
+import datetime
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from agent_utils.evaluation_cache import read_records, record_hash, record_tool_names
+from agent_utils.evaluation_runner import record_run_id
+
+DEFAULT_RESULTS_PATH = os.getenv("EVAL_RESULTS_PATH", "evaluation_results")
+
+_LABEL = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema(
+    [
+        ("thread_id", pa.string()),
+        ("run_id", pa.string()),
+        ("agent_id", _LABEL),
+        ("record_hash", pa.string()),
+        ("tools", pa.list_(_LABEL)),
+        ("evaluator", _LABEL),
+        ("metric", _LABEL),
+        ("value", pa.float64()),
+        ("result", _LABEL),
+        ("error", pa.string()),
+        ("scored_at", pa.timestamp("s", tz="UTC")),
+    ]
+)
+
+_PARTITIONING = ds.partitioning(pa.schema([("eval_run", pa.string())]), flavor="hive")
+
+
+def score_rows_from_evaluate(result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Converts the per-row results of ``azure.ai.evaluation.evaluate()`` into score rows.
+
+    ``evaluate()`` returns flat rows with ``inputs.<column>`` and ``outputs.<evaluator>.<field>`` keys; the
+    record hash is computed from the inputs, so it matches the score cache and EvaluationRunner rows.
+    """
+    for flat in result.get("rows") or []:
+        inputs: Dict[str, Any] = {}
+        scores: Dict[str, Dict[str, Any]] = {}
+        for key, value in flat.items():
+            if key.startswith("inputs."):
+                inputs[key[len("inputs.") :]] = value
+            elif key.startswith("outputs."):
+                evaluator, _, field = key[len("outputs.") :].partition(".")
+                scores.setdefault(evaluator, {})[field or evaluator] = value
+        yield {
+            "thread_id": inputs.get("thread_id"),
+            "run_id": record_run_id(inputs),
+            "record_hash": record_hash(inputs),
+            "tools": record_tool_names(inputs),
+            "scores": scores,
+        }
+
+
+def _metric_rows(scores: Any) -> Iterator[tuple]:
+    # (evaluator, metric, value, result) per numeric field; pass/fail without a number (e.g. prescreened) too
+    for evaluator, fields in (scores or {}).items():
+        if not isinstance(fields, dict):
+            fields = {evaluator: fields}
+        for field, value in fields.items():
+            if field.endswith("_result") or field.endswith("_threshold") or field.endswith("_reason"):
+                continue
+            if isinstance(value, bool) or not (value is None or isinstance(value, (int, float))):
+                continue
+            if value is None and f"{field}_result" not in fields:
+                continue
+            result = fields.get(f"{field}_result")
+            yield evaluator, field, None if value is None else float(value), result if isinstance(result, str) else None
+
+
+class EvaluationStore:
+    """
+    Parquet dataset of per-record evaluator scores, partitioned by evaluation run.
+
+    :param root: Directory of the dataset; created on the first write.
+    """
+
+    def __init__(self, root: str = DEFAULT_RESULTS_PATH) -> None:
+        self.root = root
+
+    # Writing
+
+    def write(
+        self, rows: Iterable[Dict[str, Any]], eval_run: str, agent_id: Optional[str] = None, batch_size: int = 50_000
+    ) -> int:
+        """
+        Appends score rows to an evaluation run as one new Parquet file.
+
+        :param rows: Rows of EvaluationRunner files, ``score_records`` or ``score_rows_from_evaluate``.
+        :param eval_run: Name of the evaluation run, e.g. a date, commit or model version.
+        :param agent_id: Agent the rows belong to, when they do not say.
+        :param batch_size: Result rows converted to Arrow at a time.
+        :return: Number of result rows written.
+        """
+        directory = os.path.join(self.root, f"eval_run={quote(eval_run, safe='')}")
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(directory, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+        # Dot-prefixed, so readers skip the file until it is complete
+        partial = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+        scored_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+        columns: Dict[str, List[Any]] = {name: [] for name in SCHEMA.names}
+        written = 0
+        writer: Optional[pq.ParquetWriter] = None
+
+        def add(row: Dict[str, Any], evaluator: Any, metric: Any, value: Any, result: Any, error: Any) -> None:
+            columns["thread_id"].append(row.get("thread_id"))
+            columns["run_id"].append(row.get("run_id"))
+            columns["agent_id"].append(row.get("agent_id") or agent_id)
+            columns["record_hash"].append(row.get("record_hash"))
+            columns["tools"].append(row.get("tools") or [])
+            columns["evaluator"].append(evaluator)
+            columns["metric"].append(metric)
+            columns["value"].append(value)
+            columns["result"].append(result)
+            columns["error"].append(error)
+            columns["scored_at"].append(scored_at)
+
+        def flush() -> None:
+            nonlocal writer, written
+            if not columns["evaluator"]:
+                return
+            batch = pa.RecordBatch.from_pydict(columns, schema=SCHEMA)
+            if writer is None:
+                writer = pq.ParquetWriter(partial, SCHEMA, compression="zstd")
+            writer.write_batch(batch)
+            written += batch.num_rows
+            for values in columns.values():
+                values.clear()
+
+        try:
+            for row in rows:
+                for evaluator, metric, value, result in _metric_rows(row.get("scores")):
+                    add(row, evaluator, metric, value, result, None)
+                for evaluator, error in (row.get("errors") or {}).items():
+                    add(row, evaluator, None, None, None, error)
+                if len(columns["evaluator"]) >= batch_size:
+                    flush()
+            flush()
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            os.replace(partial, path)
+        return written
+
+    def import_jsonl(self, path: str, eval_run: str, agent_id: Optional[str] = None) -> int:
+        """Imports an EvaluationRunner score file, keeping the last row per (thread ID, run ID)."""
+        latest: Dict[Any, Dict[str, Any]] = {}
+        for row in read_records(path):
+            if row.get("records_in_thread") != 0:
+                latest[(row.get("thread_id"), row.get("run_id"))] = row
+        return self.write(latest.values(), eval_run, agent_id)
+
+    # Reading
+
+    def _dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", partitioning=_PARTITIONING)
+
+    def eval_runs(self) -> List[str]:
+        """Names of the evaluation runs in the store."""
+        if not os.path.isdir(self.root):
+            return []
+        runs = self._dataset().to_table(columns=["eval_run"])["eval_run"]
+        return sorted(pc.unique(runs).to_pylist())
+
+    def table(
+        self,
+        eval_runs: Optional[Sequence[str]] = None,
+        evaluators: Optional[Sequence[str]] = None,
+        metrics: Optional[Sequence[str]] = None,
+        tools: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pa.Table:
+        """
+        Reads result rows, pruning partitions and columns.
+
+        :param eval_runs: Only these evaluation runs.
+        :param evaluators: Only these evaluators.
+        :param metrics: Only these metrics.
+        :param tools: Only records that called at least one of these tools.
+        :param columns: Columns to read; all by default.
+        """
+        conditions = [
+            ds.field(name).isin(list(values))
+            for name, values in (("eval_run", eval_runs), ("evaluator", evaluators), ("metric", metrics))
+            if values is not None
+        ]
+        condition = None
+        for c in conditions:
+            condition = c if condition is None else condition & c
+        read = list(columns) if columns is not None else None
+        if read is not None and tools is not None and "tools" not in read:
+            read.append("tools")
+        table = self._dataset().to_table(filter=condition, columns=read)
+        if tools is not None:
+            table = _having_tools(table, tools)
+            if columns is not None and "tools" not in columns:
+                table = table.drop_columns(["tools"])
+        return table
+
+    # Aggregates
+
+    def summary(
+        self,
+        eval_run: str,
+        by: Sequence[str] = ("evaluator", "metric"),
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        tools: Optional[Sequence[str]] = None,
+    ) -> pa.Table:
+        """
+        Aggregates one evaluation run.
+
+        :param eval_run: Evaluation run to summarise.
+        :param by: Grouping columns; ``tool`` groups every record under each tool it called.
+        :param quantiles: Percentiles of the value, approximated with a t-digest.
+        :param tools: Only records that called at least one of these tools.
+        :return: One row per group with ``count``, ``mean``, ``min``, ``max``, ``p<q>`` and ``pass_rate``.
+        """
+        keys = list(by)
+        columns = [c for c in keys if c != "tool"] + ["metric", "value", "result"] + (["tools"] if "tool" in keys else [])
+        columns = list(dict.fromkeys(columns))
+        table = self.table([eval_run], tools=tools, columns=columns)
+        return _aggregate(table, keys, quantiles)
+
+    def diff(
+        self,
+        baseline: str,
+        candidate: str,
+        by: Sequence[str] = ("evaluator", "metric"),
+        quantiles: Sequence[float] = (0.5, 0.9),
+        tools: Optional[Sequence[str]] = None,
+    ) -> pa.Table:
+        """
+        Compares the aggregates of two evaluation runs.
+
+        :return: One row per group with ``<aggregate>_baseline``, ``<aggregate>_candidate`` and
+            ``<aggregate>_delta`` (candidate minus baseline) for the mean, percentiles and pass rate.
+        """
+        keys = list(by)
+        base = _decoded(self.summary(baseline, keys, quantiles, tools))
+        cand = _decoded(self.summary(candidate, keys, quantiles, tools))
+        joined = base.join(cand, keys=keys, join_type="full outer", left_suffix="_baseline", right_suffix="_candidate")
+        for aggregate in ["mean"] + [_quantile_name(q) for q in quantiles] + ["pass_rate"]:
+            delta = pc.subtract(joined[f"{aggregate}_candidate"], joined[f"{aggregate}_baseline"])
+            joined = joined.append_column(f"{aggregate}_delta", delta)
+        return joined.sort_by([(k, "ascending") for k in keys])
+
+    def regressions(
+        self,
+        baseline: str,
+        candidate: str,
+        min_drop: float = 0.0,
+        evaluators: Optional[Sequence[str]] = None,
+        tools: Optional[Sequence[str]] = None,
+    ) -> pa.Table:
+        """
+        Finds the records that got worse between two evaluation runs, matched by record hash.
+
+        :param min_drop: Value drops larger than this count as regressions.
+        :return: One row per (record, evaluator, metric) whose value dropped by more than ``min_drop``
+            or whose result went from pass to fail, largest drop first.
+        """
+        keys = ["record_hash", "evaluator", "metric"]
+        columns = keys + ["thread_id", "run_id", "value", "result"]
+
+        def latest(eval_run: str) -> pa.Table:
+            table = _decoded(self.table([eval_run], evaluators=evaluators, tools=tools, columns=columns))
+            table = table.filter(pc.is_valid(table["metric"]))
+            # Rescored records keep their last score
+            return table.group_by(keys, use_threads=False).aggregate(
+                [(c, "last") for c in ("thread_id", "run_id", "value", "result")]
+            ).rename_columns(keys + ["thread_id", "run_id", "value", "result"])
+
+        base = latest(baseline)
+        cand = latest(candidate).drop_columns(["thread_id", "run_id"])
+        joined = base.join(cand, keys=keys, join_type="inner", left_suffix="_baseline", right_suffix="_candidate")
+        drop = pc.subtract(joined["value_baseline"], joined["value_candidate"])
+        flipped = pc.and_(pc.equal(joined["result_baseline"], "pass"), pc.equal(joined["result_candidate"], "fail"))
+        worse = pc.or_kleene(pc.greater(drop, min_drop), flipped)
+        joined = joined.append_column("drop", drop).filter(pc.fill_null(worse, False))
+        return joined.sort_by([("drop", "descending")])
+
+
+def _decoded(table: pa.Table) -> pa.Table:
+    # Joins need plain strings, not dictionary-encoded columns
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+
+def _tool_lists(table: pa.Table) -> pa.Array:
+    tools = table["tools"].combine_chunks()
+    return tools.cast(pa.list_(pa.string()))
+
+
+def _having_tools(table: pa.Table, tools: Sequence[str]) -> pa.Table:
+    lists = _tool_lists(table)
+    matches = pc.is_in(pc.list_flatten(lists), value_set=pa.array(list(tools), pa.string()))
+    rows = pc.unique(pc.filter(pc.list_parent_indices(lists), matches))
+    return table.take(rows)
+
+
+def _by_tool(table: pa.Table) -> pa.Table:
+    # One row per (result row, tool called); rows of records without tool calls are dropped
+    lists = _tool_lists(table)
+    exploded = table.drop_columns(["tools"]).take(pc.list_parent_indices(lists))
+    return exploded.append_column("tool", pc.list_flatten(lists))
+
+
+def _quantile_name(q: float) -> str:
+    return f"p{q * 100:g}".replace(".", "_")
+
+
+def _aggregate(table: pa.Table, keys: List[str], quantiles: Sequence[float]) -> pa.Table:
+    # Evaluator errors are rows without a metric
+    table = table.filter(pc.is_valid(table["metric"])) if "metric" in table.column_names else table
+    if "tool" in keys:
+        table = _by_tool(table)
+    table = _decoded(table)
+    result = table["result"]
+    passed = pc.if_else(pc.equal(result, "pass"), 1.0, pc.if_else(pc.equal(result, "fail"), 0.0, None))
+    table = table.append_column("passed", passed)
+    grouped = table.group_by(keys).aggregate(
+        [
+            ("value", "count"),
+            ("value", "mean"),
+            ("value", "min"),
+            ("value", "max"),
+            ("value", "tdigest", pc.TDigestOptions(q=list(quantiles))),
+            ("passed", "mean"),
+        ]
+    )
+    digests = grouped["value_tdigest"]
+    columns = {key: grouped[key] for key in keys}
+    columns.update(
+        count=grouped["value_count"], mean=grouped["value_mean"], min=grouped["value_min"], max=grouped["value_max"]
+    )
+    for i, q in enumerate(quantiles):
+        columns[_quantile_name(q)] = pc.list_element(digests, i)
+    columns["pass_rate"] = grouped["passed_mean"]
+    return pa.table(columns).sort_by([(k, "ascending") for k in keys])
+
+
+def format_table(table: pa.Table, limit: int = 50) -> str:
+    """Fixed-width text of the first ``limit`` rows, for printing in samples and the CLI."""
+    names = table.column_names
+    rows = table.slice(0, limit).to_pylist()
+
+    def cell(value: Any) -> str:
+        if value is None:
+            return "-"
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    widths = {n: max([len(n)] + [len(cell(r[n])) for r in rows]) for n in names}
+    lines = ["  ".join(n.rjust(widths[n]) for n in names)]
+    lines += ["  ".join(cell(r[n]).rjust(widths[n]) for n in names) for r in rows]
+    if table.num_rows > limit:
+        lines.append(f"... {table.num_rows - limit} more rows")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the columnar evaluation results store.")
+    parser.add_argument("--path", default=DEFAULT_RESULTS_PATH, help="Store directory (EVAL_RESULTS_PATH).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("runs", help="List the evaluation runs.")
+    importer = commands.add_parser("import", help="Import an EvaluationRunner score file.")
+    importer.add_argument("eval_run")
+    importer.add_argument("scores_file")
+    importer.add_argument("--agent-id")
+    for name, help_text in (
+        ("summary", "Aggregates of one evaluation run."),
+        ("diff", "Aggregates of two evaluation runs side by side."),
+        ("regressions", "Records that got worse between two evaluation runs."),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("eval_run")
+        if name != "summary":
+            command.add_argument("candidate")
+        command.add_argument("--by", default="evaluator,metric", help="Grouping columns, e.g. evaluator,metric,tool.")
+        command.add_argument("--tool", action="append", help="Only records that called this tool (repeatable).")
+        command.add_argument("--evaluator", action="append", help="Only this evaluator (regressions).")
+        command.add_argument("--min-drop", type=float, default=0.0, help="Smallest value drop reported (regressions).")
+        command.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    store = EvaluationStore(args.path)
+    if args.command == "runs":
+        print("\n".join(store.eval_runs()))
+        return
+    if args.command == "import":
+        written = store.import_jsonl(args.scores_file, args.eval_run, args.agent_id)
+        print(f"[evaluation_store] Wrote {written} result rows to {args.path} as {args.eval_run}")
+        return
+
+    start = time.perf_counter()
+    by = args.by.split(",")
+    if args.command == "summary":
+        table = store.summary(args.eval_run, by, tools=args.tool)
+    elif args.command == "diff":
+        table = store.diff(args.eval_run, args.candidate, by, tools=args.tool)
+    else:
+        table = store.regressions(args.eval_run, args.candidate, args.min_drop, args.evaluator, args.tool)
+    print(format_table(table, args.limit))
+    print(f"[evaluation_store] {table.num_rows} rows in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+High-throughput parsing of agent run streams.
+
+The SDK's BaseAgentEventHandler grows its buffer with ``bytes +=`` and
+re-slices it for every frame, and handlers such as the one in 7_5 then
+split each event string into lines and ``json.loads`` every
+``thread.message.delta`` just to read one text fragment.
+
+SSEFrameReader parses frames in place: chunks are appended to a single
+bytearray, frames are located by offset, and only the event name is copied
+out (interned, so each name is decoded once). StreamingTextEventHandler
+builds on it. It reads delta text straight from the frame bytes when the
+fragment needs no unescaping (the common case), falls back to
+``json.loads`` otherwise, and never decodes the events the consumer did
+not subscribe to.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+
+from azure.ai.projects.models import BaseAgentEventHandler, BaseAsyncAgentEventHandler, ThreadRun
+
+MESSAGE_DELTA = "thread.message.delta"
+RUN_REQUIRES_ACTION = "thread.run.requires_action"
+
+# Buffered bytes already consumed before the buffer is compacted
+_COMPACT_THRESHOLD = 64 * 1024
+_VALUE_KEY = b'"value":'
+
+
+class SSEFrameReader:
+    """
+    Incremental server-sent-events frame parser over one growing buffer.
+
+    Frames are returned as ``(event_type, data_start, data_end)``; the data bytes
+    stay in ``buffer`` until the next ``feed``, so callers read them in place.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self._pos = 0
+        self._event_names: Dict[bytes, str] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        """Appends a network chunk, dropping consumed bytes once enough have piled up."""
+        if self._pos >= _COMPACT_THRESHOLD or (self._pos and self._pos == len(self.buffer)):
+            del self.buffer[: self._pos]
+            self._pos = 0
+        self.buffer += chunk
+
+    def _event_name(self, start: int, end: int) -> str:
+        raw = bytes(self.buffer[start:end])
+        name = self._event_names.get(raw)
+        if name is None:
+            name = self._event_names[raw] = raw.strip().decode("utf-8")
+        return name
+
+    def _parse(self, start: int, end: int) -> Optional[Tuple[str, int, int]]:
+        buffer = self.buffer
+        event_type = ""
+        data_start = data_end = start
+        line_start = start
+        while line_start < end:
+            line_end = buffer.find(b"\n", line_start, end)
+            if line_end < 0:
+                line_end = end
+            if buffer.startswith(b"event:", line_start, line_end):
+                event_type = self._event_name(line_start + 6, line_end)
+            elif buffer.startswith(b"data:", line_start, line_end):
+                data_start = line_start + 5
+                if data_start < line_end and buffer[data_start] == 0x20:
+                    data_start += 1
+                data_end = line_end
+            line_start = line_end + 1
+        if not event_type:
+            return None
+        return event_type, data_start, data_end
+
+    def next_frame(self) -> Optional[Tuple[str, int, int]]:
+        """
+        Returns the next complete frame, or None if more bytes are needed.
+
+        Frames without an ``event:`` line (keep-alives, blank separators) are skipped.
+        """
+        buffer = self.buffer
+        while True:
+            end = buffer.find(b"\n\n", self._pos)
+            if end < 0:
+                return None
+            start, self._pos = self._pos, end + 2
+            frame = self._parse(start, end)
+            if frame is not None:
+                return frame
+
+    def close(self) -> Optional[Tuple[str, int, int]]:
+        """Returns the final frame of a stream that ended without a trailing blank line."""
+        start, end = self._pos, len(self.buffer)
+        self._pos = end
+        return self._parse(start, end) if start < end else None
+
+    def data(self, start: int, end: int) -> bytes:
+        return bytes(self.buffer[start:end])
+
+
+def _decode_json(data: bytes) -> Any:
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data.decode("utf-8")
+
+
+def extract_delta_text(buffer: bytearray, start: int, end: int) -> Optional[str]:
+    """
+    Returns the text of a ``thread.message.delta`` payload stored in ``buffer[start:end]``.
+
+    A single unescaped ``"value"`` string is decoded straight from the buffer; anything
+    else (escapes, several content parts) goes through ``json.loads``.
+    """
+    key = buffer.find(_VALUE_KEY, start, end)
+    if key < 0:
+        return None
+    quote = key + len(_VALUE_KEY)
+    while quote < end and buffer[quote] == 0x20:
+        quote += 1
+    if quote < end and buffer[quote] == 0x22 and buffer.find(_VALUE_KEY, quote, end) < 0:
+        close = buffer.find(b'"', quote + 1, end)
+        if close > 0 and buffer.find(b"\\", quote + 1, close) < 0:
+            return str(memoryview(buffer)[quote + 1 : close], "utf-8")
+
+    payload = json.loads(bytes(buffer[start:end]))
+    parts = [
+        part["text"]["value"]
+        for part in payload.get("delta", {}).get("content") or []
+        if part.get("type") == "text" and (part.get("text") or {}).get("value")
+    ]
+    return "".join(parts) or None
+
+
+class _StreamingTextMixin:
+    def _setup(self, events: Iterable[str]) -> None:
+        self.reader = SSEFrameReader()
+        self.events = frozenset(events)
+        self.frames = 0
+        self.decoded = 0
+
+    def on_event(self, event_type: str, data: Any) -> None:
+        """Called with the decoded payload of every subscribed event type."""
+
+    def _handle(self, event_type: str, start: int, end: int) -> Optional[str]:
+        self.frames += 1
+        if event_type == MESSAGE_DELTA:
+            text = extract_delta_text(self.reader.buffer, start, end)
+            if MESSAGE_DELTA in self.events:
+                self.decoded += 1
+                self.on_event(event_type, _decode_json(self.reader.data(start, end)))
+            return text or None
+        if event_type in self.events:
+            self.decoded += 1
+            self.on_event(event_type, _decode_json(self.reader.data(start, end)))
+        return None
+
+
+class StreamingTextEventHandler(_StreamingTextMixin, BaseAgentEventHandler[str]):
+    """
+    Event handler that yields the streamed message text, fragment by fragment.
+
+    Tool calls (``thread.run.requires_action``) are always handled, so the handler works
+    with ``enable_auto_function_calls``; other events are skipped without decoding unless
+    listed in ``events``, in which case ``on_event`` receives their JSON payload.
+
+    :param events: Event types to decode and pass to ``on_event``.
+    """
+
+    def __init__(self, events: Iterable[str] = ()) -> None:
+        super().__init__()
+        self._setup(events)
+
+    def __next__(self) -> str:
+        if self.response_iterator is None:
+            raise ValueError("The response handler was not initialized.")
+        while True:
+            frame = self.reader.next_frame()
+            if frame is None:
+                chunk = next(self.response_iterator, None)
+                if chunk is not None:
+                    self.reader.feed(chunk)
+                    continue
+                frame = self.reader.close()
+                if frame is None:
+                    raise StopIteration()
+            event_type, start, end = frame
+            if event_type == RUN_REQUIRES_ACTION:
+                self._submit(start, end)
+            text = self._handle(event_type, start, end)
+            if text is not None:
+                return text
+
+    def _submit(self, start: int, end: int) -> None:
+        run = ThreadRun(json.loads(self.reader.data(start, end)))
+        if self.submit_tool_outputs is not None:
+            # Resumes the run; the SDK chains the new response onto response_iterator
+            self.submit_tool_outputs(run, self, True)
+
+    def get_stream_chunks(self) -> Iterator[str]:
+        yield from self
+
+
+class AsyncStreamingTextEventHandler(_StreamingTextMixin, BaseAsyncAgentEventHandler[str]):
+    """
+    Async form of StreamingTextEventHandler, for ``aio.AIProjectClient.agents.create_stream``.
+
+    :param events: Event types to decode and pass to ``on_event``.
+    """
+
+    def __init__(self, events: Iterable[str] = ()) -> None:
+        super().__init__()
+        self._setup(events)
+
+    async def __anext__(self) -> str:
+        if self.response_iterator is None:
+            raise ValueError("The response handler was not initialized.")
+        while True:
+            frame = self.reader.next_frame()
+            if frame is None:
+                try:
+                    self.reader.feed(await self.response_iterator.__anext__())
+                    continue
+                except StopAsyncIteration:
+                    frame = self.reader.close()
+                    if frame is None:
+                        raise
+            event_type, start, end = frame
+            if event_type == RUN_REQUIRES_ACTION:
+                await self._submit(start, end)
+            text = self._handle(event_type, start, end)
+            if text is not None:
+                return text
+
+    async def _submit(self, start: int, end: int) -> None:
+        run = ThreadRun(json.loads(self.reader.data(start, end)))
+        if self.submit_tool_outputs is not None:
+            await self.submit_tool_outputs(run, self, True)
+
+    async def get_stream_chunks(self) -> AsyncIterator[str]:
+        async for chunk in self:
+            yield chunk
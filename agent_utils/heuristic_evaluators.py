@@ -0,0 +1,328 @@
+"""
+Cheap local evaluators, and a pre-screen that spares LLM judge calls.
+
+The LLM-judged evaluators of azure-ai-evaluation cost a model call per
+record, even when the outcome is already certain from the record alone.
+For example, ToolCallAccuracyEvaluator is called (and raises) on runs that
+made no tool calls, and an empty final answer cannot resolve any intent.
+
+Local evaluators, which take the same ``query``/``response``/``tool_definitions``
+records as the SDK's evaluators and need no model:
+
+* ToolArgumentSchemaEvaluator: tool call arguments against the tool definitions
+* ToolCallPairingEvaluator: every tool call has exactly one tool result
+* ResponseLatencyEvaluator: time between ``createdAt`` stamps
+* ResponseLengthEvaluator: length of the final assistant answer
+
+``prescreen`` wraps judges in ScreenedEvaluator, which looks at the same
+facts first and returns a verdict without calling the judge when the
+outcome is certain.
+"""
+
+import datetime
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from agent_utils.evaluation_cache import evaluator_version
+
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+# Tools run by the service itself. The converter reports their calls, but
+# tool_definitions only lists function tools, so these are not schema-checked.
+BUILT_IN_TOOLS = frozenset(
+    {
+        "file_search",
+        "code_interpreter",
+        "bing_grounding",
+        "bing_custom_search",
+        "azure_ai_search",
+        "azure_function",
+        "sharepoint_grounding",
+        "fabric_dataagent",
+        "openapi",
+    }
+)
+
+
+@dataclass
+class RecordFacts:
+    """What the local checks learn from one converted record."""
+
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    tool_results: Dict[str, int] = field(default_factory=dict)
+    argument_errors: List[str] = field(default_factory=list)
+    invalid_calls: int = 0
+    unpaired_calls: List[str] = field(default_factory=list)
+    orphan_results: List[str] = field(default_factory=list)
+    final_text: str = ""
+    latency_seconds: Optional[float] = None
+    max_gap_seconds: Optional[float] = None
+
+
+def _timestamp(value: Any) -> Optional[datetime.datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _type_matches(value: Any, schema_type: Any) -> bool:
+    types = schema_type if isinstance(schema_type, list) else [schema_type]
+    for name in types:
+        expected = _JSON_TYPES.get(name)
+        if expected is None:
+            return True  # a type this check does not know is not an error
+        # bool is an int in Python, but not a JSON integer or number
+        if isinstance(value, bool) and name in ("integer", "number"):
+            continue
+        if isinstance(value, expected):
+            return True
+    return False
+
+
+def _argument_errors(call: Dict[str, Any], definitions: Dict[str, Dict[str, Any]]) -> List[str]:
+    name = call.get("name")
+    definition = definitions.get(name)
+    if definition is None:
+        return [] if name in BUILT_IN_TOOLS else [f"{name}: not a defined tool"]
+    arguments = call.get("arguments")
+    if not isinstance(arguments, dict):
+        return [f"{name}: arguments are not a JSON object"]
+    parameters = definition.get("parameters") or {}
+    properties = parameters.get("properties") or {}
+    errors = [f"{name}: missing required argument '{p}'" for p in parameters.get("required") or [] if p not in arguments]
+    for argument, value in arguments.items():
+        spec = properties.get(argument)
+        if spec is None:
+            errors.append(f"{name}: unknown argument '{argument}'")
+        elif "type" in spec and not _type_matches(value, spec["type"]):
+            errors.append(f"{name}: argument '{argument}' is not of type {spec['type']}")
+    return errors
+
+
+def analyse_record(query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> RecordFacts:
+    """Extracts tool calls, results, answer text and timing from a converted record."""
+    facts = RecordFacts()
+    definitions = {d.get("name"): d for d in tool_definitions or [] if isinstance(d, dict)}
+    messages = [m for m in response or [] if isinstance(m, dict)] if isinstance(response, list) else []
+    for message in messages:
+        contents = message.get("content") or []
+        if message.get("role") == "tool":
+            call_id = message.get("tool_call_id")
+            facts.tool_results[call_id] = facts.tool_results.get(call_id, 0) + 1
+        for content in contents if isinstance(contents, list) else []:
+            if isinstance(content, dict) and content.get("type") == "tool_call":
+                facts.tool_calls.append(content)
+                errors = _argument_errors(content, definitions) if definitions else []
+                facts.argument_errors.extend(errors)
+                facts.invalid_calls += bool(errors)
+        if message.get("role") == "assistant":
+            text = "".join(c.get("text", "") for c in contents if isinstance(c, dict) and c.get("type") == "text")
+            if text:
+                facts.final_text = text
+    if isinstance(response, str):
+        facts.final_text = response
+
+    call_ids = [call.get("tool_call_id") for call in facts.tool_calls]
+    facts.unpaired_calls = [call_id for call_id in call_ids if facts.tool_results.get(call_id) != 1]
+    facts.orphan_results = [call_id for call_id in facts.tool_results if call_id not in call_ids]
+
+    query_times = [_timestamp(m.get("createdAt")) for m in query or [] if isinstance(m, dict)] if isinstance(query, list) else []
+    response_times = [_timestamp(m.get("createdAt")) for m in messages]
+    stamps = [t for t in response_times if t is not None]
+    asked = [t for t in query_times if t is not None]
+    if stamps:
+        if asked:
+            facts.latency_seconds = (stamps[-1] - asked[-1]).total_seconds()
+        facts.max_gap_seconds = max(
+            [(later - earlier).total_seconds() for earlier, later in zip(stamps, stamps[1:])] or [0.0]
+        )
+    return facts
+
+
+def _verdict(name: str, score: Any, passed: Optional[bool], reason: str, **extra: Any) -> Dict[str, Any]:
+    result = "not_applicable" if passed is None else ("pass" if passed else "fail")
+    return {name: score, f"{name}_result": result, f"{name}_reason": reason, **extra}
+
+
+class ToolArgumentSchemaEvaluator:
+    """Checks every tool call's arguments against its tool definition (names, required fields, JSON types)."""
+
+    id = "tool_argument_schema"
+
+    def __call__(self, *, query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        facts = analyse_record(query, response, tool_definitions)
+        if not facts.tool_calls:
+            return _verdict(self.id, None, None, "No tool calls")
+        valid = 1.0 - facts.invalid_calls / len(facts.tool_calls)
+        reason = "; ".join(facts.argument_errors) or "All tool call arguments match their definitions"
+        return _verdict(self.id, valid, not facts.argument_errors, reason)
+
+
+class ToolCallPairingEvaluator:
+    """Checks that every tool call got exactly one tool result, and no result lacks its call."""
+
+    id = "tool_call_pairing"
+
+    def __call__(self, *, query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        facts = analyse_record(query, response)
+        if not facts.tool_calls and not facts.tool_results:
+            return _verdict(self.id, None, None, "No tool calls")
+        problems = [f"call {c} has {facts.tool_results.get(c, 0)} results" for c in facts.unpaired_calls]
+        problems += [f"result {c} has no call" for c in facts.orphan_results]
+        paired = len(facts.tool_calls) - len(facts.unpaired_calls)
+        score = paired / len(facts.tool_calls) if facts.tool_calls else 0.0
+        return _verdict(self.id, score, not problems, "; ".join(problems) or "All tool calls have one result")
+
+
+class ResponseLatencyEvaluator:
+    """
+    Time from the last user message to the final response message, from ``createdAt`` stamps.
+
+    :param max_seconds: Latency above which the record fails.
+    """
+
+    id = "response_latency"
+
+    def __init__(self, max_seconds: float = 30.0) -> None:
+        self.max_seconds = max_seconds
+
+    def __call__(self, *, query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        facts = analyse_record(query, response)
+        if facts.latency_seconds is None:
+            return _verdict(self.id, None, None, "No createdAt stamps")
+        passed = facts.latency_seconds <= self.max_seconds
+        reason = f"{facts.latency_seconds:.1f}s (limit {self.max_seconds:g}s), longest gap {facts.max_gap_seconds:.1f}s"
+        return _verdict(self.id, facts.latency_seconds, passed, reason, response_max_gap=facts.max_gap_seconds)
+
+
+class ResponseLengthEvaluator:
+    """
+    Length in characters of the final assistant answer.
+
+    :param min_chars: Shorter answers fail; an empty answer always fails.
+    :param max_chars: Longer answers fail.
+    """
+
+    id = "response_length"
+
+    def __init__(self, min_chars: int = 1, max_chars: int = 4000) -> None:
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+
+    def __call__(self, *, query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        length = len(analyse_record(query, response).final_text.strip())
+        passed = max(self.min_chars, 1) <= length <= self.max_chars
+        return _verdict(self.id, length, passed, f"{length} characters (allowed {self.min_chars}-{self.max_chars})")
+
+
+def heuristic_evaluators(
+    max_latency_seconds: float = 30.0, min_chars: int = 1, max_chars: int = 4000
+) -> Dict[str, Callable[..., Any]]:
+    """The local evaluators by name, ready to add to an evaluator dict."""
+    return {
+        ToolArgumentSchemaEvaluator.id: ToolArgumentSchemaEvaluator(),
+        ToolCallPairingEvaluator.id: ToolCallPairingEvaluator(),
+        ResponseLatencyEvaluator.id: ResponseLatencyEvaluator(max_latency_seconds),
+        ResponseLengthEvaluator.id: ResponseLengthEvaluator(min_chars, max_chars),
+    }
+
+
+# A screen returns a verdict (the judge is skipped) or None (the judge decides)
+Screen = Callable[[str, RecordFacts], Optional[Dict[str, Any]]]
+
+
+def no_tool_calls(name: str, facts: RecordFacts) -> Optional[Dict[str, Any]]:
+    if not facts.tool_calls:
+        return _verdict(name, None, None, "Prescreen: the run made no tool calls", prescreened=True)
+    return None
+
+
+def invalid_tool_calls(name: str, facts: RecordFacts) -> Optional[Dict[str, Any]]:
+    problems = facts.argument_errors + [f"call {c} has no single result" for c in facts.unpaired_calls]
+    if problems:
+        return _verdict(name, None, False, "Prescreen: " + "; ".join(problems), prescreened=True)
+    return None
+
+
+def empty_response(name: str, facts: RecordFacts) -> Optional[Dict[str, Any]]:
+    if not facts.final_text.strip():
+        return _verdict(name, None, False, "Prescreen: no final answer", prescreened=True)
+    return None
+
+
+DEFAULT_SCREENS: Dict[str, Sequence[Screen]] = {
+    "tool_call_accuracy": (no_tool_calls, invalid_tool_calls),
+    "intent_resolution": (empty_response,),
+    "task_adherence": (empty_response,),
+}
+
+
+class ScreenedEvaluator:
+    """
+    Runs local screens before an LLM judge, and calls the judge only when no screen is certain.
+
+    :param name: Evaluator name; prefixes the keys of screen verdicts.
+    :param judge: The LLM-judged evaluator.
+    :param screens: Screens tried in order; the first verdict wins.
+    """
+
+    def __init__(self, name: str, judge: Callable[..., Any], screens: Sequence[Screen]) -> None:
+        self.name = name
+        self.judge = judge
+        self.screens = list(screens)
+        # Screen verdicts differ from judge results, so they must not share cache entries with the bare judge
+        self.version = f"{evaluator_version(judge)}+prescreen:{','.join(s.__name__ for s in self.screens)}"
+        self.judged = 0
+        self.screened = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *, query: Any = None, response: Any = None, tool_definitions: Any = None, **kwargs: Any) -> Any:
+        # Named parameters, so evaluate() can map the data columns as it does for the judge
+        facts = analyse_record(query, response, tool_definitions)
+        for screen in self.screens:
+            verdict = screen(self.name, facts)
+            if verdict is not None:
+                with self._lock:
+                    self.screened += 1
+                return verdict
+        with self._lock:
+            self.judged += 1
+        return self.judge(query=query, response=response, tool_definitions=tool_definitions, **kwargs)
+
+
+def prescreen(
+    evaluators: Dict[str, Callable[..., Any]], screens: Optional[Dict[str, Sequence[Screen]]] = None
+) -> Dict[str, Callable[..., Any]]:
+    """
+    Wraps the evaluators that have screens (by name) in ScreenedEvaluator; others are returned as is.
+
+    :param evaluators: Evaluators by name, e.g. ``{"tool_call_accuracy": ToolCallAccuracyEvaluator(...)}``.
+    :param screens: Screens by evaluator name; defaults to ``DEFAULT_SCREENS``.
+    """
+    screens = DEFAULT_SCREENS if screens is None else screens
+    return {
+        name: ScreenedEvaluator(name, evaluator, screens[name]) if screens.get(name) else evaluator
+        for name, evaluator in evaluators.items()
+    }
+
+
+def prescreen_summary(evaluators: Dict[str, Callable[..., Any]]) -> str:
+    """One line per screened evaluator: how many records were decided locally."""
+    lines = []
+    for name, evaluator in evaluators.items():
+        if isinstance(evaluator, ScreenedEvaluator):
+            total = evaluator.screened + evaluator.judged
+            lines.append(f"{name}: {evaluator.screened}/{total} decided by prescreen, {evaluator.judged} judge calls")
+    return "\n".join(lines)
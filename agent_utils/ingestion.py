@@ -0,0 +1,326 @@
+"""
+Bulk directory ingestion into a vector store, with incremental sync.
+
+DirectoryIngestor walks a directory, hashes and uploads files on a bounded
+thread pool, and adds the new file IDs to a vector store in file batches
+that are created up front and then polled together. It shares the
+UploadManifest of ``upload_cache``, which makes re-runs incremental:
+
+* files whose content is already uploaded are not uploaded again,
+* new and changed files are added to the store,
+* members whose file was changed or deleted locally are removed.
+
+The manifest is saved after every few uploads and after every finished
+batch, so an interrupted ingestion resumes where it stopped. Only files the
+service actually indexed are recorded as members; files that failed or were
+cancelled in their batch are added again on the next sync. File IDs in the
+manifest are trusted without a ``get_file`` per file; a file deleted on the
+service side shows up as a failed entry of its batch, and only then is it
+looked up and, if it is gone, dropped from the manifest so the next sync
+uploads it again.
+
+Remote files are kept when their local file disappears unless
+``delete_removed_files`` is set, because the same file ID can be reused by
+UploadCache and by other vector stores.
+"""
+
+import fnmatch
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from agent_utils.run_waiter import PollBackoff
+from agent_utils.upload_cache import UploadManifest, file_sha256
+
+# The service accepts at most 500 file IDs per vector store file batch
+MAX_BATCH_SIZE = 500
+
+
+@dataclass
+class IngestReport:
+    """Counters and throughput of one ``DirectoryIngestor.sync`` call."""
+
+    vector_store_id: str = ""
+    scanned: int = 0
+    uploaded: int = 0
+    reused: int = 0
+    bytes_uploaded: int = 0
+    added: int = 0
+    removed: int = 0
+    failed: int = 0
+    batches: int = 0
+    upload_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.uploaded / self.upload_seconds if self.upload_seconds else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_uploaded / self.upload_seconds if self.upload_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.scanned} files scanned, {self.uploaded} uploaded ({self.bytes_uploaded / 1e6:.1f} MB), "
+            f"{self.reused} reused, {self.added} added, {self.removed} removed, {self.failed} failed, "
+            f"{self.batches} batches in {self.elapsed:.1f}s; "
+            f"upload {self.files_per_sec:.1f} files/s, {self.bytes_per_sec / 1e6:.2f} MB/s"
+        )
+
+
+class DirectoryIngestor:
+    """
+    Keeps a vector store in sync with a local directory.
+
+    :param project_client: Sync AIProjectClient that owns the files and vector store.
+    :param manifest: Manifest shared with UploadCache; defaults to ``UPLOAD_MANIFEST_PATH``.
+    :param max_workers: Maximum number of concurrent hashes and uploads.
+    :param batch_size: File IDs per vector store file batch (at most 500).
+    :param patterns: Glob patterns of file names to ingest.
+    :param delete_removed_files: Also delete the remote file when its local file is gone and no other
+        vector store in the manifest still contains it. Off by default, since the file may still be
+        used outside the manifest.
+    :param backoff: Poll schedule for the file batches.
+    :param save_every: Uploads between manifest saves.
+    :param purpose: Upload purpose.
+    """
+
+    def __init__(
+        self,
+        project_client: Any,
+        manifest: Optional[UploadManifest] = None,
+        max_workers: int = 8,
+        batch_size: int = MAX_BATCH_SIZE,
+        patterns: Sequence[str] = ("*",),
+        delete_removed_files: bool = False,
+        backoff: Optional[PollBackoff] = None,
+        save_every: int = 25,
+        purpose: Any = "assistants",
+    ) -> None:
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        self.project_client = project_client
+        self.manifest = manifest or UploadManifest()
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.patterns = tuple(patterns)
+        self.delete_removed_files = delete_removed_files
+        self.backoff = backoff or PollBackoff(first_delay=1.0, initial_delay=1.0, max_delay=10.0)
+        self.save_every = save_every
+        self.purpose = purpose
+
+    def _walk(self, directory: str) -> Iterator[str]:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith(".") and any(fnmatch.fnmatch(name, p) for p in self.patterns):
+                    yield os.path.abspath(os.path.join(root, name))
+
+    def _hash(self, path: str) -> Tuple[str, str, int]:
+        stat = os.stat(path)
+        with self.manifest.lock:
+            known = self.manifest.paths.get(path)
+        # Size and mtime unchanged: trust the recorded hash instead of reading the file
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return path, known["sha256"], stat.st_size
+        digest = file_sha256(path)
+        with self.manifest.lock:
+            self.manifest.paths[path] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return path, digest, stat.st_size
+
+    def _upload(self, path: str, digest: str, size: int) -> str:
+        uploaded = self.project_client.agents.upload_file(file_path=path, purpose=self.purpose)
+        with self.manifest.lock:
+            self.manifest.files[digest] = {
+                "file_id": uploaded.id,
+                "filename": os.path.basename(path),
+                "bytes": size,
+                "purpose": str(getattr(self.purpose, "value", self.purpose)),
+                "uploaded_at": int(time.time()),
+            }
+        return uploaded.id
+
+    def _vector_store(self, name: str) -> Dict[str, Any]:
+        agents = self.project_client.agents
+        entry = self.manifest.vector_stores.get(name)
+        if entry is not None:
+            try:
+                agents.get_vector_store(entry["id"])
+                return entry
+            except ResourceNotFoundError:
+                print(f"[ingestion] Vector store {entry['id']} no longer exists, rebuilding")
+        vector_store = agents.create_vector_store_and_poll(file_ids=[], name=name)
+        entry = {"id": vector_store.id, "files": {}, "updated_at": int(time.time())}
+        with self.manifest.lock:
+            self.manifest.vector_stores[name] = entry
+        self.manifest.save()
+        print(f"[ingestion] Created vector store {name} ({vector_store.id})")
+        return entry
+
+    def _add_batches(self, entry: Dict[str, Any], pending: List[Tuple[str, str]], report: IngestReport) -> None:
+        agents = self.project_client.agents
+        chunks = [pending[i : i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        # Create every batch first so the service indexes them in parallel, then poll them together
+        in_flight: Dict[str, List[Tuple[str, str]]] = {}
+        for chunk in chunks:
+            batch = agents.create_vector_store_file_batch(
+                vector_store_id=entry["id"], file_ids=[file_id for _, file_id in chunk]
+            )
+            in_flight[batch.id] = chunk
+            report.batches += 1
+        delays = self.backoff.delays()
+        while in_flight:
+            time.sleep(next(delays))
+            for batch_id in list(in_flight):
+                batch = agents.get_vector_store_file_batch(vector_store_id=entry["id"], batch_id=batch_id)
+                status = str(getattr(batch.status, "value", batch.status))
+                if status == "in_progress":
+                    continue
+                chunk = in_flight.pop(batch_id)
+                counts = batch.file_counts
+                report.failed += counts.failed + counts.cancelled
+                report.added += counts.completed
+                if status == "completed" and not counts.failed and not counts.cancelled:
+                    indexed = chunk
+                else:
+                    indexed = self._indexed(entry, batch_id, chunk)
+                with self.manifest.lock:
+                    entry["files"].update(indexed)
+                    entry["updated_at"] = int(time.time())
+                self.manifest.save()
+                print(f"[ingestion] Batch {batch_id} {status}: {counts.completed}/{counts.total} indexed")
+                if len(indexed) < len(chunk):
+                    self._forget_deleted([member for member in chunk if member not in indexed])
+                    print(f"[ingestion] {len(chunk) - len(indexed)} files of batch {batch_id} not indexed, retried on the next sync")
+
+    def _indexed(self, entry: Dict[str, Any], batch_id: str, chunk: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Members of a failed or partly failed batch that the service did index."""
+        agents = self.project_client.agents
+        indexed: Set[str] = set()
+        after: Optional[str] = None
+        while True:
+            page = agents.list_vector_store_file_batch_files(
+                vector_store_id=entry["id"], batch_id=batch_id, filter="completed", limit=100, after=after
+            )
+            indexed.update(member.id for member in page.data)
+            if not page.has_more or not page.last_id:
+                break
+            after = page.last_id
+        return [(digest, file_id) for digest, file_id in chunk if file_id in indexed]
+
+    def _forget_deleted(self, failed: List[Tuple[str, str]]) -> None:
+        """Drops failed batch members whose file no longer exists on the service from the manifest."""
+        agents = self.project_client.agents
+        gone = []
+        for digest, file_id in failed:
+            try:
+                agents.get_file(file_id)
+            except ResourceNotFoundError:
+                gone.append((digest, file_id))
+        if not gone:
+            return
+        with self.manifest.lock:
+            for digest, file_id in gone:
+                if self.manifest.files.get(digest, {}).get("file_id") == file_id:
+                    del self.manifest.files[digest]
+        self.manifest.save()
+        print(f"[ingestion] {len(gone)} failed files were deleted on the service, uploaded again on the next sync")
+
+    def _referenced_elsewhere(self, entry: Dict[str, Any], file_id: str) -> bool:
+        with self.manifest.lock:
+            return any(
+                file_id in other["files"].values() for other in self.manifest.vector_stores.values() if other is not entry
+            )
+
+    def _remove(self, entry: Dict[str, Any], stale: Dict[str, str], live_ids: Set[str], report: IngestReport) -> None:
+        agents = self.project_client.agents
+        for digest, file_id in stale.items():
+            try:
+                agents.delete_vector_store_file(vector_store_id=entry["id"], file_id=file_id)
+            except ResourceNotFoundError:
+                pass
+            if self.delete_removed_files and file_id not in live_ids and not self._referenced_elsewhere(entry, file_id):
+                try:
+                    agents.delete_file(file_id)
+                except ResourceNotFoundError:
+                    pass
+                with self.manifest.lock:
+                    if self.manifest.files.get(digest, {}).get("file_id") == file_id:
+                        del self.manifest.files[digest]
+            with self.manifest.lock:
+                entry["files"].pop(digest, None)
+            report.removed += 1
+        self.manifest.save()
+
+    def sync(self, directory: str, vector_store_name: str) -> IngestReport:
+        """
+        Makes the named vector store contain exactly the directory's current files.
+
+        :param directory: Directory to ingest, walked recursively; dot files are skipped.
+        :param vector_store_name: Manifest key and vector store name.
+        :return: What was uploaded, added and removed, with upload throughput.
+        """
+        start = time.perf_counter()
+        report = IngestReport()
+        entry = self._vector_store(vector_store_name)
+        report.vector_store_id = entry["id"]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            hashed = list(pool.map(self._hash, self._walk(directory)))
+            report.scanned = len(hashed)
+            # Identical content in several paths is uploaded and indexed once
+            current: Dict[str, Tuple[str, int]] = {}
+            for path, digest, size in hashed:
+                current.setdefault(digest, (path, size))
+
+            file_ids: Dict[str, str] = {}
+            to_upload = []
+            for digest, (path, size) in current.items():
+                known = self.manifest.files.get(digest)
+                if known is not None:
+                    file_ids[digest] = known["file_id"]
+                    report.reused += 1
+                else:
+                    to_upload.append((digest, path, size))
+
+            upload_start = time.perf_counter()
+            futures = {pool.submit(self._upload, path, digest, size): (digest, path, size) for digest, path, size in to_upload}
+            for done, future in enumerate(as_completed(futures), 1):
+                digest, path, size = futures[future]
+                try:
+                    file_ids[digest] = future.result()
+                    report.uploaded += 1
+                    report.bytes_uploaded += size
+                except Exception as e:
+                    report.failed += 1
+                    print(f"[ingestion] Upload of {path} failed: {e}")
+                if done % self.save_every == 0:
+                    self.manifest.save()
+                    print(f"[ingestion] Uploaded {done}/{len(futures)} files")
+            report.upload_seconds = time.perf_counter() - upload_start
+        self.manifest.save()
+
+        members = dict(entry["files"])
+        stale = {digest: file_id for digest, file_id in members.items() if file_ids.get(digest) != file_id}
+        pending = [(digest, file_id) for digest, file_id in file_ids.items() if members.get(digest) != file_id]
+        if stale:
+            self._remove(entry, stale, set(file_ids.values()), report)
+        if pending:
+            self._add_batches(entry, pending, report)
+
+        # Forget hashes of paths that no longer exist under the directory
+        root = os.path.abspath(directory) + os.sep
+        seen = {path for path, _, _ in hashed}
+        with self.manifest.lock:
+            for path in [p for p in self.manifest.paths if p.startswith(root) and p not in seen]:
+                del self.manifest.paths[path]
+        self.manifest.save()
+
+        report.elapsed = time.perf_counter() - start
+        print(f"[ingestion] {vector_store_name}: {report}")
+        return report
@@ -0,0 +1,804 @@
+"""
+Local stand-in for ``project_client.agents`` used for offline benchmarks.
+
+The mock keeps agents, threads, messages, runs, files and vector stores in
+memory and returns the same SDK model types as the real service, so sample
+code runs against it unchanged. Streams are produced as SSE bytes and parsed
+by the SDK's own AgentRunStream, so custom event handlers see exactly what
+they would see from the service.
+
+Run progress is derived from the clock (queued, then in_progress, then
+completed) rather than driven by background tasks, so thousands of concurrent
+runs cost nothing but the polls made against them. Every call sleeps for a
+configurable network latency, is counted per operation, and can be made to
+fail at a configurable rate.
+"""
+
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.ai.projects.models import (
+    Agent,
+    AgentDeletionStatus,
+    AgentEventHandler,
+    AgentRunStream,
+    AgentThread,
+    AsyncAgentEventHandler,
+    AsyncAgentRunStream,
+    AsyncFunctionTool,
+    FileDeletionStatus,
+    FunctionTool,
+    MessageTextContent,
+    MessageTextDetails,
+    OpenAIFile,
+    OpenAIPageableListOfThreadMessage,
+    OpenAIPageableListOfVectorStoreFile,
+    RequiredFunctionToolCall,
+    RequiredFunctionToolCallDetails,
+    RunCompletionUsage,
+    SubmitToolOutputsAction,
+    SubmitToolOutputsDetails,
+    ThreadMessage,
+    ThreadRun,
+    VectorStore,
+    VectorStoreDeletionStatus,
+    VectorStoreFile,
+    VectorStoreFileBatch,
+    VectorStoreFileCount,
+    VectorStoreFileDeletionStatus,
+)
+
+
+def _tokens(text: str) -> int:
+    # Rough whitespace token count; good enough for usage accounting on the mock
+    return max(1, len(text.split()))
+
+
+def _sse(event: str, data: Any) -> bytes:
+    payload = data if isinstance(data, str) else json.dumps(data.as_dict() if hasattr(data, "as_dict") else data)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+@dataclass
+class _MockRun:
+    run: ThreadRun
+    started: float
+    prompt_tokens: int = 0
+    tool_calls_pending: bool = False
+    tool_outputs: List[Any] = field(default_factory=list)
+    replied: bool = False
+    cancelled: bool = False
+    fail: bool = False
+
+
+@dataclass
+class _MockBatch:
+    batch: VectorStoreFileBatch
+    started: float
+    ready_after: float
+
+
+class MockAgentsBackend:
+    """
+    In-memory state shared by the mock clients.
+
+    :param latency: Seconds each call waits, standing in for a network round trip.
+    :param queue_time: Seconds a new run stays "queued".
+    :param run_duration: Seconds from run creation until it is "completed".
+    :param reply: Text of the assistant message added when a run completes.
+    :param tool_calls: Optional function calls, as (name, arguments) pairs, that every run
+        requests once through "requires_action" before it can complete.
+    :param file_processing_time: Seconds ``upload_file_and_poll`` waits for processing.
+    :param index_time_per_file: Seconds of vector-store indexing per file.
+    :param failure_rate: Probability that any call raises HttpResponseError.
+    :param fail_operations: Per-operation failure probabilities, overriding ``failure_rate``.
+    :param run_failure_rate: Probability that a run ends "failed" instead of "completed".
+    :param stream_chunk_interval: Seconds between streamed message deltas.
+    :param seed: Seed for the failure injection, for repeatable benchmarks.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        queue_time: float = 0.05,
+        run_duration: float = 0.5,
+        reply: str = "This is a mock agent reply.",
+        tool_calls: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+        file_processing_time: float = 0.0,
+        index_time_per_file: float = 0.0,
+        failure_rate: float = 0.0,
+        fail_operations: Optional[Dict[str, float]] = None,
+        run_failure_rate: float = 0.0,
+        stream_chunk_interval: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.queue_time = queue_time
+        self.run_duration = run_duration
+        self.reply = reply
+        self.tool_calls = list(tool_calls or [])
+        self.file_processing_time = file_processing_time
+        self.index_time_per_file = index_time_per_file
+        self.failure_rate = failure_rate
+        self.fail_operations = dict(fail_operations or {})
+        self.run_failure_rate = run_failure_rate
+        self.stream_chunk_interval = stream_chunk_interval
+        self.request_counts: Counter = Counter()
+        self.agents: Dict[str, Agent] = {}
+        self.threads: Dict[str, List[ThreadMessage]] = {}
+        self.runs: Dict[str, _MockRun] = {}
+        self.files: Dict[str, OpenAIFile] = {}
+        self.vector_stores: Dict[str, VectorStore] = {}
+        self.vector_store_files: Dict[str, Dict[str, VectorStoreFile]] = {}
+        self.batches: Dict[str, _MockBatch] = {}
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}_mock{next(self._ids):08d}"
+
+    def count(self, operation: str) -> None:
+        """Counts a call and raises an injected failure if one is due."""
+        self.request_counts[operation] += 1
+        rate = self.fail_operations.get(operation, self.failure_rate)
+        if rate and self._random.random() < rate:
+            raise HttpResponseError(message=f"Injected failure in {operation}")
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.request_counts.values())
+
+    # -- Agents --------------------------------------------------------------
+
+    def create_agent(self, model: str, name: Optional[str] = None, instructions: Optional[str] = None, **kwargs: Any) -> Agent:
+        toolset = kwargs.get("toolset")
+        tools = kwargs.get("tools") or (toolset.definitions if toolset is not None else [])
+        agent = Agent(
+            id=self._new_id("asst"),
+            object="assistant",
+            created_at=int(time.time()),
+            name=name,
+            model=model,
+            instructions=instructions,
+            tools=tools,
+        )
+        self.agents[agent.id] = agent
+        return agent
+
+    def get_agent(self, agent_id: str) -> Agent:
+        if agent_id not in self.agents:
+            raise ResourceNotFoundError(message=f"No agent found with id '{agent_id}'")
+        return self.agents[agent_id]
+
+    def update_agent(self, agent_id: str, **kwargs: Any) -> Agent:
+        agent = self.get_agent(agent_id)
+        for key in ("model", "name", "instructions", "tools"):
+            if kwargs.get(key) is not None:
+                agent[key] = kwargs[key]
+        return agent
+
+    def delete_agent(self, agent_id: str) -> AgentDeletionStatus:
+        self.agents.pop(agent_id, None)
+        return AgentDeletionStatus(id=agent_id, deleted=True, object="assistant.deleted")
+
+    # -- Threads and messages ------------------------------------------------
+
+    def create_thread(self, **kwargs: Any) -> AgentThread:
+        thread = AgentThread(id=self._new_id("thread"), object="thread", created_at=int(time.time()))
+        self.threads[thread.id] = []
+        return thread
+
+    def list_threads(self, **kwargs: Any) -> List[AgentThread]:
+        return [AgentThread(id=thread_id, object="thread", created_at=0) for thread_id in self.threads]
+
+    def _thread(self, thread_id: str) -> List[ThreadMessage]:
+        if thread_id not in self.threads:
+            raise ResourceNotFoundError(message=f"No thread found with id '{thread_id}'")
+        return self.threads[thread_id]
+
+    def _message(self, thread_id: str, role: str, text: str, run_id: Optional[str] = None, agent_id: Optional[str] = None) -> ThreadMessage:
+        message = ThreadMessage(
+            id=self._new_id("msg"),
+            object="thread.message",
+            created_at=int(time.time()),
+            thread_id=thread_id,
+            status="completed",
+            role=role,
+            content=[MessageTextContent(text=MessageTextDetails(value=text, annotations=[]))],
+            run_id=run_id,
+            agent_id=agent_id,
+            attachments=[],
+            metadata={},
+        )
+        self._thread(thread_id).append(message)
+        return message
+
+    def create_message(self, thread_id: str, role: str, content: str, **kwargs: Any) -> ThreadMessage:
+        return self._message(thread_id, getattr(role, "value", role), content)
+
+    def list_messages(self, thread_id: str, order: Optional[str] = None, run_id: Optional[str] = None, **kwargs: Any) -> OpenAIPageableListOfThreadMessage:
+        messages = [m for m in self._thread(thread_id) if run_id is None or m.run_id == run_id]
+        # Like the service, newest first unless ascending order is requested
+        if getattr(order, "value", order) != "asc":
+            messages.reverse()
+        return OpenAIPageableListOfThreadMessage(
+            object="list",
+            data=messages,
+            first_id=messages[0].id if messages else None,
+            last_id=messages[-1].id if messages else None,
+            has_more=False,
+        )
+
+    # -- Runs ----------------------------------------------------------------
+
+    def create_run(self, thread_id: str, agent_id: str, **kwargs: Any) -> ThreadRun:
+        messages = self._thread(thread_id)
+        run = ThreadRun(
+            id=self._new_id("run"),
+            object="thread.run",
+            created_at=int(time.time()),
+            thread_id=thread_id,
+            agent_id=agent_id,
+            status="queued",
+            instructions=kwargs.get("instructions") or "",
+            model=self.agents[agent_id].model if agent_id in self.agents else "mock",
+            tools=[],
+            metadata={},
+        )
+        self.runs[run.id] = _MockRun(
+            run=run,
+            started=time.monotonic(),
+            prompt_tokens=sum(_tokens(m.content[0].text.value) for m in messages),
+            tool_calls_pending=bool(self.tool_calls),
+            fail=bool(self.run_failure_rate) and self._random.random() < self.run_failure_rate,
+        )
+        return run
+
+    def _run(self, run_id: str) -> _MockRun:
+        if run_id not in self.runs:
+            raise ResourceNotFoundError(message=f"No run found with id '{run_id}'")
+        return self.runs[run_id]
+
+    def _required_action(self, state: _MockRun) -> SubmitToolOutputsAction:
+        calls = [
+            RequiredFunctionToolCall(
+                id=f"call_{state.run.id}_{index}",
+                function=RequiredFunctionToolCallDetails(name=name, arguments=json.dumps(arguments)),
+            )
+            for index, (name, arguments) in enumerate(self.tool_calls)
+        ]
+        return SubmitToolOutputsAction(
+            submit_tool_outputs=SubmitToolOutputsDetails(tool_calls=calls)
+        )
+
+    def get_run(self, thread_id: str, run_id: str) -> ThreadRun:
+        state = self._run(run_id)
+        run = state.run
+        age = time.monotonic() - state.started
+        if run.status in ("completed", "failed", "cancelled"):
+            return run
+        if state.cancelled:
+            run.status = "cancelled"
+        elif state.tool_calls_pending and age >= self.queue_time:
+            # The run waits for tool outputs; its clock restarts once they are submitted
+            run.status = "requires_action"
+            run.required_action = self._required_action(state)
+        elif age >= self.run_duration:
+            self._finish(state)
+        elif age >= self.queue_time:
+            run.status = "in_progress"
+        return run
+
+    def _finish(self, state: _MockRun) -> None:
+        run = state.run
+        if state.fail:
+            run.status = "failed"
+            run.last_error = {"code": "server_error", "message": "Injected run failure"}
+            return
+        run.status = "completed"
+        run.required_action = None
+        completion_tokens = _tokens(self.reply)
+        run.usage = RunCompletionUsage(
+            prompt_tokens=state.prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=state.prompt_tokens + completion_tokens,
+        )
+        if not state.replied:
+            state.replied = True
+            self._message(run.thread_id, "assistant", self.reply, run_id=run.id, agent_id=run.agent_id)
+
+    def submit_tool_outputs_to_run(self, thread_id: str, run_id: str, tool_outputs: List[Any], **kwargs: Any) -> ThreadRun:
+        state = self._run(run_id)
+        if state.run.status != "requires_action":
+            raise HttpResponseError(message=f"Run '{run_id}' is not waiting for tool outputs")
+        state.tool_outputs = list(tool_outputs)
+        state.tool_calls_pending = False
+        state.started = time.monotonic() - self.queue_time
+        state.run.status = "in_progress"
+        state.run.required_action = None
+        return state.run
+
+    def cancel_run(self, thread_id: str, run_id: str) -> ThreadRun:
+        state = self._run(run_id)
+        state.cancelled = True
+        state.run.status = "cancelling"
+        return state.run
+
+    def stream_frames(self, thread_id: str, agent_id: str, **kwargs: Any) -> Tuple[str, List[bytes]]:
+        """
+        Builds the SSE frames for a streamed run.
+
+        A run with scripted tool calls stops at ``thread.run.requires_action``; the rest
+        of its frames come from ``resume_stream_frames`` once the outputs are submitted.
+
+        :return: The run id and the frames, one ``bytes`` object per event.
+        """
+        run = self.create_run(thread_id=thread_id, agent_id=agent_id, **kwargs)
+        state = self.runs[run.id]
+        frames = [_sse("thread.run.created", run)]
+        run.status = "in_progress"
+        frames.append(_sse("thread.run.in_progress", run))
+        if state.tool_calls_pending:
+            run.status = "requires_action"
+            run.required_action = self._required_action(state)
+            frames.append(_sse("thread.run.requires_action", run))
+            return run.id, frames
+        return run.id, frames + self._reply_frames(state)
+
+    def resume_stream_frames(self, run_id: str, tool_outputs: List[Any]) -> List[bytes]:
+        """Accepts tool outputs for a streamed run and builds the frames that follow."""
+        state = self._run(run_id)
+        self.submit_tool_outputs_to_run(thread_id=state.run.thread_id, run_id=run_id, tool_outputs=tool_outputs)
+        return [_sse("thread.run.in_progress", state.run)] + self._reply_frames(state)
+
+    def _reply_frames(self, state: _MockRun) -> List[bytes]:
+        run = state.run
+        message_id = self._new_id("msg")
+        frames = [
+            _sse(
+                "thread.message.created",
+                {"id": message_id, "object": "thread.message", "created_at": int(time.time()), "thread_id": run.thread_id,
+                 "status": "in_progress", "role": "assistant", "content": [], "run_id": run.id, "agent_id": run.agent_id,
+                 "attachments": [], "metadata": {}},
+            )
+        ]
+        for index, word in enumerate(self.reply.split(" ")):
+            text = word if index == 0 else " " + word
+            frames.append(
+                _sse(
+                    "thread.message.delta",
+                    {"id": message_id, "object": "thread.message.delta",
+                     "delta": {"role": "assistant", "content": [{"index": 0, "type": "text", "text": {"value": text, "annotations": []}}]}},
+                )
+            )
+        self._finish(state)
+        frames.append(_sse("thread.message.completed", self.threads[run.thread_id][-1]))
+        frames.append(_sse("thread.run.completed", run))
+        frames.append(_sse("done", "[DONE]"))
+        return frames
+
+    # -- Files and vector stores ---------------------------------------------
+
+    def upload_file(self, file_path: Optional[str] = None, purpose: Any = None, file: Any = None, filename: Optional[str] = None, **kwargs: Any) -> OpenAIFile:
+        if file_path is not None:
+            size = os.path.getsize(file_path)
+            filename = filename or os.path.basename(file_path)
+        else:
+            content = file[1] if isinstance(file, tuple) else file
+            size = len(content) if isinstance(content, (bytes, str)) else 0
+        uploaded = OpenAIFile(
+            id=self._new_id("assistant-file"),
+            object="file",
+            bytes=size,
+            filename=filename or "upload",
+            created_at=int(time.time()),
+            purpose=getattr(purpose, "value", purpose) or "assistants",
+            status="processed",
+        )
+        self.files[uploaded.id] = uploaded
+        return uploaded
+
+    def get_file(self, file_id: str) -> OpenAIFile:
+        if file_id not in self.files:
+            raise ResourceNotFoundError(message=f"No file found with id '{file_id}'")
+        return self.files[file_id]
+
+    def delete_file(self, file_id: str) -> FileDeletionStatus:
+        self.get_file(file_id)
+        del self.files[file_id]
+        for members in self.vector_store_files.values():
+            members.pop(file_id, None)
+        return FileDeletionStatus(id=file_id, deleted=True, object="file")
+
+    def _file_counts(self, vector_store_id: str) -> VectorStoreFileCount:
+        total = len(self.vector_store_files[vector_store_id])
+        return VectorStoreFileCount(in_progress=0, completed=total, failed=0, cancelled=0, total=total)
+
+    def create_vector_store(self, file_ids: Optional[List[str]] = None, name: Optional[str] = None, **kwargs: Any) -> VectorStore:
+        vector_store = VectorStore(
+            id=self._new_id("vs"),
+            object="vector_store",
+            created_at=int(time.time()),
+            name=name or "",
+            usage_bytes=0,
+            status="completed",
+            last_active_at=int(time.time()),
+            metadata={},
+        )
+        self.vector_stores[vector_store.id] = vector_store
+        self.vector_store_files[vector_store.id] = {}
+        self._add_files(vector_store.id, file_ids or [])
+        return vector_store
+
+    def _add_files(self, vector_store_id: str, file_ids: List[str]) -> None:
+        members = self.vector_store_files[vector_store_id]
+        for file_id in file_ids:
+            uploaded = self.get_file(file_id)
+            members[file_id] = VectorStoreFile(
+                id=file_id,
+                object="vector_store.file",
+                usage_bytes=uploaded.bytes,
+                created_at=int(time.time()),
+                vector_store_id=vector_store_id,
+                status="completed",
+            )
+        vector_store = self.vector_stores[vector_store_id]
+        vector_store.file_counts = self._file_counts(vector_store_id)
+        vector_store.usage_bytes = sum(member.usage_bytes for member in members.values())
+
+    def get_vector_store(self, vector_store_id: str) -> VectorStore:
+        if vector_store_id not in self.vector_stores:
+            raise ResourceNotFoundError(message=f"No vector store found with id '{vector_store_id}'")
+        return self.vector_stores[vector_store_id]
+
+    def delete_vector_store(self, vector_store_id: str) -> VectorStoreDeletionStatus:
+        self.get_vector_store(vector_store_id)
+        del self.vector_stores[vector_store_id]
+        del self.vector_store_files[vector_store_id]
+        return VectorStoreDeletionStatus(id=vector_store_id, deleted=True, object="vector_store.deleted")
+
+    def create_vector_store_file_batch(self, vector_store_id: str, file_ids: Optional[List[str]] = None, **kwargs: Any) -> VectorStoreFileBatch:
+        self.get_vector_store(vector_store_id)
+        file_ids = list(file_ids or [])
+        self._add_files(vector_store_id, file_ids)
+        batch = VectorStoreFileBatch(
+            id=self._new_id("vsfb"),
+            object="vector_store.files_batch",
+            created_at=int(time.time()),
+            vector_store_id=vector_store_id,
+            status="in_progress" if self.index_time_per_file else "completed",
+            file_counts=VectorStoreFileCount(
+                in_progress=0, completed=len(file_ids), failed=0, cancelled=0, total=len(file_ids)
+            ),
+        )
+        self.batches[batch.id] = _MockBatch(batch, time.monotonic(), self.index_time_per_file * len(file_ids))
+        return batch
+
+    def get_vector_store_file_batch(self, vector_store_id: str, batch_id: str) -> VectorStoreFileBatch:
+        state = self.batches[batch_id]
+        if time.monotonic() - state.started >= state.ready_after:
+            state.batch.status = "completed"
+        return state.batch
+
+    def list_vector_store_files(self, vector_store_id: str, **kwargs: Any) -> OpenAIPageableListOfVectorStoreFile:
+        self.get_vector_store(vector_store_id)
+        members = list(self.vector_store_files[vector_store_id].values())
+        return OpenAIPageableListOfVectorStoreFile(
+            object="list",
+            data=members,
+            first_id=members[0].id if members else None,
+            last_id=members[-1].id if members else None,
+            has_more=False,
+        )
+
+    def delete_vector_store_file(self, vector_store_id: str, file_id: str) -> VectorStoreFileDeletionStatus:
+        self.get_vector_store(vector_store_id)
+        self.vector_store_files[vector_store_id].pop(file_id, None)
+        self.vector_stores[vector_store_id].file_counts = self._file_counts(vector_store_id)
+        return VectorStoreFileDeletionStatus(id=file_id, deleted=True, object="vector_store.file.deleted")
+
+
+# Operations that map one-to-one onto a backend method
+_SIMPLE_OPERATIONS = (
+    "create_agent",
+    "get_agent",
+    "update_agent",
+    "delete_agent",
+    "create_thread",
+    "list_threads",
+    "create_message",
+    "list_messages",
+    "create_run",
+    "get_run",
+    "cancel_run",
+    "submit_tool_outputs_to_run",
+    "upload_file",
+    "get_file",
+    "delete_file",
+    "create_vector_store",
+    "get_vector_store",
+    "delete_vector_store",
+    "create_vector_store_file_batch",
+    "get_vector_store_file_batch",
+    "list_vector_store_files",
+    "delete_vector_store_file",
+)
+
+
+def _function_tool_of(
+    functions: Any = None, function_tool: Any = None, toolset: Any = None, tool_type: Any = FunctionTool
+) -> Any:
+    # Same resolution as the SDK's enable_auto_function_calls; the async client uses AsyncFunctionTool
+    if functions:
+        return tool_type(functions)
+    if function_tool is not None:
+        return function_tool
+    if toolset is not None:
+        return toolset.get_tool(tool_type)
+    return None
+
+
+def _sync_operation(name: str) -> Callable[..., Any]:
+    def operation(self: "MockAgentsOperations", *args: Any, **kwargs: Any) -> Any:
+        return self._call(name, *args, **kwargs)
+
+    operation.__name__ = name
+    return operation
+
+
+def _async_operation(name: str) -> Callable[..., Any]:
+    async def operation(self: "AsyncMockAgentsOperations", *args: Any, **kwargs: Any) -> Any:
+        return await self._call(name, *args, **kwargs)
+
+    operation.__name__ = name
+    return operation
+
+
+class MockAgentsOperations:
+    """Sync facade over a MockAgentsBackend, shaped like ``AIProjectClient.agents``."""
+
+    def __init__(self, backend: MockAgentsBackend) -> None:
+        self.backend = backend
+        self._function_tool: Any = None
+
+    def _call(self, operation: str, *args: Any, **kwargs: Any) -> Any:
+        self.backend.count(operation)
+        if self.backend.latency:
+            time.sleep(self.backend.latency)
+        return getattr(self.backend, operation)(*args, **kwargs)
+
+    def enable_auto_function_calls(self, functions: Any = None, function_tool: Any = None, toolset: Any = None, **kwargs: Any) -> None:
+        self._function_tool = _function_tool_of(functions, function_tool, toolset)
+
+    def _execute_tool_calls(self, tool: Any, tool_calls: List[Any]) -> List[Dict[str, Any]]:
+        # Mirrors ToolSet.execute_tool_calls: one call after another
+        return [{"tool_call_id": call.id, "output": tool.execute(call)} for call in tool_calls if call.type == "function"]
+
+    def create_and_process_run(self, thread_id: str, agent_id: str, toolset: Any = None, sleep_interval: float = 1, **kwargs: Any) -> ThreadRun:
+        # Mirrors the SDK helper: fixed poll interval, tool calls executed one after another
+        tool = _function_tool_of(toolset=toolset) if toolset is not None else self._function_tool
+        run = self.create_run(thread_id=thread_id, agent_id=agent_id, **kwargs)
+        while run.status in ("queued", "in_progress", "requires_action"):
+            time.sleep(sleep_interval)
+            run = self.get_run(thread_id=thread_id, run_id=run.id)
+            if run.status == "requires_action" and tool is not None:
+                tool_outputs = self._execute_tool_calls(tool, run.required_action.submit_tool_outputs.tool_calls)
+                run = self.submit_tool_outputs_to_run(thread_id=thread_id, run_id=run.id, tool_outputs=tool_outputs)
+        return run
+
+    def _response_iterator(self, frames: List[bytes]) -> Iterator[bytes]:
+        interval = self.backend.stream_chunk_interval
+        for frame in frames:
+            if interval:
+                time.sleep(interval)
+            yield frame
+
+    def _handle_submit_tool_outputs(self, run: ThreadRun, event_handler: Any, submit_with_error: bool) -> Any:
+        # Stream callback, as in the SDK: run the tools, then continue the same handler
+        if self._function_tool is None or not isinstance(run.required_action, SubmitToolOutputsAction):
+            return []
+        tool_outputs = self._execute_tool_calls(self._function_tool, run.required_action.submit_tool_outputs.tool_calls)
+        if tool_outputs:
+            self.submit_tool_outputs_to_stream(
+                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs, event_handler=event_handler
+            )
+        return tool_outputs
+
+    def submit_tool_outputs_to_stream(self, thread_id: str, run_id: str, tool_outputs: List[Any], event_handler: Any, **kwargs: Any) -> None:
+        self.backend.count("submit_tool_outputs_to_stream")
+        if self.backend.latency:
+            time.sleep(self.backend.latency)
+        frames = self.backend.resume_stream_frames(run_id, tool_outputs)
+        event_handler.initialize(self._response_iterator(frames), self._handle_submit_tool_outputs)
+
+    def create_stream(self, thread_id: str, agent_id: str, event_handler: Any = None, **kwargs: Any) -> AgentRunStream:
+        self.backend.count("create_stream")
+        if self.backend.latency:
+            time.sleep(self.backend.latency)
+        _, frames = self.backend.stream_frames(thread_id, agent_id, **kwargs)
+        return AgentRunStream(
+            self._response_iterator(frames), self._handle_submit_tool_outputs, event_handler or AgentEventHandler()
+        )
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds:
+            time.sleep(seconds)
+
+    def upload_file_and_poll(self, **kwargs: Any) -> OpenAIFile:
+        uploaded = self.upload_file(**kwargs)
+        self._sleep(self.backend.file_processing_time)
+        return uploaded
+
+    def create_vector_store_and_poll(self, file_ids: Optional[List[str]] = None, **kwargs: Any) -> VectorStore:
+        vector_store = self.create_vector_store(file_ids=file_ids, **kwargs)
+        self._sleep(self.backend.index_time_per_file * len(file_ids or []))
+        return vector_store
+
+    def create_vector_store_file_batch_and_poll(self, vector_store_id: str, file_ids: Optional[List[str]] = None, **kwargs: Any) -> VectorStoreFileBatch:
+        batch = self.create_vector_store_file_batch(vector_store_id=vector_store_id, file_ids=file_ids, **kwargs)
+        self._sleep(self.backend.index_time_per_file * len(file_ids or []))
+        return self.get_vector_store_file_batch(vector_store_id=vector_store_id, batch_id=batch.id)
+
+
+class AsyncMockAgentsOperations:
+    """Async facade over a MockAgentsBackend, shaped like ``aio.AIProjectClient.agents``."""
+
+    def __init__(self, backend: MockAgentsBackend) -> None:
+        self.backend = backend
+        self._function_tool: Any = None
+
+    async def _call(self, operation: str, *args: Any, **kwargs: Any) -> Any:
+        self.backend.count(operation)
+        if self.backend.latency:
+            await asyncio.sleep(self.backend.latency)
+        return getattr(self.backend, operation)(*args, **kwargs)
+
+    def enable_auto_function_calls(self, functions: Any = None, function_tool: Any = None, toolset: Any = None, **kwargs: Any) -> None:
+        self._function_tool = _function_tool_of(functions, function_tool, toolset, AsyncFunctionTool)
+
+    async def _execute_tool_calls(self, tool: Any, tool_calls: List[Any]) -> List[Dict[str, Any]]:
+        # Mirrors AsyncToolSet.execute_tool_calls: one call after another
+        tool_outputs = []
+        for call in tool_calls:
+            if call.type == "function":
+                output = tool.execute(call)
+                if inspect.isawaitable(output):
+                    output = await output
+                tool_outputs.append({"tool_call_id": call.id, "output": output})
+        return tool_outputs
+
+    async def create_and_process_run(self, thread_id: str, agent_id: str, toolset: Any = None, sleep_interval: float = 1, **kwargs: Any) -> ThreadRun:
+        # Mirrors the SDK helper: fixed poll interval, tool calls executed one after another
+        tool = _function_tool_of(toolset=toolset, tool_type=AsyncFunctionTool) if toolset is not None else self._function_tool
+        run = await self.create_run(thread_id=thread_id, agent_id=agent_id, **kwargs)
+        while run.status in ("queued", "in_progress", "requires_action"):
+            await asyncio.sleep(sleep_interval)
+            run = await self.get_run(thread_id=thread_id, run_id=run.id)
+            if run.status == "requires_action" and tool is not None:
+                tool_outputs = await self._execute_tool_calls(tool, run.required_action.submit_tool_outputs.tool_calls)
+                run = await self.submit_tool_outputs_to_run(thread_id=thread_id, run_id=run.id, tool_outputs=tool_outputs)
+        return run
+
+    async def _response_iterator(self, frames: List[bytes]) -> AsyncIterator[bytes]:
+        interval = self.backend.stream_chunk_interval
+        for frame in frames:
+            if interval:
+                await asyncio.sleep(interval)
+            yield frame
+
+    async def _handle_submit_tool_outputs(self, run: ThreadRun, event_handler: Any, submit_with_error: bool) -> Any:
+        if self._function_tool is None or not isinstance(run.required_action, SubmitToolOutputsAction):
+            return []
+        tool_outputs = await self._execute_tool_calls(
+            self._function_tool, run.required_action.submit_tool_outputs.tool_calls
+        )
+        if tool_outputs:
+            await self.submit_tool_outputs_to_stream(
+                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs, event_handler=event_handler
+            )
+        return tool_outputs
+
+    async def submit_tool_outputs_to_stream(self, thread_id: str, run_id: str, tool_outputs: List[Any], event_handler: Any, **kwargs: Any) -> None:
+        self.backend.count("submit_tool_outputs_to_stream")
+        if self.backend.latency:
+            await asyncio.sleep(self.backend.latency)
+        frames = self.backend.resume_stream_frames(run_id, tool_outputs)
+        event_handler.initialize(self._response_iterator(frames), self._handle_submit_tool_outputs)
+
+    async def create_stream(self, thread_id: str, agent_id: str, event_handler: Any = None, **kwargs: Any) -> AsyncAgentRunStream:
+        self.backend.count("create_stream")
+        if self.backend.latency:
+            await asyncio.sleep(self.backend.latency)
+        _, frames = self.backend.stream_frames(thread_id, agent_id, **kwargs)
+        return AsyncAgentRunStream(
+            self._response_iterator(frames), self._handle_submit_tool_outputs, event_handler or AsyncAgentEventHandler()
+        )
+
+    async def _sleep(self, seconds: float) -> None:
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    async def upload_file_and_poll(self, **kwargs: Any) -> OpenAIFile:
+        uploaded = await self.upload_file(**kwargs)
+        await self._sleep(self.backend.file_processing_time)
+        return uploaded
+
+    async def create_vector_store_and_poll(self, file_ids: Optional[List[str]] = None, **kwargs: Any) -> VectorStore:
+        vector_store = await self.create_vector_store(file_ids=file_ids, **kwargs)
+        await self._sleep(self.backend.index_time_per_file * len(file_ids or []))
+        return vector_store
+
+    async def create_vector_store_file_batch_and_poll(self, vector_store_id: str, file_ids: Optional[List[str]] = None, **kwargs: Any) -> VectorStoreFileBatch:
+        batch = await self.create_vector_store_file_batch(vector_store_id=vector_store_id, file_ids=file_ids, **kwargs)
+        await self._sleep(self.backend.index_time_per_file * len(file_ids or []))
+        return await self.get_vector_store_file_batch(vector_store_id=vector_store_id, batch_id=batch.id)
+
+
+for _name in _SIMPLE_OPERATIONS:
+    setattr(MockAgentsOperations, _name, _sync_operation(_name))
+    setattr(AsyncMockAgentsOperations, _name, _async_operation(_name))
+
+
+class _MockConnection:
+    def __init__(self, name: str) -> None:
+        self.id = f"/connections/{name}"
+        self.name = name
+
+
+class MockConnectionsOperations:
+    """Returns a placeholder connection for any name, e.g. the Bing connection."""
+
+    def get(self, connection_name: str, **kwargs: Any) -> _MockConnection:
+        return _MockConnection(connection_name)
+
+
+class MockProjectClient:
+    """
+    Sync stand-in for ``azure.ai.projects.AIProjectClient``.
+
+    :param backend: Shared state; a fresh MockAgentsBackend is created if omitted.
+    """
+
+    def __init__(self, backend: Optional[MockAgentsBackend] = None) -> None:
+        self.backend = backend or MockAgentsBackend()
+        self.agents = MockAgentsOperations(self.backend)
+        self.connections = MockConnectionsOperations()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "MockProjectClient":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
+
+
+class AsyncMockProjectClient:
+    """
+    Async stand-in for ``azure.ai.projects.aio.AIProjectClient``.
+
+    :param backend: Shared state; a fresh MockAgentsBackend is created if omitted.
+    """
+
+    def __init__(self, backend: Optional[MockAgentsBackend] = None) -> None:
+        self.backend = backend or MockAgentsBackend()
+        self.agents = AsyncMockAgentsOperations(self.backend)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "AsyncMockProjectClient":
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        await self.close()
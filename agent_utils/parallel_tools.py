@@ -0,0 +1,314 @@
+"""
+Parallel execution of the function tool calls of one run step.
+
+When the model asks for several tools in the same step (for example
+``get_current_datetime`` and ``get_weather_by_location``), the SDK's
+ToolSet runs them one after another, so the run waits for the sum of all
+calls. ParallelToolExecutor runs them concurrently, with sync functions on
+a thread pool and coroutine functions gathered on the event loop. Every
+call gets a deadline, and all outputs of the step go back in a single
+``submit_tool_outputs`` call, so the run only waits for the slowest tool.
+
+Use ``process_run``/``process_run_async`` in place of
+``create_and_process_run``. For streams, pass the handler through
+``stream_handler``/``stream_handler_async``, which reroutes the SDK's
+requires_action callback to the executor.
+
+With a ToolResultCache, calls to tools marked ``@pure`` are answered from
+the cache when the same arguments were seen before, and identical calls
+within one step run once.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from azure.ai.projects.models import AsyncFunctionTool, FunctionTool, SubmitToolOutputsAction
+
+from agent_utils.run_waiter import RunWaiter
+from agent_utils.tool_cache import ToolResultCache, cache_policy, canonical_arguments
+
+
+def _error_output(message: str) -> str:
+    # Same shape as the SDK's FunctionTool errors, so the model can correct itself
+    return json.dumps({"error": message})
+
+
+def _timed_call(function: Callable[..., Any], arguments: Dict[str, Any]) -> Tuple[Any, float]:
+    started = time.monotonic()
+    output = function(**arguments)
+    return output, time.monotonic() - started
+
+
+class ParallelToolExecutor:
+    """
+    Runs all function tool calls of a ``requires_action`` step concurrently.
+
+    :param functions: The tool functions, or a FunctionTool/AsyncFunctionTool built from them.
+    :param max_workers: Threads available to sync functions.
+    :param default_timeout: Deadline in seconds for a tool call, or None for no deadline.
+    :param timeouts: Per-tool deadlines by function name, overriding ``default_timeout``.
+    :param result_cache: Cache for the outputs of tools marked ``@pure``, or None to always run them.
+    """
+
+    def __init__(
+        self,
+        functions: Union[FunctionTool, AsyncFunctionTool, Iterable[Callable[..., Any]]],
+        max_workers: int = 8,
+        default_timeout: Optional[float] = 30.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        result_cache: Optional[ToolResultCache] = None,
+    ) -> None:
+        if isinstance(functions, (FunctionTool, AsyncFunctionTool)):
+            self.function_tool = functions
+        else:
+            self.function_tool = FunctionTool(set(functions))
+        # Kept by reference: a registry's LazyFunctionTool imports its functions on first call
+        self.functions: Mapping[str, Callable[..., Any]] = self.function_tool._functions
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.result_cache = result_cache
+        # Threads of timed-out calls cannot be stopped; they finish in the background
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    @property
+    def definitions(self) -> List[Any]:
+        """Tool definitions for ``create_agent(tools=...)``."""
+        return self.function_tool.definitions
+
+    def timeout_for(self, name: str) -> Optional[float]:
+        return self.timeouts.get(name, self.default_timeout)
+
+    def _prepare(self, tool_call: Any) -> Any:
+        name = tool_call.function.name
+        function = self.functions.get(name)
+        if function is None:
+            raise ValueError(f"Function '{name}' not found.")
+        arguments = json.loads(tool_call.function.arguments or "{}")
+        return function, arguments
+
+    def _cache_key(self, function: Callable[..., Any], arguments: Dict[str, Any]) -> Optional[str]:
+        if self.result_cache is None or cache_policy(function) is None:
+            return None
+        return canonical_arguments(arguments)
+
+    def _store(self, name: str, function: Callable[..., Any], key: str, output: Any, elapsed: float) -> None:
+        if self.result_cache is not None:
+            self.result_cache.put(name, key, output, cache_policy(function), elapsed)
+
+    def _timed_out(self, name: str) -> str:
+        message = f"Function '{name}' timed out after {self.timeout_for(name):g}s"
+        logging.warning(message)
+        return _error_output(message)
+
+    def _failed(self, name: str, e: Exception) -> str:
+        message = f"Error executing function '{name}': {e}"
+        logging.error(message)
+        return _error_output(message)
+
+    def execute(self, tool_calls: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Runs sync function tool calls concurrently on the thread pool.
+
+        :param tool_calls: The ``tool_calls`` of a SubmitToolOutputsAction.
+        :return: One output per function call, in call order; failures and timeouts
+            are returned as error outputs rather than raised.
+        """
+        start = time.monotonic()
+        submitted = []
+        # Identical cacheable calls in one step share a single execution
+        in_step: Dict[Tuple[str, str], Future] = {}
+        for tool_call in tool_calls:
+            if tool_call.type != "function":
+                continue
+            name = tool_call.function.name
+            try:
+                function, arguments = self._prepare(tool_call)
+                key = self._cache_key(function, arguments)
+                if key is None:
+                    submitted.append((tool_call, self._pool.submit(_timed_call, function, arguments), None))
+                    continue
+                if (name, key) in in_step:
+                    submitted.append((tool_call, in_step[(name, key)], None))
+                    continue
+                hit, output = self.result_cache.get(name, key)  # type: ignore[union-attr]
+                if hit:
+                    future: Future = Future()
+                    future.set_result((output, 0.0))
+                    submitted.append((tool_call, future, None))
+                    continue
+                future = in_step[(name, key)] = self._pool.submit(_timed_call, function, arguments)
+                submitted.append((tool_call, future, (function, key)))
+            except Exception as e:
+                submitted.append((tool_call, e, None))
+
+        tool_outputs = []
+        for tool_call, future, cacheable in submitted:
+            name = tool_call.function.name
+            if isinstance(future, Exception):
+                output = self._failed(name, future)
+            else:
+                # Deadlines run from the start of the step, since all calls run at once
+                timeout = self.timeout_for(name)
+                remaining = None if timeout is None else max(0.0, start + timeout - time.monotonic())
+                try:
+                    output, elapsed = future.result(timeout=remaining)
+                    if cacheable is not None:
+                        self._store(name, cacheable[0], cacheable[1], output, elapsed)
+                except FutureTimeoutError:
+                    future.cancel()
+                    output = self._timed_out(name)
+                except Exception as e:
+                    output = self._failed(name, e)
+            tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
+        return tool_outputs
+
+    async def _run_async(self, function: Callable[..., Any], arguments: Dict[str, Any]) -> Tuple[Any, float]:
+        if inspect.iscoroutinefunction(function):
+            started = time.monotonic()
+            output = await function(**arguments)
+            return output, time.monotonic() - started
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _timed_call, function, arguments)
+
+    async def _execute_one_async(self, tool_call: Any, in_step: Dict[Tuple[str, str], "asyncio.Future[Any]"]) -> Dict[str, Any]:
+        name = tool_call.function.name
+        try:
+            function, arguments = self._prepare(tool_call)
+            key = self._cache_key(function, arguments)
+            if key is None:
+                output, _ = await asyncio.wait_for(self._run_async(function, arguments), timeout=self.timeout_for(name))
+            elif (name, key) in in_step:
+                output, _ = await asyncio.wait_for(asyncio.shield(in_step[(name, key)]), timeout=self.timeout_for(name))
+            else:
+                hit, output = self.result_cache.get(name, key)  # type: ignore[union-attr]
+                if not hit:
+                    # Shielded, so a timed-out duplicate does not cancel the shared execution
+                    shared = in_step[(name, key)] = asyncio.ensure_future(self._run_async(function, arguments))
+                    output, elapsed = await asyncio.wait_for(asyncio.shield(shared), timeout=self.timeout_for(name))
+                    self._store(name, function, key, output, elapsed)
+        except asyncio.TimeoutError:
+            output = self._timed_out(name)
+        except Exception as e:
+            output = self._failed(name, e)
+        return {"tool_call_id": tool_call.id, "output": output}
+
+    async def execute_async(self, tool_calls: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Runs function tool calls concurrently: coroutine functions on the event loop,
+        sync functions on the thread pool.
+
+        :param tool_calls: The ``tool_calls`` of a SubmitToolOutputsAction.
+        :return: One output per function call, in call order.
+        """
+        in_step: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        return list(
+            await asyncio.gather(
+                *(self._execute_one_async(call, in_step) for call in tool_calls if call.type == "function")
+            )
+        )
+
+    def _function_calls(self, run: Any) -> List[Any]:
+        if not isinstance(run.required_action, SubmitToolOutputsAction):
+            return []
+        return [call for call in run.required_action.submit_tool_outputs.tool_calls if call.type == "function"]
+
+    def process_run(
+        self, agents: Any, thread_id: str, agent_id: str, run_waiter: Optional[RunWaiter] = None, **run_kwargs: Any
+    ) -> Any:
+        """
+        Creates a run and drives it to completion, answering every tool step in parallel.
+
+        :param agents: ``project_client.agents`` of a sync AIProjectClient.
+        :param thread_id: Thread to run.
+        :param agent_id: Agent to run.
+        :param run_waiter: Waiter used between tool steps; defaults to ``RunWaiter()``.
+        :param run_kwargs: Extra keyword arguments for ``create_run``.
+        :return: The run in its final state.
+        """
+        run_waiter = run_waiter or RunWaiter()
+        run = agents.create_run(thread_id=thread_id, agent_id=agent_id, **run_kwargs)
+        while True:
+            run = run_waiter.wait(agents, thread_id, run)
+            tool_calls = self._function_calls(run)
+            if str(getattr(run.status, "value", run.status)) != "requires_action" or not tool_calls:
+                return run
+            tool_outputs = self.execute(tool_calls)
+            run = agents.submit_tool_outputs_to_run(thread_id=thread_id, run_id=run.id, tool_outputs=tool_outputs)
+
+    async def process_run_async(
+        self, agents: Any, thread_id: str, agent_id: str, run_waiter: Optional[RunWaiter] = None, **run_kwargs: Any
+    ) -> Any:
+        """Async form of ``process_run``, for ``aio.AIProjectClient.agents``."""
+        run_waiter = run_waiter or RunWaiter()
+        run = await agents.create_run(thread_id=thread_id, agent_id=agent_id, **run_kwargs)
+        while True:
+            run = await run_waiter.wait_async(agents, thread_id, run)
+            tool_calls = self._function_calls(run)
+            if str(getattr(run.status, "value", run.status)) != "requires_action" or not tool_calls:
+                return run
+            tool_outputs = await self.execute_async(tool_calls)
+            run = await agents.submit_tool_outputs_to_run(thread_id=thread_id, run_id=run.id, tool_outputs=tool_outputs)
+
+    def stream_handler(self, agents: Any, event_handler: Any) -> Any:
+        """
+        Makes a sync stream handler answer tool steps with this executor.
+
+        The SDK re-installs its own callback every time outputs are submitted to the
+        stream, so the executor's callback is installed again after each submit.
+
+        :param agents: ``project_client.agents`` of a sync AIProjectClient.
+        :param event_handler: Handler passed to ``create_stream``.
+        :return: The same handler, for use inline in ``create_stream(event_handler=...)``.
+        """
+        initialize = event_handler.initialize
+
+        def submit(run: Any, handler: Any, submit_with_error: bool) -> Any:
+            tool_calls = self._function_calls(run)
+            if not tool_calls:
+                return []
+            tool_outputs = self.execute(tool_calls)
+            agents.submit_tool_outputs_to_stream(
+                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs, event_handler=handler
+            )
+            return tool_outputs
+
+        def initialize_with_executor(response_iterator: Any, submit_tool_outputs: Any) -> None:
+            initialize(response_iterator, submit)
+
+        event_handler.initialize = initialize_with_executor
+        return event_handler
+
+    def stream_handler_async(self, agents: Any, event_handler: Any) -> Any:
+        """Async form of ``stream_handler``, for ``aio.AIProjectClient.agents.create_stream``."""
+        initialize = event_handler.initialize
+
+        async def submit(run: Any, handler: Any, submit_with_error: bool) -> Any:
+            tool_calls = self._function_calls(run)
+            if not tool_calls:
+                return []
+            tool_outputs = await self.execute_async(tool_calls)
+            await agents.submit_tool_outputs_to_stream(
+                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs, event_handler=handler
+            )
+            return tool_outputs
+
+        def initialize_with_executor(response_iterator: Any, submit_tool_outputs: Any) -> None:
+            initialize(response_iterator, submit)
+
+        event_handler.initialize = initialize_with_executor
+        return event_handler
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self) -> "ParallelToolExecutor":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
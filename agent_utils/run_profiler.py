@@ -0,0 +1,367 @@
+"""
+Per-run latency breakdown for streamed agent runs, in sync and async forms.
+
+The event handlers in the streaming samples only print status strings, so a
+slow run cannot be told apart from one that sat in the queue, waited on its
+tools or generated a long answer. ProfilingEventHandler and
+AsyncProfilingEventHandler are drop-in bases for AgentEventHandler and
+AsyncAgentEventHandler: they timestamp every ThreadRun status transition,
+every RunStep and the first and last MessageDeltaChunk as the events arrive,
+time the tool-output submissions, and hand a RunProfile to a RunProfiler when
+the run reaches a terminal status. The profiler keeps latency histograms
+across runs and can append every profile to a JSONL file.
+
+    profiler = RunProfiler(export_path=os.getenv("RUN_PROFILE_PATH"))
+
+    class MyEventHandler(ProfilingEventHandler[str]):
+        def on_message_delta(self, delta): ...
+
+    with project_client.agents.create_stream(..., event_handler=MyEventHandler(profiler)) as stream:
+        stream.until_done()
+    print(profiler.summary())
+
+Handlers that override ``__init__`` have to call ``super().__init__(profiler)``.
+The breakdown of a run:
+
+- ``connect_seconds``: handler creation (just before ``create_stream``) to the stream opening
+- ``ttft_seconds``: handler creation to the first message delta
+- ``queue_seconds``: time spent in the ``queued`` status
+- ``tool_seconds``: client-side tool execution and output submission
+- ``model_seconds``: time spent ``in_progress`` (generation and hosted tools such as file search)
+- ``generation_seconds``: first to last message delta
+- ``total_seconds``: handler creation to terminal status
+"""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from azure.ai.projects.models import (
+    AgentEventHandler,
+    AsyncAgentEventHandler,
+    MessageDeltaChunk,
+    RunStep,
+    ThreadRun,
+)
+
+T = TypeVar("T")
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired", "incomplete")
+
+# Upper bounds in seconds; the last bucket takes everything above
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+METRICS = (
+    "total_seconds",
+    "connect_seconds",
+    "ttft_seconds",
+    "queue_seconds",
+    "tool_seconds",
+    "model_seconds",
+    "generation_seconds",
+)
+
+
+def _status(value: Any) -> str:
+    # RunStatus and RunStepStatus are str enums, so this also normalises enum members
+    return str(getattr(value, "value", value))
+
+
+@dataclass
+class RunProfile:
+    """
+    Latency breakdown of one run. Times are in seconds; ``transitions`` and ``steps``
+    are offsets from the start of the run.
+    """
+
+    run_id: str = ""
+    thread_id: str = ""
+    agent_id: str = ""
+    status: str = ""
+    total_seconds: float = 0.0
+    connect_seconds: Optional[float] = None
+    ttft_seconds: Optional[float] = None
+    queue_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    model_seconds: float = 0.0
+    generation_seconds: Optional[float] = None
+    tool_rounds: int = 0
+    deltas: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    transitions: List[Tuple[str, float]] = field(default_factory=list)
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        def fmt(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.2f}s"
+
+        return (
+            f"run {self.run_id} {self.status}: total {fmt(self.total_seconds)}, ttft {fmt(self.ttft_seconds)}, "
+            f"queue {fmt(self.queue_seconds)}, tools {fmt(self.tool_seconds)} in {self.tool_rounds} rounds, "
+            f"model {fmt(self.model_seconds)}, generation {fmt(self.generation_seconds)}"
+        )
+
+
+class _RunTimer:
+    """Event timestamps of one run, collected by a profiling handler."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stream_opened: Optional[float] = None
+        self.transitions: List[Tuple[str, float]] = []
+        self.tool_intervals: List[Tuple[float, float]] = []
+        self.first_delta: Optional[float] = None
+        self.last_delta: Optional[float] = None
+        self.deltas = 0
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.run: Optional[ThreadRun] = None
+        self.finished: Optional[float] = None
+
+    def observe(self, event: Any, at: float) -> None:
+        if isinstance(event, MessageDeltaChunk):
+            if self.first_delta is None:
+                self.first_delta = at
+            self.last_delta = at
+            self.deltas += 1
+        elif isinstance(event, ThreadRun):
+            self.run = event
+            status = _status(event.status)
+            if not self.transitions or self.transitions[-1][0] != status:
+                self.transitions.append((status, at))
+            if status in TERMINAL_STATUSES:
+                self.finished = at
+        elif isinstance(event, RunStep):
+            step = self.steps.setdefault(event.id, {"id": event.id, "type": _status(event.type), "first": at})
+            step["status"] = _status(event.status)
+            step["last"] = at
+
+    def profile(self) -> RunProfile:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        durations: Dict[str, float] = {}
+        for (status, at), (_, next_at) in zip(self.transitions, self.transitions[1:] + [("", end)]):
+            durations[status] = durations.get(status, 0.0) + next_at - at
+        tool_seconds = sum(stop - start for start, stop in self.tool_intervals)
+        if not self.tool_intervals:
+            # Tool outputs were submitted elsewhere; fall back to the time the run waited for them
+            tool_seconds = durations.get("requires_action", 0.0)
+        usage = getattr(self.run, "usage", None) if self.run is not None else None
+        return RunProfile(
+            run_id=getattr(self.run, "id", "") or "",
+            thread_id=getattr(self.run, "thread_id", "") or "",
+            agent_id=getattr(self.run, "agent_id", "") or "",
+            status=self.transitions[-1][0] if self.transitions else "",
+            total_seconds=end - self.started,
+            connect_seconds=None if self.stream_opened is None else self.stream_opened - self.started,
+            ttft_seconds=None if self.first_delta is None else self.first_delta - self.started,
+            queue_seconds=durations.get("queued", 0.0),
+            tool_seconds=tool_seconds,
+            model_seconds=durations.get("in_progress", 0.0),
+            generation_seconds=None if self.first_delta is None else self.last_delta - self.first_delta,  # type: ignore[operator]
+            tool_rounds=len(self.tool_intervals),
+            deltas=self.deltas,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            transitions=[(status, at - self.started) for status, at in self.transitions],
+            steps=[
+                {
+                    "id": step["id"],
+                    "type": step["type"],
+                    "status": step["status"],
+                    "started": step["first"] - self.started,
+                    "seconds": step["last"] - step["first"],
+                }
+                for step in self.steps.values()
+            ],
+        )
+
+
+@dataclass
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. ``counts[i]`` holds the observations up to
+    ``buckets[i]``; the last count holds everything above the last bound.
+    """
+
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "count": self.count, "sum": self.total, "max": self.max}
+
+
+class RunProfiler:
+    """
+    Collects run profiles and keeps a latency histogram per metric across runs.
+
+    :param buckets: Histogram bucket upper bounds in seconds.
+    :param export_path: Optional JSONL file that every profile is appended to as it is recorded.
+    :param keep: Number of recent profiles kept in memory.
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_BUCKETS, export_path: Optional[str] = None, keep: int = 1000
+    ) -> None:
+        self.export_path = export_path
+        self.histograms = {metric: LatencyHistogram(buckets) for metric in METRICS}
+        self.profiles: Deque[RunProfile] = deque(maxlen=keep)
+        self.runs = 0
+        self.statuses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile: RunProfile) -> None:
+        with self._lock:
+            self.profiles.append(profile)
+            self.runs += 1
+            self.statuses[profile.status] = self.statuses.get(profile.status, 0) + 1
+            for metric, histogram in self.histograms.items():
+                value = getattr(profile, metric)
+                if value is not None:
+                    histogram.observe(value)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(profile.to_dict()) + "\n")
+
+    def export_histograms(self, path: str) -> None:
+        """Writes the histograms and run counts as one JSON document."""
+        with self._lock:
+            document = {
+                "runs": self.runs,
+                "statuses": dict(self.statuses),
+                "histograms": {metric: histogram.to_dict() for metric, histogram in self.histograms.items()},
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.runs} runs ({', '.join(f'{s} {n}' for s, n in sorted(self.statuses.items())) or 'none'})",
+            f"{'metric':<20}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}",
+        ]
+        with self._lock:
+            for metric, h in self.histograms.items():
+                lines.append(
+                    f"{metric:<20}{h.count:>7}{h.mean:>9.2f}{h.quantile(0.5):>9.2f}{h.quantile(0.95):>9.2f}{h.max:>9.2f}"
+                )
+        return "\n".join(lines)
+
+
+class _ProfilingHandlerMixin:
+    """Shared state of the sync and async profiling handlers."""
+
+    def _start_profile(self, profiler: Optional[RunProfiler]) -> None:
+        self.profiler = profiler if profiler is not None else RunProfiler()
+        self.profile: Optional[RunProfile] = None
+        self._timer = _RunTimer()
+
+    def _observe(self, event: Any, at: float) -> None:
+        self._timer.observe(event, at)
+        if self._timer.finished is not None and self.profile is None:
+            self.profile = self._timer.profile()
+            self.profiler.record(self.profile)
+
+    def _stream_opened(self) -> None:
+        if self._timer.stream_opened is None:
+            self._timer.stream_opened = time.perf_counter()
+
+
+class ProfilingEventHandler(_ProfilingHandlerMixin, AgentEventHandler[T]):
+    """
+    AgentEventHandler that records a RunProfile of the run it handles.
+
+    :param profiler: Collector the profile is recorded into when the run ends; a private one if not given.
+    """
+
+    def __init__(self, profiler: Optional[RunProfiler] = None) -> None:
+        super().__init__()
+        self._start_profile(profiler)
+
+    def initialize(self, response_iterator: Any, submit_tool_outputs: Callable[[ThreadRun, Any, bool], Any]) -> None:
+        self._stream_opened()
+        timer = self._timer
+
+        def timed_submit(run: ThreadRun, handler: Any, submit_with_error: bool) -> Any:
+            start = time.perf_counter()
+            try:
+                return submit_tool_outputs(run, handler, submit_with_error)
+            finally:
+                timer.tool_intervals.append((start, time.perf_counter()))
+
+        super().initialize(response_iterator, timed_submit)
+
+    def _process_event(self, event_data_str: str) -> Any:
+        at = time.perf_counter()
+        result = super()._process_event(event_data_str)
+        self._observe(result[1], at)
+        return result
+
+
+class AsyncProfilingEventHandler(_ProfilingHandlerMixin, AsyncAgentEventHandler[T]):
+    """
+    AsyncAgentEventHandler that records a RunProfile of the run it handles.
+
+    :param profiler: Collector the profile is recorded into when the run ends; a private one if not given.
+    """
+
+    def __init__(self, profiler: Optional[RunProfiler] = None) -> None:
+        super().__init__()
+        self._start_profile(profiler)
+
+    def initialize(
+        self, response_iterator: Any, submit_tool_outputs: Callable[[ThreadRun, Any, bool], Awaitable[Any]]
+    ) -> None:
+        self._stream_opened()
+        timer = self._timer
+
+        async def timed_submit(run: ThreadRun, handler: Any, submit_with_error: bool) -> Any:
+            start = time.perf_counter()
+            try:
+                return await submit_tool_outputs(run, handler, submit_with_error)
+            finally:
+                timer.tool_intervals.append((start, time.perf_counter()))
+
+        super().initialize(response_iterator, timed_submit)
+
+    async def _process_event(self, event_data_str: str) -> Any:
+        at = time.perf_counter()
+        result = await super()._process_event(event_data_str)
+        self._observe(result[1], at)
+        return result
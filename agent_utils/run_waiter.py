@@ -0,0 +1,286 @@
+"""
+Run waiter with adaptive backoff, in sync and async forms.
+
+The samples used to poll ``get_run`` once a second until a run left the
+queued/in_progress states, which adds up to a second of latency per run and
+sends far too many polls at scale. RunWaiter polls quickly at first and then
+backs off exponentially with jitter, gives up after a maximum wait, can be
+cancelled, and records poll counts and time-to-terminal-state for tuning.
+When the client supports it, ``create_and_wait`` streams the run instead of
+polling at all.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from agent_utils.stats import percentile
+
+# Statuses in which the service is still working on the run. A run that stops in
+# "requires_action" is returned to the caller, which has to submit tool outputs.
+PENDING_STATUSES = ("queued", "in_progress", "cancelling")
+
+
+def _status(run: Any) -> str:
+    # RunStatus is a str enum, so this also normalises enum members
+    return str(getattr(run.status, "value", run.status))
+
+
+@dataclass
+class PollBackoff:
+    """
+    Poll schedule: one fast first poll, then exponential backoff with jitter.
+
+    :param first_delay: Delay in seconds before the first poll.
+    :param initial_delay: Delay before the second poll; later delays grow from here.
+    :param multiplier: Growth factor between consecutive delays.
+    :param max_delay: Upper bound for a single delay.
+    :param jitter: Fraction of each delay that is randomised, to spread out concurrent pollers.
+    """
+
+    first_delay: float = 0.2
+    initial_delay: float = 0.4
+    multiplier: float = 1.6
+    max_delay: float = 5.0
+    jitter: float = 0.2
+
+    def delays(self) -> Iterator[float]:
+        yield self.first_delay
+        delay = self.initial_delay
+        while True:
+            spread = delay * self.jitter
+            yield max(0.0, delay + random.uniform(-spread, spread))
+            delay = min(delay * self.multiplier, self.max_delay)
+
+
+@dataclass
+class RunWaitStats:
+    """What it took for one run to reach a terminal state."""
+
+    run_id: str
+    status: str
+    polls: int
+    elapsed: float
+    streamed: bool = False
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+class RunWaitTimeout(TimeoutError):
+    """Raised when a run is still pending after the waiter's ``max_wait``."""
+
+    def __init__(self, run: Any, stats: RunWaitStats) -> None:
+        super().__init__(f"Run {stats.run_id} still '{stats.status}' after {stats.elapsed:.1f}s")
+        self.run = run
+        self.stats = stats
+
+
+class RunWaiter:
+    """
+    Waits for agent runs to finish.
+
+    :param backoff: Poll schedule; defaults to ``PollBackoff()``.
+    :param max_wait: Seconds to wait before cancelling the run and raising RunWaitTimeout.
+    :param history_size: Number of recent RunWaitStats kept for ``summary()``.
+    """
+
+    def __init__(
+        self, backoff: Optional[PollBackoff] = None, max_wait: float = 300.0, history_size: int = 1000
+    ) -> None:
+        self.backoff = backoff or PollBackoff()
+        self.max_wait = max_wait
+        self.history: Deque[RunWaitStats] = deque(maxlen=history_size)
+
+    def _record(self, run: Any, polls: int, start: float, **flags: bool) -> RunWaitStats:
+        stats = RunWaitStats(
+            run_id=run.id, status=_status(run), polls=polls, elapsed=time.perf_counter() - start, **flags
+        )
+        self.history.append(stats)
+        return stats
+
+    def wait(self, agents: Any, thread_id: str, run: Any, cancel_event: Optional[threading.Event] = None) -> Any:
+        """
+        Polls a run until it leaves the pending statuses.
+
+        :param agents: ``project_client.agents`` of a sync AIProjectClient.
+        :param thread_id: Thread the run belongs to.
+        :param run: The run returned by ``create_run``.
+        :param cancel_event: Optional event; when set, the run is cancelled and returned.
+        :return: The run in its final (or requires_action) state.
+        :raises RunWaitTimeout: If the run is still pending after ``max_wait``.
+        """
+        start = time.perf_counter()
+        deadline = start + self.max_wait
+        polls = 0
+        delays = self.backoff.delays()
+        while _status(run) in PENDING_STATUSES:
+            if cancel_event is not None and cancel_event.is_set():
+                run = agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                self._record(run, polls, start, cancelled=True)
+                return run
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                raise RunWaitTimeout(run, self._record(run, polls, start, timed_out=True))
+            delay = min(next(delays), remaining)
+            # Waiting on the event lets cancellation interrupt the sleep
+            if cancel_event is not None:
+                cancel_event.wait(delay)
+            else:
+                time.sleep(delay)
+            run = agents.get_run(thread_id=thread_id, run_id=run.id)
+            polls += 1
+        self._record(run, polls, start)
+        return run
+
+    async def wait_async(self, agents: Any, thread_id: str, run: Any) -> Any:
+        """
+        Awaits a run until it leaves the pending statuses without blocking the event loop.
+
+        Cancelling the awaiting task also cancels the run on the service.
+
+        :param agents: ``project_client.agents`` of an async AIProjectClient.
+        :param thread_id: Thread the run belongs to.
+        :param run: The run returned by ``create_run``.
+        :return: The run in its final (or requires_action) state.
+        :raises RunWaitTimeout: If the run is still pending after ``max_wait``.
+        """
+        start = time.perf_counter()
+        deadline = start + self.max_wait
+        polls = 0
+        delays = self.backoff.delays()
+        try:
+            while _status(run) in PENDING_STATUSES:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    await agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                    raise RunWaitTimeout(run, self._record(run, polls, start, timed_out=True))
+                await asyncio.sleep(min(next(delays), remaining))
+                run = await agents.get_run(thread_id=thread_id, run_id=run.id)
+                polls += 1
+        except asyncio.CancelledError:
+            self._record(run, polls, start, cancelled=True)
+            await asyncio.shield(agents.cancel_run(thread_id=thread_id, run_id=run.id))
+            raise
+        self._record(run, polls, start)
+        return run
+
+    def create_and_wait(
+        self,
+        agents: Any,
+        thread_id: str,
+        agent_id: str,
+        prefer_stream: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+        **run_kwargs: Any,
+    ) -> Any:
+        """
+        Starts a run and waits for it, streaming when the client supports it.
+
+        Streaming learns about completion as soon as it happens and needs no polls;
+        otherwise the run is created with ``create_run`` and polled with backoff.
+        ``max_wait`` and ``cancel_event`` apply to both: a streamed run checks them
+        at every event, so a stream that sends nothing at all is only bounded by
+        the client's read timeout.
+
+        :param agents: ``project_client.agents`` of a sync AIProjectClient.
+        :param thread_id: Thread to run.
+        :param agent_id: Agent to run.
+        :param prefer_stream: Use ``create_stream`` when available.
+        :param cancel_event: Optional event; when set, the run is cancelled and returned.
+        :param run_kwargs: Extra keyword arguments for ``create_stream``/``create_run``.
+        :return: The run in its final state.
+        :raises RunWaitTimeout: If the run is still pending after ``max_wait``.
+        """
+        if prefer_stream and hasattr(agents, "create_stream"):
+            start = time.perf_counter()
+            deadline = start + self.max_wait
+            run = None
+            with agents.create_stream(thread_id=thread_id, agent_id=agent_id, **run_kwargs) as stream:
+                for _, event_data, _ in stream:
+                    if getattr(event_data, "object", None) == "thread.run":
+                        run = event_data
+                    if run is None or _status(run) not in PENDING_STATUSES:
+                        continue
+                    if cancel_event is not None and cancel_event.is_set():
+                        run = agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                        self._record(run, 0, start, streamed=True, cancelled=True)
+                        return run
+                    if time.perf_counter() >= deadline:
+                        agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                        raise RunWaitTimeout(run, self._record(run, 0, start, streamed=True, timed_out=True))
+            if run is not None:
+                self._record(run, 0, start, streamed=True)
+                return run
+        run = agents.create_run(thread_id=thread_id, agent_id=agent_id, **run_kwargs)
+        return self.wait(agents, thread_id, run, cancel_event)
+
+    async def create_and_wait_async(
+        self, agents: Any, thread_id: str, agent_id: str, prefer_stream: bool = True, **run_kwargs: Any
+    ) -> Any:
+        """
+        Async form of ``create_and_wait``.
+
+        A streamed run is bounded by ``max_wait`` even if the stream goes quiet, and
+        cancelling the awaiting task also cancels the run on the service.
+
+        :param agents: ``project_client.agents`` of an async AIProjectClient.
+        :param thread_id: Thread to run.
+        :param agent_id: Agent to run.
+        :param prefer_stream: Use ``create_stream`` when available.
+        :param run_kwargs: Extra keyword arguments for ``create_stream``/``create_run``.
+        :return: The run in its final state.
+        :raises RunWaitTimeout: If the run is still pending after ``max_wait``.
+        """
+        if prefer_stream and hasattr(agents, "create_stream"):
+            start = time.perf_counter()
+            latest: Dict[str, Any] = {}
+
+            async def consume() -> None:
+                async with await agents.create_stream(thread_id=thread_id, agent_id=agent_id, **run_kwargs) as stream:
+                    async for _, event_data, _ in stream:
+                        if getattr(event_data, "object", None) == "thread.run":
+                            latest["run"] = event_data
+
+            try:
+                await asyncio.wait_for(consume(), self.max_wait)
+            except asyncio.TimeoutError:
+                run = latest.get("run")
+                if run is None:
+                    raise TimeoutError(f"No run event streamed within {self.max_wait:.1f}s") from None
+                if _status(run) in PENDING_STATUSES:
+                    await agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                    raise RunWaitTimeout(run, self._record(run, 0, start, streamed=True, timed_out=True)) from None
+            except asyncio.CancelledError:
+                run = latest.get("run")
+                if run is not None and _status(run) in PENDING_STATUSES:
+                    self._record(run, 0, start, streamed=True, cancelled=True)
+                    await asyncio.shield(agents.cancel_run(thread_id=thread_id, run_id=run.id))
+                raise
+            run = latest.get("run")
+            if run is not None:
+                self._record(run, 0, start, streamed=True)
+                return run
+        run = await agents.create_run(thread_id=thread_id, agent_id=agent_id, **run_kwargs)
+        return await self.wait_async(agents, thread_id, run)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Aggregates the recorded runs.
+
+        :return: Run count, mean polls per run and p50/p95/max time-to-terminal-state in seconds.
+        """
+        if not self.history:
+            return {"runs": 0}
+        elapsed = [stats.elapsed for stats in self.history]
+        return {
+            "runs": len(elapsed),
+            "mean_polls": sum(stats.polls for stats in self.history) / len(elapsed),
+            "p50_s": percentile(elapsed, 50),
+            "p95_s": percentile(elapsed, 95),
+            "max_s": max(elapsed),
+        }
@@ -0,0 +1,22 @@
+"""
+Statistics helpers shared by the run waiter, the Section_9 batch runner and
+the benchmarks.
+"""
+
+import math
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    :param values: The sample, in any order.
+    :param pct: Percentile between 0 and 100.
+    :return: The percentile value, or 0.0 for an empty sample.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,147 @@
+"""
+Result cache for pure function tools.
+
+Many user tools are pure: ``add_two_numbers`` returns the same JSON for the
+same arguments every time, and the mock lookups change rarely. Marking a
+tool with ``@pure`` (or ``@pure(ttl=...)`` for lookups that may go stale)
+lets ParallelToolExecutor answer repeated calls from ToolResultCache
+instead of running the tool and serializing its result again.
+
+Entries are keyed by the tool name and its arguments as canonical JSON
+(sorted keys, no whitespace), so ``{"a": 1, "b": 2}`` and ``{"b":2,"a":1}``
+share an entry. Only successful outputs are cached; errors always re-run.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_POLICY_ATTRIBUTE = "__tool_cache_policy__"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How long a pure tool's results stay valid.
+
+    :param ttl: Seconds before a cached result expires, or None to keep it until evicted.
+    """
+
+    ttl: Optional[float] = None
+
+
+def pure(function: Optional[Callable[..., Any]] = None, *, ttl: Optional[float] = None) -> Any:
+    """
+    Marks a tool function as pure, so its results can be cached.
+
+    Usable bare (``@pure``) or with a time to live (``@pure(ttl=300)``). The function
+    itself is returned unchanged, so its signature and tool definition are not affected.
+
+    :param function: The tool function, when used without arguments.
+    :param ttl: Seconds a result stays valid; None means until evicted.
+    """
+
+    def mark(f: Callable[..., Any]) -> Callable[..., Any]:
+        setattr(f, _POLICY_ATTRIBUTE, CachePolicy(ttl=ttl))
+        return f
+
+    return mark(function) if function is not None else mark
+
+
+def cache_policy(function: Callable[..., Any]) -> Optional[CachePolicy]:
+    """Returns the policy set with ``@pure``, or None if the tool must always run."""
+    return getattr(function, _POLICY_ATTRIBUTE, None)
+
+
+def canonical_arguments(arguments: Any) -> str:
+    """Serializes tool arguments so that equal arguments give equal keys."""
+    if isinstance(arguments, str):
+        arguments = json.loads(arguments or "{}")
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class ToolCacheStats:
+    """Per-tool cache counters. ``saved_seconds`` is the run time of the calls that were answered from the cache."""
+
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ToolResultCache:
+    """
+    In-memory LRU cache of tool outputs, shared by the threads of a tool executor.
+
+    :param max_entries: Entries kept across all tools before the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.stats: Dict[str, ToolCacheStats] = {}
+        # (tool name, canonical arguments) -> (output, expires_at or None, seconds the call took)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, Optional[float], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str) -> ToolCacheStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = ToolCacheStats()
+        return stats
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up a tool output.
+
+        :param name: Tool name.
+        :param key: Canonical arguments, from ``canonical_arguments``.
+        :return: ``(True, output)`` on a hit, ``(False, None)`` otherwise.
+        """
+        with self._lock:
+            stats = self._stats(name)
+            entry = self._entries.get((name, key))
+            if entry is not None:
+                output, expires_at, elapsed = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end((name, key))
+                    stats.hits += 1
+                    stats.saved_seconds += elapsed
+                    return True, output
+                del self._entries[(name, key)]
+                stats.expired += 1
+            stats.misses += 1
+            return False, None
+
+    def put(self, name: str, key: str, output: Any, policy: CachePolicy, elapsed: float = 0.0) -> None:
+        """Stores a successful tool output under its canonical arguments."""
+        expires_at = time.monotonic() + policy.ttl if policy.ttl is not None else None
+        with self._lock:
+            self._entries[(name, key)] = (output, expires_at, elapsed)
+            self._entries.move_to_end((name, key))
+            while len(self._entries) > self.max_entries:
+                (evicted_name, _), _ = self._entries.popitem(last=False)
+                self._stats(evicted_name).evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self) -> str:
+        lines = [f"{'tool':<32}{'hits':>7}{'misses':>8}{'expired':>9}{'evicted':>9}{'hit_rate':>10}{'saved_ms':>10}"]
+        with self._lock:
+            for name, s in sorted(self.stats.items()):
+                lines.append(
+                    f"{name:<32}{s.hits:>7}{s.misses:>8}{s.expired:>9}{s.evictions:>9}"
+                    f"{s.hit_rate:>10.0%}{s.saved_seconds * 1000:>10.1f}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,314 @@
+"""
+Shared registry of the function tools used by the samples.
+
+The samples used to import one of three identical ``user_functions``
+modules and wrap it in ``FunctionTool``, which imports every tool and
+rebuilds every tool schema from signatures and docstrings at each process
+start. ToolRegistry registers tool modules by name instead:
+
+* schemas are built once per module and cached on disk, keyed by the
+  content of the source files the tools are defined in,
+* a module is only imported when one of its tools is actually called,
+  so startup cost does not grow with the size of the catalog.
+
+A warm start reads the cached definitions and checks each source file's
+size and mtime (hashing only files that changed), without importing any
+tool module.
+
+    from agent_utils.tool_registry import user_tools
+
+    functions = user_tools.function_tool()
+    toolset.add(functions)
+"""
+
+import importlib
+import inspect
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set
+
+from azure.ai.projects import __version__ as sdk_version
+from azure.ai.projects.models import AsyncFunctionTool, FunctionTool, FunctionToolDefinition
+
+from agent_utils.upload_cache import file_sha256
+
+DEFAULT_SCHEMA_CACHE_PATH = os.getenv("TOOL_SCHEMA_CACHE_PATH", ".tool_schemas.json")
+
+
+@dataclass
+class ToolRegistryStats:
+    """Where this process got its tool schemas and functions from."""
+
+    schema_cache_hits: int = 0
+    schemas_built: int = 0
+    modules_imported: int = 0
+
+
+class _LazyFunctions(Mapping[str, Callable[..., Any]]):
+    # Stands in for FunctionTool._functions: names are known up front, functions are imported on first lookup
+
+    def __init__(self, registry: "ToolRegistry", names: Sequence[str]) -> None:
+        self._registry = registry
+        self._names = list(names)
+        self._known = set(names)
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        if name not in self._known:
+            raise KeyError(name)
+        return self._registry.resolve(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._known
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class LazyFunctionTool(FunctionTool):
+    """
+    FunctionTool whose definitions come from a ToolRegistry and whose functions are imported on first call.
+
+    :param registry: Registry the tools are registered with.
+    :param names: Tool names to expose.
+    """
+
+    def __init__(self, registry: "ToolRegistry", names: Sequence[str]) -> None:  # pylint: disable=super-init-not-called
+        self._functions = _LazyFunctions(registry, names)  # type: ignore[assignment]
+        self._definitions = registry.definitions(names)
+
+
+class LazyAsyncFunctionTool(AsyncFunctionTool):
+    """
+    Async form of LazyFunctionTool, for AsyncToolSet and ``aio.AIProjectClient``.
+
+    :param registry: Registry the tools are registered with.
+    :param names: Tool names to expose.
+    """
+
+    def __init__(self, registry: "ToolRegistry", names: Sequence[str]) -> None:  # pylint: disable=super-init-not-called
+        self._functions = _LazyFunctions(registry, names)  # type: ignore[assignment]
+        self._definitions = registry.definitions(names)
+
+
+class ToolRegistry:
+    """
+    Catalog of function tools, registered by module and imported lazily.
+
+    Cache layout::
+
+        {"sdk": version,
+         "modules": {module: {"tools": {name: definition},
+                              "sources": {path: {"sha256", "size", "mtime_ns"}}}}}
+
+    :param cache_path: Location of the schema cache, or None to keep schemas in memory only.
+    """
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_SCHEMA_CACHE_PATH) -> None:
+        self.cache_path = cache_path
+        self.stats = ToolRegistryStats()
+        # module -> explicit tool names, or None to expose every public function defined in it
+        self._modules: Dict[str, Optional[List[str]]] = {}
+        # tool name -> module, for registered modules whose tool names are known
+        self._targets: Dict[str, str] = {}
+        self._functions: Dict[str, Callable[..., Any]] = {}
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._indexed: Set[str] = set()
+        self._imported: Set[str] = set()
+        self._cache: Optional[Dict[str, Any]] = None
+        # Set when the cache changed; it is written once after all modules are indexed
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def register_module(self, module: str, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Registers the tools of a module without importing it.
+
+        :param module: Dotted module name, e.g. ``agent_utils.user_functions``.
+        :param names: Attributes to expose as tools. Defaults to every public function
+            defined in the module itself (imported helpers are left out).
+        """
+        with self._lock:
+            self._modules[module] = None if names is None else list(names)
+            self._indexed.discard(module)
+
+    def tool(self, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Decorator that registers an already imported function; its schema is built in memory on first use."""
+        with self._lock:
+            self._functions[function.__name__] = function
+            self._targets[function.__name__] = function.__module__
+        return function
+
+    def names(self) -> List[str]:
+        """Names of all registered tools, in registration order."""
+        with self._lock:
+            for module in self._modules:
+                self._index(module)
+            if self._dirty:
+                self._save_cache()
+            return list(self._targets)
+
+    def resolve(self, name: str) -> Callable[..., Any]:
+        """Returns the function of a tool, importing its module on first use."""
+        function = self._functions.get(name)
+        if function is not None:
+            return function
+        with self._lock:
+            if name not in self._targets:
+                self.names()
+            module = self._targets.get(name)
+            if module is None:
+                raise ValueError(f"Function '{name}' not found.")
+            function = getattr(self._import(module), name)
+            self._functions[name] = function
+            return function
+
+    def functions(self, names: Optional[Sequence[str]] = None) -> Set[Callable[..., Any]]:
+        """Imports and returns the tool functions, for APIs that take a set of callables."""
+        return {self.resolve(name) for name in (names or self.names())}
+
+    def definitions(self, names: Optional[Sequence[str]] = None) -> List[FunctionToolDefinition]:
+        """
+        Tool definitions for ``create_agent(tools=...)``.
+
+        :param names: Tools to include; defaults to all registered tools.
+        """
+        with self._lock:
+            names = list(names or self.names())
+            missing = [name for name in names if name not in self._definitions]
+            if missing:
+                self.names()
+                built = [name for name in missing if name not in self._definitions and name in self._functions]
+                if built:
+                    self._build(built)
+            unknown = [name for name in names if name not in self._definitions]
+            if unknown:
+                raise ValueError(f"Unknown tools: {', '.join(unknown)}")
+            return [FunctionToolDefinition(self._definitions[name]) for name in names]
+
+    def function_tool(self, names: Optional[Sequence[str]] = None) -> LazyFunctionTool:
+        """FunctionTool over the given tools (default: all), for ToolSet and ``enable_auto_function_calls``."""
+        return LazyFunctionTool(self, list(names or self.names()))
+
+    def async_function_tool(self, names: Optional[Sequence[str]] = None) -> LazyAsyncFunctionTool:
+        """AsyncFunctionTool over the given tools (default: all), for AsyncToolSet."""
+        return LazyAsyncFunctionTool(self, list(names or self.names()))
+
+    def _import(self, module: str) -> Any:
+        loaded = importlib.import_module(module)
+        if module not in self._imported:
+            self._imported.add(module)
+            self.stats.modules_imported += 1
+        return loaded
+
+    def _index(self, module: str) -> None:
+        # Learns a module's tool names and definitions, from the cache if its sources are unchanged
+        if module in self._indexed:
+            return
+        names = self._modules[module]
+        entry = self._load_cache()["modules"].get(module)
+        if entry is not None and self._sources_match(entry) and (names is None or set(names) <= set(entry["tools"])):
+            tools = entry["tools"] if names is None else {name: entry["tools"][name] for name in names}
+            self.stats.schema_cache_hits += len(tools)
+        else:
+            tools = self._build_module(module, names)
+        for name, definition in tools.items():
+            owner = self._targets.get(name)
+            if owner is not None and owner != module:
+                raise ValueError(f"Tool '{name}' is registered by both {owner} and {module}")
+            self._targets[name] = module
+            self._definitions[name] = definition
+        self._indexed.add(module)
+
+    def _build_module(self, module: str, names: Optional[List[str]]) -> Dict[str, Dict[str, Any]]:
+        loaded = self._import(module)
+        if names is None:
+            names = [
+                name
+                for name, value in vars(loaded).items()
+                if inspect.isfunction(value) and value.__module__ == module and not name.startswith("_")
+            ]
+        functions = {name: getattr(loaded, name) for name in names}
+        tools = self._schemas(functions)
+        paths = {inspect.getsourcefile(inspect.unwrap(function)) for function in functions.values()}
+        sources = {os.path.abspath(path): self._fingerprint(path) for path in paths if path}
+        self._load_cache()["modules"][module] = {"tools": tools, "sources": sources}
+        self._dirty = True
+        return tools
+
+    def _build(self, names: List[str]) -> None:
+        # Schemas of tools registered with @tool are built in memory, they have no module entry to cache in
+        functions = {name: self.resolve(name) for name in names}
+        self._definitions.update(self._schemas(functions))
+
+    def _schemas(self, functions: Dict[str, Callable[..., Any]]) -> Dict[str, Dict[str, Any]]:
+        # The SDK's own builder, so cached definitions are exactly what FunctionTool would send
+        built = FunctionTool(set(functions.values())).definitions
+        self.stats.schemas_built += len(built)
+        by_name = {definition.function.name: definition.as_dict() for definition in built}
+        return {name: by_name[function.__name__] for name, function in functions.items()}
+
+    @staticmethod
+    def _fingerprint(path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {"sha256": file_sha256(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _sources_match(self, entry: Dict[str, Any]) -> bool:
+        for path, known in entry.get("sources", {}).items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            # Touched but maybe not edited (e.g. a fresh checkout): compare content before rebuilding
+            if file_sha256(path) != known["sha256"]:
+                return False
+            known["mtime_ns"] = stat.st_mtime_ns
+            self._dirty = True
+        return True
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if self._cache is not None:
+            return self._cache
+        self._cache = {"sdk": sdk_version, "modules": {}}
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # Definitions are only valid for the SDK that built them
+                if data.get("sdk") == sdk_version:
+                    self._cache["modules"] = data.get("modules", {})
+            except (OSError, ValueError) as e:
+                print(f"[tool_registry] Ignoring unreadable schema cache {self.cache_path}: {e}")
+        return self._cache
+
+    def _save_cache(self) -> None:
+        self._dirty = False
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            # The cache only saves startup time, so a read-only checkout still works
+            print(f"[tool_registry] Could not write schema cache {self.cache_path}: {e}")
+
+
+# The catalog shared by the samples of Sections 6 to 8
+user_tools = ToolRegistry()
+user_tools.register_module("agent_utils.user_functions")
+
+async_user_tools = ToolRegistry()
+async_user_tools.register_module(
+    "agent_utils.user_async_functions",
+    names=["fetch_current_datetime_async", "get_weather_by_location", "send_email_async"],
+)
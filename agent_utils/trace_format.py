@@ -0,0 +1,225 @@
+"""
+Compact trace format for evaluation records.
+
+Every line of ``evaluation_input_data.jsonl`` repeats the full
+``tool_definitions`` list and the system prompt, which are the same for
+every run of an agent and make up most of each line. A trace file stores
+each distinct tool definition, tool set and system prompt once, in a
+definition line written just before the first record that uses it, and
+records refer to them by ID:
+
+    {"trace_format": 1}
+    {"$def": "t0", "tool": {"name": "add_two_numbers", ...}}
+    {"$def": "s0", "tools": ["t0", "t1", ...]}
+    {"$def": "p0", "system": "You are a helpful assistant"}
+    {"query": [{"role": "system", "content": {"$ref": "p0"}}, ...], "response": [...],
+     "tool_definitions": {"$ref": "s0"}}
+
+Both the writer and the reader stream: neither holds more than the
+definitions and one record in memory. ``read_trace`` yields records in
+the original ``query``/``response``/``tool_definitions`` shape, with every
+record of a tool set sharing one list of definitions instead of a copy
+per record (so treat them as read-only). It reads plain JSONL files as
+well, and files ending in ``.gz`` are compressed and decompressed on the
+fly.
+
+    python -m agent_utils.trace_format convert evaluation_input_data.jsonl evaluation_input_data.trace.jsonl.gz
+    python -m agent_utils.trace_format expand evaluation_input_data.trace.jsonl.gz evaluation_input_data.jsonl
+"""
+
+import argparse
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+TRACE_FORMAT_VERSION = 1
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class TraceStats:
+    """Counters of a written trace. ``bytes_out`` is the JSON text size, before any compression."""
+
+    records: int = 0
+    tools: int = 0
+    tool_sets: int = 0
+    system_prompts: int = 0
+    bytes_out: int = 0
+
+
+class TraceWriter:
+    """
+    Writes records to a trace file, interning tool definitions and system prompts as they first appear.
+
+    :param path: Trace file to create; compressed with gzip if it ends in ``.gz``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.stats = TraceStats()
+        self._tools: Dict[str, str] = {}
+        self._tool_sets: Dict[Tuple[str, ...], str] = {}
+        self._prompts: Dict[str, str] = {}
+        self._file = _open(path, "w")
+        self._line({"trace_format": TRACE_FORMAT_VERSION})
+
+    def _line(self, value: Dict[str, Any]) -> None:
+        line = json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self.stats.bytes_out += len(line)
+
+    def _tool_set_ref(self, definitions: List[Any]) -> str:
+        ids = []
+        for definition in definitions:
+            key = _canonical(definition)
+            tool_id = self._tools.get(key)
+            if tool_id is None:
+                tool_id = self._tools[key] = f"t{len(self._tools)}"
+                self._line({"$def": tool_id, "tool": definition})
+                self.stats.tools += 1
+            ids.append(tool_id)
+        set_id = self._tool_sets.get(tuple(ids))
+        if set_id is None:
+            set_id = self._tool_sets[tuple(ids)] = f"s{len(self._tool_sets)}"
+            self._line({"$def": set_id, "tools": ids})
+            self.stats.tool_sets += 1
+        return set_id
+
+    def _prompt_ref(self, prompt: str) -> str:
+        prompt_id = self._prompts.get(prompt)
+        if prompt_id is None:
+            prompt_id = self._prompts[prompt] = f"p{len(self._prompts)}"
+            self._line({"$def": prompt_id, "system": prompt})
+            self.stats.system_prompts += 1
+        return prompt_id
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Appends one record in the ``query``/``response``/``tool_definitions`` shape."""
+        compact = dict(record)
+        definitions = record.get("tool_definitions")
+        if isinstance(definitions, list):
+            compact["tool_definitions"] = {"$ref": self._tool_set_ref(definitions)}
+        query = record.get("query")
+        if isinstance(query, list):
+            compact["query"] = [
+                {**m, "content": {"$ref": self._prompt_ref(m["content"])}}
+                if isinstance(m, dict) and m.get("role") == "system" and isinstance(m.get("content"), str)
+                else m
+                for m in query
+            ]
+        self._line(compact)
+        self.stats.records += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.close()
+
+
+def _resolve(record: Dict[str, Any], definitions: Dict[str, Any]) -> Dict[str, Any]:
+    tool_definitions = record.get("tool_definitions")
+    if isinstance(tool_definitions, dict) and "$ref" in tool_definitions:
+        record["tool_definitions"] = definitions[tool_definitions["$ref"]]
+    query = record.get("query")
+    if isinstance(query, list):
+        for message in query:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, dict) and "$ref" in content:
+                message["content"] = definitions[content["$ref"]]
+    return record
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the records of a trace file, or of a plain JSONL file, one line at a time.
+
+    :param path: Trace or JSONL file, optionally gzip-compressed (``.gz``).
+    """
+    definitions: Dict[str, Any] = {}
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            value = json.loads(line)
+            def_id = value.get("$def") if isinstance(value, dict) else None
+            if def_id is None:
+                if "trace_format" in value and len(value) == 1:
+                    if value["trace_format"] > TRACE_FORMAT_VERSION:
+                        raise ValueError(f"{path} uses trace format {value['trace_format']}, newer than this reader")
+                    continue
+                yield _resolve(value, definitions)
+            elif "tool" in value:
+                definitions[def_id] = value["tool"]
+            elif "tools" in value:
+                # One list per tool set, shared by every record that refers to it
+                definitions[def_id] = [definitions[tool_id] for tool_id in value["tools"]]
+            else:
+                definitions[def_id] = value["system"]
+
+
+def write_trace(records: Iterable[Dict[str, Any]], path: str) -> TraceStats:
+    """Writes records to a new trace file and returns its counters."""
+    with TraceWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.stats
+
+
+def convert_jsonl(source: str, destination: str) -> TraceStats:
+    """
+    Converts an evaluation JSONL file (or another trace file) into the trace format, streaming.
+
+    :param source: File to read, e.g. ``evaluation_input_data.jsonl``.
+    :param destination: Trace file to write; gzip-compressed if it ends in ``.gz``.
+    """
+    return write_trace(read_trace(source), destination)
+
+
+def expand_trace(source: str, destination: str) -> int:
+    """Writes the records of a trace file back out as plain JSONL; returns the number of records."""
+    count = 0
+    with _open(destination, "w") as out:
+        for record in read_trace(source):
+            out.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert evaluation JSONL files to and from the trace format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("convert", "JSONL to trace."), ("expand", "Trace to JSONL.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("source")
+        command.add_argument("destination")
+    args = parser.parse_args(argv)
+
+    if args.command == "expand":
+        count = expand_trace(args.source, args.destination)
+        print(f"[trace_format] Wrote {count} records to {args.destination}")
+        return
+    stats = convert_jsonl(args.source, args.destination)
+    print(
+        f"[trace_format] {stats.records} records, {stats.tools} tool definitions in {stats.tool_sets} tool sets, "
+        f"{stats.system_prompts} system prompts; {os.path.getsize(args.source) / 1e6:.2f} MB -> "
+        f"{os.path.getsize(args.destination) / 1e6:.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
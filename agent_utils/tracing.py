@@ -0,0 +1,425 @@
+"""
+Low-overhead tracing profile for agent samples.
+
+``configure_azure_monitor`` plus ``project_client.telemetry.enable()``
+records and exports every span of every run, and the SDK's
+``@trace_function()`` serializes every argument and return value. On a
+hot path that costs more than the runs being traced. ``configure_tracing``
+sets up the OpenTelemetry SDK from a TracingProfile instead:
+
+* head sampling: a fixed share of traces (by trace ID) is recorded and
+  exported; spans of the other traces are not recorded at all,
+* tail sampling: optionally, the other traces are recorded in memory and
+  exported only when they end in an error or their root span was slow,
+* attribute caps: span attribute count and value length are limited, so a
+  large tool argument or message cannot bloat a span,
+* batched export: spans are exported in batches from a background thread,
+  never on the calling thread or the event loop,
+* argument capture: tool arguments and return values (``trace_tool``) and
+  message contents (the SDK instrumentation) are recorded only when enabled.
+
+Profiles are chosen with ``TRACING_PROFILE`` (``full`` or ``low_overhead``)
+and adjusted with ``TRACING_SAMPLE_RATIO``, ``TRACING_SLOW_SECONDS``,
+``TRACING_CAPTURE_ARGUMENTS`` and ``TRACING_MAX_ATTRIBUTE_LENGTH``.
+"""
+
+import collections
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanLimits, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult, TraceIdRatioBased
+from opentelemetry.trace import SpanContext, Status, StatusCode, TraceFlags
+
+_CONTENT_RECORDING_VARIABLE = "AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED"
+
+
+@dataclass
+class TracingProfile:
+    """
+    What is traced and how it is exported.
+
+    :param sample_ratio: Share of traces recorded and exported up front (head sampling).
+    :param keep_errors: Also export traces outside the sample whose spans ended with an error.
+    :param slow_seconds: Also export traces outside the sample whose root span took at least this long.
+    :param capture_arguments: Record tool arguments, return values and message contents.
+    :param max_attribute_length: Longest string attribute kept; longer values are truncated.
+    :param max_attributes: Attributes kept per span.
+    :param max_events: Events kept per span.
+    :param max_queue_size: Spans waiting for export before new ones are dropped.
+    :param export_batch_size: Spans per export request.
+    :param export_delay_ms: Longest wait before a partial batch is exported.
+    :param max_buffered_traces: Traces held for the tail decision; the oldest are dropped beyond this.
+    """
+
+    sample_ratio: float = 1.0
+    keep_errors: bool = False
+    slow_seconds: Optional[float] = None
+    capture_arguments: bool = True
+    max_attribute_length: Optional[int] = None
+    max_attributes: Optional[int] = None
+    max_events: Optional[int] = None
+    max_queue_size: int = 2048
+    export_batch_size: int = 512
+    export_delay_ms: int = 5000
+    max_buffered_traces: int = 1024
+
+    @property
+    def tail_sampling(self) -> bool:
+        return self.sample_ratio < 1.0 and (self.keep_errors or self.slow_seconds is not None)
+
+    @classmethod
+    def full(cls) -> "TracingProfile":
+        """Every span, every argument; what ``configure_azure_monitor`` did."""
+        return cls()
+
+    @classmethod
+    def low_overhead(cls) -> "TracingProfile":
+        """10% of traces plus every failed or slow one, capped attributes, no argument capture."""
+        return cls(
+            sample_ratio=0.1,
+            keep_errors=True,
+            slow_seconds=30.0,
+            capture_arguments=False,
+            max_attribute_length=1024,
+            max_attributes=32,
+            max_events=32,
+        )
+
+    @classmethod
+    def from_env(cls) -> "TracingProfile":
+        """``TRACING_PROFILE`` (default ``full``), with the ``TRACING_*`` overrides applied."""
+        profile = cls.low_overhead() if os.getenv("TRACING_PROFILE", "full") == "low_overhead" else cls.full()
+        if os.getenv("TRACING_SAMPLE_RATIO"):
+            profile.sample_ratio = float(os.environ["TRACING_SAMPLE_RATIO"])
+        if os.getenv("TRACING_SLOW_SECONDS"):
+            profile.slow_seconds = float(os.environ["TRACING_SLOW_SECONDS"])
+        if os.getenv("TRACING_CAPTURE_ARGUMENTS"):
+            profile.capture_arguments = os.environ["TRACING_CAPTURE_ARGUMENTS"].lower() in ("1", "true", "yes")
+        if os.getenv("TRACING_MAX_ATTRIBUTE_LENGTH"):
+            profile.max_attribute_length = int(os.environ["TRACING_MAX_ATTRIBUTE_LENGTH"])
+        return profile
+
+
+@dataclass
+class TracingStats:
+    """Counters of a tracing session. Traces are counted by their local root span."""
+
+    traces_sampled: int = 0
+    traces_tail_kept: int = 0
+    traces_tail_dropped: int = 0
+    traces_not_recorded: int = 0
+    traces_evicted: int = 0
+    spans_exported: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.traces_sampled} traces sampled, {self.traces_tail_kept} kept by tail sampling, "
+            f"{self.traces_tail_dropped} dropped after recording, {self.traces_not_recorded} not recorded, "
+            f"{self.traces_evicted} evicted; {self.spans_exported} spans exported"
+        )
+
+
+class HeadTailSampler(Sampler):
+    """
+    Samples root spans by trace ID; children follow their parent.
+
+    Traces outside the head sample are recorded without the sampled flag when tail sampling is on,
+    so TailSamplingSpanProcessor can still export them, and not recorded at all otherwise.
+    """
+
+    def __init__(self, ratio: float, tail: bool, stats: TracingStats) -> None:
+        self._head = TraceIdRatioBased(ratio)
+        self._tail = tail
+        self._stats = stats
+
+    def should_sample(
+        self,
+        parent_context: Optional[otel_context.Context],
+        trace_id: int,
+        name: str,
+        kind: Any = None,
+        attributes: Any = None,
+        links: Any = None,
+        trace_state: Any = None,
+    ) -> SamplingResult:
+        parent = trace.get_current_span(parent_context)
+        parent_span_context = parent.get_span_context()
+        if parent_span_context.is_valid:
+            if parent_span_context.trace_flags.sampled:
+                return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes, parent_span_context.trace_state)
+            decision = Decision.RECORD_ONLY if self._tail and parent.is_recording() else Decision.DROP
+            return SamplingResult(decision, attributes if decision != Decision.DROP else None, parent_span_context.trace_state)
+        result = self._head.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        if result.decision == Decision.RECORD_AND_SAMPLE:
+            self._stats.traces_sampled += 1
+            return result
+        if self._tail:
+            return SamplingResult(Decision.RECORD_ONLY, attributes)
+        self._stats.traces_not_recorded += 1
+        return result
+
+    def get_description(self) -> str:
+        return f"HeadTailSampler{{{self._head.get_description()}, tail={self._tail}}}"
+
+
+def _as_sampled(span: ReadableSpan) -> ReadableSpan:
+    # Exporters and BatchSpanProcessor only take spans with the sampled flag
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(context.trace_id, context.span_id, context.is_remote, TraceFlags(TraceFlags.SAMPLED), context.trace_state),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Exports sampled spans in batches, and decides on recorded-only traces when their local root ends.
+
+    :param exporter: Destination of the spans, e.g. AzureMonitorTraceExporter or OTLPSpanExporter.
+    :param profile: Tail rules, buffer size and batching.
+    :param stats: Counters shared with the sampler.
+    """
+
+    def __init__(self, exporter: SpanExporter, profile: TracingProfile, stats: TracingStats) -> None:
+        self.profile = profile
+        self.stats = stats
+        self._batch = BatchSpanProcessor(
+            exporter,
+            max_queue_size=profile.max_queue_size,
+            schedule_delay_millis=profile.export_delay_ms,
+            max_export_batch_size=profile.export_batch_size,
+        )
+        self._pending: "collections.OrderedDict[int, List[ReadableSpan]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Any, parent_context: Optional[otel_context.Context] = None) -> None:
+        pass
+
+    def _keep(self, root: ReadableSpan, spans: Sequence[ReadableSpan]) -> bool:
+        if self.profile.keep_errors and any(s.status.status_code == StatusCode.ERROR for s in spans):
+            return True
+        if self.profile.slow_seconds is not None and root.end_time and root.start_time:
+            return (root.end_time - root.start_time) / 1e9 >= self.profile.slow_seconds
+        return False
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self.stats.spans_exported += 1
+            self._batch.on_end(span)
+            return
+        trace_id = span.context.trace_id
+        with self._lock:
+            self._pending.setdefault(trace_id, []).append(span)
+            self._pending.move_to_end(trace_id)
+            while len(self._pending) > self.profile.max_buffered_traces:
+                self._pending.popitem(last=False)
+                self.stats.traces_evicted += 1
+            if span.parent is not None and not span.parent.is_remote:
+                return
+            spans = self._pending.pop(trace_id, [])
+        if not self._keep(span, spans):
+            self.stats.traces_tail_dropped += 1
+            return
+        self.stats.traces_tail_kept += 1
+        self.stats.spans_exported += len(spans)
+        for buffered in spans:
+            self._batch.on_end(_as_sampled(buffered))
+
+    def shutdown(self) -> None:
+        self._batch.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._batch.force_flush(timeout_millis)
+
+
+class TracingSession:
+    """The tracer provider and counters set up by ``configure_tracing``."""
+
+    def __init__(self, provider: TracerProvider, processor: TailSamplingSpanProcessor, profile: TracingProfile) -> None:
+        self.provider = provider
+        self.processor = processor
+        self.profile = profile
+
+    @property
+    def stats(self) -> TracingStats:
+        return self.processor.stats
+
+    def summary(self) -> str:
+        return f"[tracing] sample_ratio={self.profile.sample_ratio:g}, capture_arguments={self.profile.capture_arguments}: {self.stats}"
+
+    def shutdown(self) -> None:
+        """Exports what is still queued and stops the export thread."""
+        self.provider.shutdown()
+
+    def __enter__(self) -> "TracingSession":
+        return self
+
+    def __exit__(self, *exc_details: Any) -> None:
+        self.shutdown()
+
+
+# Profile of the active session; trace_tool reads it at call time
+_active_profile = TracingProfile.full()
+
+
+def active_profile() -> TracingProfile:
+    """Profile of the last ``configure_tracing`` call; ``full`` before any."""
+    return _active_profile
+
+
+def _default_exporter(connection_string: Optional[str]) -> SpanExporter:
+    if connection_string:
+        from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+
+        return AzureMonitorTraceExporter(connection_string=connection_string)
+    if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"):
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    raise ValueError("configure_tracing needs an exporter, an Application Insights connection string or OTEL_EXPORTER_OTLP_ENDPOINT")
+
+
+def configure_tracing(
+    profile: Optional[TracingProfile] = None,
+    exporter: Optional[SpanExporter] = None,
+    connection_string: Optional[str] = None,
+    service_name: Optional[str] = None,
+    set_global: bool = True,
+) -> TracingSession:
+    """
+    Sets up OpenTelemetry tracing with a profile, in place of ``configure_azure_monitor``.
+
+    :param profile: Sampling, caps and batching; ``TracingProfile.from_env()`` by default.
+    :param exporter: Span exporter; by default Azure Monitor when ``connection_string`` is given, else OTLP/HTTP.
+    :param connection_string: Application Insights connection string, e.g. from ``project_client.telemetry``.
+    :param service_name: ``service.name`` resource attribute.
+    :param set_global: Install the provider as the global tracer provider.
+    """
+    global _active_profile
+    profile = profile or TracingProfile.from_env()
+    stats = TracingStats()
+    processor = TailSamplingSpanProcessor(exporter or _default_exporter(connection_string), profile, stats)
+    limits = SpanLimits(
+        max_span_attributes=profile.max_attributes,
+        max_events=profile.max_events,
+        max_span_attribute_length=profile.max_attribute_length,
+    )
+    resource = Resource.create({"service.name": service_name} if service_name else {})
+    provider = TracerProvider(
+        sampler=HeadTailSampler(profile.sample_ratio, profile.tail_sampling, stats), resource=resource, span_limits=limits
+    )
+    provider.add_span_processor(processor)
+    if profile.max_attribute_length is not None:
+        # Truncation is intended; the SDK would otherwise log a warning for every capped value
+        logging.getLogger("opentelemetry.attributes").setLevel(logging.ERROR)
+    if set_global:
+        trace.set_tracer_provider(provider)
+    _active_profile = profile
+    return TracingSession(provider, processor, profile)
+
+
+def enable_sdk_instrumentation(project_client: Any, profile: Optional[TracingProfile] = None) -> None:
+    """
+    Enables the Azure AI SDK instrumentation (``project_client.telemetry.enable()``), recording message
+    contents only when the profile captures arguments.
+    """
+    profile = profile or _active_profile
+    os.environ[_CONTENT_RECORDING_VARIABLE] = "true" if profile.capture_arguments else "false"
+    project_client.telemetry.enable()
+
+
+def _attribute(value: Any) -> Any:
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return json.dumps(value, default=str)
+
+
+def trace_tool(span_name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Traces a tool function, like ``azure.ai.projects.telemetry.trace_function``.
+
+    Arguments and the return value are recorded as ``code.function.parameter.<name>`` and
+    ``code.function.return.value`` only when the active profile captures arguments and the span is
+    head-sampled, so untraced calls cost a span start and nothing else. Spans only recorded for the
+    tail decision get no arguments, even if their trace is kept.
+
+    :param span_name: Span name; the function name by default.
+    """
+
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        name = span_name or function.__name__
+        signature = inspect.signature(function)
+        tracer = trace.get_tracer(__name__)
+
+        def record_arguments(span: Any, args: Any, kwargs: Any) -> bool:
+            if not (_active_profile.capture_arguments and span.is_recording()):
+                return False
+            # Recorded-only spans wait for the tail decision and are mostly dropped
+            if not span.get_span_context().trace_flags.sampled:
+                return False
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            span.set_attributes(
+                {f"code.function.parameter.{k}": _attribute(v) for k, v in bound.arguments.items() if v is not None}
+            )
+            return True
+
+        def record_error(span: Any, e: Exception) -> None:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            span.set_attribute("error.type", e.__class__.__qualname__)
+
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.start_as_current_span(name, record_exception=False, set_status_on_exception=False) as span:
+                    capture = record_arguments(span, args, kwargs)
+                    try:
+                        result = await function(*args, **kwargs)
+                    except Exception as e:
+                        record_error(span, e)
+                        raise
+                    if capture and result is not None:
+                        span.set_attribute("code.function.return.value", _attribute(result))
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(name, record_exception=False, set_status_on_exception=False) as span:
+                capture = record_arguments(span, args, kwargs)
+                try:
+                    result = function(*args, **kwargs)
+                except Exception as e:
+                    record_error(span, e)
+                    raise
+                if capture and result is not None:
+                    span.set_attribute("code.function.return.value", _attribute(result))
+                return result
+
+        return sync_wrapper
+
+    return decorator
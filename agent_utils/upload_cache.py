@@ -0,0 +1,297 @@
+"""
+Content-addressed upload cache for file search samples.
+
+Every file search sample used to upload the same product files and build a
+fresh vector store on each run, which costs tens of seconds of upload and
+indexing before the agent can answer. UploadCache keeps a small JSON
+manifest that maps the SHA-256 of each file's content to the remote file ID,
+and each named vector store to its ID and members. Unchanged files are
+not uploaded again and vector stores are reused across runs; only files
+whose content changed are uploaded and added.
+
+Remote state is trusted lazily: the first time a cached ID is used in a
+process it is checked with one ``get_file``/``get_vector_store`` call, and
+an ID that no longer exists (404) is dropped from the manifest and rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from azure.core.exceptions import ResourceNotFoundError
+
+DEFAULT_MANIFEST_PATH = os.getenv("UPLOAD_MANIFEST_PATH", ".agent_uploads.json")
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Hashes a file's content in chunks, so large files are never fully loaded."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class UploadCacheStats:
+    """What the cache saved (or could not save) in this process."""
+
+    files_reused: int = 0
+    files_uploaded: int = 0
+    vector_stores_reused: int = 0
+    vector_stores_created: int = 0
+    vector_stores_updated: int = 0
+    rebuilt_after_404: int = 0
+
+
+class UploadManifest:
+    """
+    JSON manifest of uploaded files and vector stores.
+
+    Layout::
+
+        {"files": {sha256: {"file_id", "filename", "bytes", "purpose", "uploaded_at"}},
+         "vector_stores": {name: {"id", "files": {sha256: file_id}, "updated_at"}},
+         "paths": {absolute_path: {"sha256", "size", "mtime_ns"}}}
+
+    ``paths`` lets directory syncs skip re-hashing files whose size and mtime are unchanged.
+    Writers that share a manifest across threads hold ``lock`` while mutating it.
+
+    :param path: Location of the manifest file. It is created on the first save.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH) -> None:
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.vector_stores: Dict[str, Dict[str, Any]] = {}
+        self.paths: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.files = data.get("files", {})
+                self.vector_stores = data.get("vector_stores", {})
+                self.paths = data.get("paths", {})
+            except (OSError, ValueError) as e:
+                # A corrupt manifest only costs a re-upload, so start over
+                print(f"[upload_cache] Ignoring unreadable manifest {path}: {e}")
+
+    def save(self) -> None:
+        """Writes the manifest atomically, so an interrupted run never leaves it half written."""
+        with self.lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"files": self.files, "vector_stores": self.vector_stores, "paths": self.paths},
+                    f,
+                    indent=2,
+                    sort_keys=True,
+                )
+            os.replace(temp_path, self.path)
+
+
+class _UploadCacheBase:
+    def __init__(self, project_client: Any, manifest: Optional[UploadManifest] = None) -> None:
+        self.project_client = project_client
+        self.manifest = manifest or UploadManifest()
+        self.stats = UploadCacheStats()
+        # IDs already confirmed to exist during this process
+        self._validated: Set[str] = set()
+
+    def _purpose(self, purpose: Any) -> str:
+        return str(getattr(purpose, "value", purpose))
+
+    def _record_file(self, digest: str, file_path: str, uploaded: Any, purpose: Any) -> None:
+        self.manifest.files[digest] = {
+            "file_id": uploaded.id,
+            "filename": os.path.basename(file_path),
+            "bytes": os.path.getsize(file_path),
+            "purpose": self._purpose(purpose),
+            "uploaded_at": int(time.time()),
+        }
+        self._validated.add(uploaded.id)
+        self.stats.files_uploaded += 1
+        print(f"[upload_cache] Uploaded {file_path} as {uploaded.id}")
+
+    def _changes(self, entry: Dict[str, Any], file_ids: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        # Members are compared by (hash, file ID): a file re-uploaded after a 404 keeps
+        # its hash but gets a new ID, and has to be added to the store again
+        members = entry.get("files", {})
+        added = [file_id for digest, file_id in file_ids.items() if members.get(digest) != file_id]
+        removed = [file_id for digest, file_id in members.items() if file_ids.get(digest) != file_id]
+        return added, removed
+
+    def _record_vector_store(self, name: str, vector_store_id: str, file_ids: Dict[str, str]) -> None:
+        self.manifest.vector_stores[name] = {
+            "id": vector_store_id,
+            "files": dict(file_ids),
+            "updated_at": int(time.time()),
+        }
+        self._validated.add(vector_store_id)
+        self.manifest.save()
+
+
+class UploadCache(_UploadCacheBase):
+    """
+    Upload cache for the sync AIProjectClient.
+
+    :param project_client: AIProjectClient that owns the files and vector stores.
+    :param manifest: Manifest to use; defaults to ``UPLOAD_MANIFEST_PATH`` or ``.agent_uploads.json``.
+    """
+
+    def _exists(self, remote_id: str, getter: Any) -> bool:
+        if remote_id in self._validated:
+            return True
+        try:
+            getter(remote_id)
+        except ResourceNotFoundError:
+            self.stats.rebuilt_after_404 += 1
+            print(f"[upload_cache] {remote_id} no longer exists, rebuilding")
+            return False
+        self._validated.add(remote_id)
+        return True
+
+    def _upload(self, file_path: str, digest: str, purpose: Any) -> str:
+        entry = self.manifest.files.get(digest)
+        if entry is not None:
+            if self._exists(entry["file_id"], self.project_client.agents.get_file):
+                self.stats.files_reused += 1
+                return entry["file_id"]
+            del self.manifest.files[digest]
+        uploaded = self.project_client.agents.upload_file_and_poll(file_path=file_path, purpose=purpose)
+        self._record_file(digest, file_path, uploaded, purpose)
+        return uploaded.id
+
+    def upload(self, file_path: str, purpose: Any = "assistants") -> str:
+        """
+        Returns the remote ID of a file's content, uploading it only if needed.
+
+        :param file_path: Local file to upload.
+        :param purpose: Upload purpose, as for ``upload_file_and_poll``.
+        :return: The remote file ID.
+        """
+        file_id = self._upload(file_path, file_sha256(file_path), purpose)
+        self.manifest.save()
+        return file_id
+
+    def vector_store(self, name: str, file_paths: Sequence[str], purpose: Any = "assistants") -> str:
+        """
+        Returns a vector store holding exactly the given files' current content.
+
+        The store recorded under ``name`` is reused when it still exists; files whose
+        content changed are uploaded and added, and stale members are removed. A store
+        that was deleted remotely is rebuilt.
+
+        :param name: Manifest key, also used as the vector store name.
+        :param file_paths: Local files the store should contain.
+        :param purpose: Upload purpose for new files.
+        :return: The vector store ID.
+        """
+        agents = self.project_client.agents
+        digests = [file_sha256(path) for path in file_paths]
+        file_ids = {digest: self._upload(path, digest, purpose) for path, digest in zip(file_paths, digests)}
+        entry = self.manifest.vector_stores.get(name)
+
+        if entry is not None and self._exists(entry["id"], agents.get_vector_store):
+            vector_store_id = entry["id"]
+            added, removed = self._changes(entry, file_ids)
+            if not added and not removed:
+                self.stats.vector_stores_reused += 1
+                print(f"[upload_cache] Reusing vector store {name} ({vector_store_id})")
+                self.manifest.save()
+                return vector_store_id
+            if added:
+                agents.create_vector_store_file_batch_and_poll(vector_store_id=vector_store_id, file_ids=added)
+            for file_id in removed:
+                try:
+                    agents.delete_vector_store_file(vector_store_id=vector_store_id, file_id=file_id)
+                except ResourceNotFoundError:
+                    pass
+            self.stats.vector_stores_updated += 1
+            print(f"[upload_cache] Updated vector store {name}: {len(added)} added, {len(removed)} removed")
+        else:
+            vector_store = agents.create_vector_store_and_poll(file_ids=list(file_ids.values()), name=name)
+            vector_store_id = vector_store.id
+            self.stats.vector_stores_created += 1
+            print(f"[upload_cache] Created vector store {name} ({vector_store_id})")
+
+        self._record_vector_store(name, vector_store_id, file_ids)
+        return vector_store_id
+
+
+class AsyncUploadCache(_UploadCacheBase):
+    """
+    Upload cache for the async AIProjectClient.
+
+    :param project_client: Async AIProjectClient that owns the files and vector stores.
+    :param manifest: Manifest to use; defaults to ``UPLOAD_MANIFEST_PATH`` or ``.agent_uploads.json``.
+    """
+
+    async def _exists(self, remote_id: str, getter: Any) -> bool:
+        if remote_id in self._validated:
+            return True
+        try:
+            await getter(remote_id)
+        except ResourceNotFoundError:
+            self.stats.rebuilt_after_404 += 1
+            print(f"[upload_cache] {remote_id} no longer exists, rebuilding")
+            return False
+        self._validated.add(remote_id)
+        return True
+
+    async def _upload(self, file_path: str, digest: str, purpose: Any) -> str:
+        entry = self.manifest.files.get(digest)
+        if entry is not None:
+            if await self._exists(entry["file_id"], self.project_client.agents.get_file):
+                self.stats.files_reused += 1
+                return entry["file_id"]
+            del self.manifest.files[digest]
+        uploaded = await self.project_client.agents.upload_file_and_poll(file_path=file_path, purpose=purpose)
+        self._record_file(digest, file_path, uploaded, purpose)
+        return uploaded.id
+
+    async def upload(self, file_path: str, purpose: Any = "assistants") -> str:
+        """Async form of ``UploadCache.upload``."""
+        file_id = await self._upload(file_path, file_sha256(file_path), purpose)
+        self.manifest.save()
+        return file_id
+
+    async def vector_store(self, name: str, file_paths: Sequence[str], purpose: Any = "assistants") -> str:
+        """Async form of ``UploadCache.vector_store``."""
+        agents = self.project_client.agents
+        digests = [file_sha256(path) for path in file_paths]
+        file_ids = {digest: await self._upload(path, digest, purpose) for path, digest in zip(file_paths, digests)}
+        entry = self.manifest.vector_stores.get(name)
+
+        if entry is not None and await self._exists(entry["id"], agents.get_vector_store):
+            vector_store_id = entry["id"]
+            added, removed = self._changes(entry, file_ids)
+            if not added and not removed:
+                self.stats.vector_stores_reused += 1
+                print(f"[upload_cache] Reusing vector store {name} ({vector_store_id})")
+                self.manifest.save()
+                return vector_store_id
+            if added:
+                await agents.create_vector_store_file_batch_and_poll(vector_store_id=vector_store_id, file_ids=added)
+            for file_id in removed:
+                try:
+                    await agents.delete_vector_store_file(vector_store_id=vector_store_id, file_id=file_id)
+                except ResourceNotFoundError:
+                    pass
+            self.stats.vector_stores_updated += 1
+            print(f"[upload_cache] Updated vector store {name}: {len(added)} added, {len(removed)} removed")
+        else:
+            vector_store = await agents.create_vector_store_and_poll(file_ids=list(file_ids.values()), name=name)
+            vector_store_id = vector_store.id
+            self.stats.vector_stores_created += 1
+            print(f"[upload_cache] Created vector store {name} ({vector_store_id})")
+
+        self._record_vector_store(name, vector_store_id, file_ids)
+        return vector_store_id
@@ -1,18 +1,13 @@
 import asyncio
-import os
-import sys
 import json
 import datetime
 from typing import Any, Callable, Set, Optional
-from azure.ai.projects.telemetry import trace_function
 
-
-# Add parent directory to sys.path to import user_functions
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
-from user_functions import get_current_datetime, get_weather_by_location, send_email_to_address
+try:
+    from agent_utils.tracing import trace_tool
+except ImportError:  # the OpenTelemetry SDK is not installed; the SDK decorator falls back to a no-op
+    from azure.ai.projects.telemetry import trace_function as trace_tool
+from agent_utils.user_functions import get_current_datetime, get_weather_by_location, send_email_to_address
 
 
 async def send_email_async(recipient: str, subject: str, body: str) -> str:
@@ -29,9 +24,10 @@ async def send_email_async(recipient: str, subject: str, body: str) -> str:
     return send_email_to_address(recipient, subject, body)
 
 
-# The trace_func decorator will trace the function call and enable adding additional attributes
-# to the span in the function implementation. Note that this will trace the function parameters and their values.
-@trace_function()
+# The trace_tool decorator will trace the function call and enable adding additional attributes
+# to the span in the function implementation. The function parameters and their values are traced
+# only when the tracing profile captures arguments (TRACING_CAPTURE_ARGUMENTS).
+@trace_tool()
 async def fetch_current_datetime_async(format: Optional[str] = None) -> str:
     """
     Get the current time as a JSON string, optionally formatted.
@@ -57,4 +53,4 @@ async def fetch_current_datetime_async(format: Optional[str] = None) -> str:
 user_async_functions: Set[Callable[..., Any]] = {
     fetch_current_datetime_async,
     get_weather_by_location,
-    send_email_async,}
\ No newline at end of file
+    send_email_async,}
@@ -3,6 +3,8 @@ import datetime
 from typing import Any, Callable, Set, Dict, List, Optional
 import os
 import uuid
+
+from agent_utils.tool_cache import pure
 # These are user-defined utility functions that agents can invoke.
 
 def get_current_datetime(format: Optional[str] = None) -> str:
@@ -36,6 +38,8 @@ def create_text_file_from_string(data: str, filename: Optional[str] = None) -> s
     
     return filepath
 
+# Mock lookup; a TTL keeps cached answers from outliving real data once it is wired in
+@pure(ttl=300)
 def get_weather_by_location(location: str) -> str:
     """
     Retrieves mock weather information for the specified location.
@@ -78,6 +82,7 @@ def send_email_to_recipient_name(recipient: str, subject: str, body: str) -> str
     return json.dumps({"message": f"Email successfully sent to {recipient}."})
 
 
+@pure
 def add_two_numbers(a: int, b: int) -> str:
     """
     Adds two integers and returns the sum as a JSON string.
@@ -90,6 +95,7 @@ def add_two_numbers(a: int, b: int) -> str:
     return json.dumps({"result": result})
 
 
+@pure
 def celsius_to_fahrenheit(celsius: float) -> str:
     """
     Converts a Celsius temperature to Fahrenheit.
@@ -101,6 +107,7 @@ def celsius_to_fahrenheit(celsius: float) -> str:
     return json.dumps({"fahrenheit": fahrenheit})
 
 
+@pure
 def invert_boolean_flag(flag: bool) -> str:
     """
     Inverts a given boolean value.
@@ -112,6 +119,7 @@ def invert_boolean_flag(flag: bool) -> str:
     return json.dumps({"toggled_flag": toggled})
 
 
+@pure
 def merge_two_dictionaries(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> str:
     """
     Merges two dictionaries into one.
@@ -125,6 +133,7 @@ def merge_two_dictionaries(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> str:
     return json.dumps({"merged_dict": merged})
 
 
+@pure(ttl=300)
 def retrieve_user_information(user_id: int) -> str:
     """
     Retrieves mock user information based on a user ID.
@@ -141,6 +150,7 @@ def retrieve_user_information(user_id: int) -> str:
     return json.dumps({"user_info": user_info})
 
 
+@pure
 def find_longest_words(sentences: List[str]) -> str:
     """
     Identifies the longest word in each provided sentence.
@@ -159,6 +169,7 @@ def find_longest_words(sentences: List[str]) -> str:
     return json.dumps({"longest_words": longest_words})
 
 
+@pure
 def summarize_record_values(records: List[Dict[str, int]]) -> str:
     """
     Processes a list of records and computes the sum of integer values in each record.
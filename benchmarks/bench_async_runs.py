@@ -0,0 +1,84 @@
+"""
+DESCRIPTION:
+    Measures how concurrent-run throughput scales in a single event loop, against the
+    local mock of the agents endpoint (no Azure project needed).
+
+    It compares the old Section_8 pattern (a blocking time.sleep(1) poll inside an
+    async function) with AsyncRunExecutor, which awaits runs with backoff.
+
+USAGE:
+    python benchmarks/bench_async_runs.py --concurrency 1 10 100 500 --latency 0.02 --run-duration 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.async_runs import AsyncRunExecutor
+from agent_utils.mock_agents import AsyncMockProjectClient, MockAgentsBackend
+
+
+async def legacy_run(project_client: AsyncMockProjectClient, agent_id: str, content: str) -> None:
+    # The original 8_6 loop: time.sleep blocks the whole event loop while waiting
+    thread = await project_client.agents.create_thread()
+    await project_client.agents.create_message(thread_id=thread.id, role="user", content=content)
+    run = await project_client.agents.create_run(thread_id=thread.id, agent_id=agent_id)
+    while run.status in ["queued", "in_progress", "requires_action"]:
+        time.sleep(1)
+        run = await project_client.agents.get_run(thread_id=thread.id, run_id=run.id)
+
+
+async def bench_legacy(runs: int, latency: float, run_duration: float) -> None:
+    backend = MockAgentsBackend(latency=latency, run_duration=run_duration)
+    async with AsyncMockProjectClient(backend) as project_client:
+        agent = await project_client.agents.create_agent(model="mock", name="bench")
+        start = time.perf_counter()
+        await asyncio.gather(*(legacy_run(project_client, agent.id, f"prompt {i}") for i in range(runs)))
+        elapsed = time.perf_counter() - start
+    print(
+        f"{'legacy sleep(1)':<18}{runs:>8}{elapsed:>10.2f}{runs / elapsed:>10.1f}"
+        f"{'-':>9}{'-':>9}{backend.request_counts['get_run'] / runs:>11.1f}"
+    )
+
+
+async def bench_executor(runs: int, latency: float, run_duration: float) -> None:
+    backend = MockAgentsBackend(latency=latency, run_duration=run_duration)
+    async with AsyncMockProjectClient(backend) as project_client:
+        agent = await project_client.agents.create_agent(model="mock", name="bench")
+        executor = AsyncRunExecutor(project_client, agent.id, max_concurrency=runs)
+        start = time.perf_counter()
+        outcomes = await executor.run_many(f"prompt {i}" for i in range(runs))
+        elapsed = time.perf_counter() - start
+    failed = sum(1 for outcome in outcomes if outcome.error or outcome.status != "completed")
+    summary = executor.run_waiter.summary()
+    print(
+        f"{'executor':<18}{runs:>8}{elapsed:>10.2f}{runs / elapsed:>10.1f}"
+        f"{summary['p50_s']:>9.2f}{summary['p95_s']:>9.2f}{backend.request_counts['get_run'] / runs:>11.1f}"
+        + (f"  ({failed} failed)" if failed else "")
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--legacy-runs", type=int, default=5, help="Runs for the blocking baseline (each costs ~1s).")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock round-trip latency in seconds.")
+    parser.add_argument("--run-duration", type=float, default=0.5, help="Mock time for a run to complete.")
+    args = parser.parse_args()
+
+    print(f"{'mode':<18}{'runs':>8}{'wall_s':>10}{'runs/s':>10}{'p50_s':>9}{'p95_s':>9}{'polls/run':>11}")
+    if args.legacy_runs:
+        await bench_legacy(args.legacy_runs, args.latency, args.run_duration)
+    for runs in args.concurrency:
+        await bench_executor(runs, args.latency, args.run_duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
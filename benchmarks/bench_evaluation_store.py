@@ -0,0 +1,106 @@
+"""
+DESCRIPTION:
+    Cost of comparing two evaluation runs: the same synthetic scores (--records
+    records with four evaluators each) are aggregated and diffed
+
+      jsonl loop    reading EvaluationRunner score files line by line in Python
+      store         agent_utils.evaluation_store (Parquet + Arrow compute)
+
+    The store is written once per run; the write time is shown separately.
+
+USAGE:
+    python benchmarks/bench_evaluation_store.py --records 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.evaluation_store import EvaluationStore
+
+TOOLS = ["get_current_datetime", "get_weather_by_location", "send_email_to_address", "fetch_current_datetime", "add_two_numbers"]
+EVALUATORS = ["intent_resolution", "task_adherence", "tool_call_accuracy", "response_latency"]
+
+
+def synthetic_rows(records: int, seed: int, shift: float) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(records):
+        scores = {}
+        for evaluator in EVALUATORS:
+            value = min(5.0, max(1.0, rng.gauss(3.8 - shift, 0.8)))
+            scores[evaluator] = {evaluator: value, f"{evaluator}_result": "pass" if value >= 3 else "fail"}
+        rows.append(
+            {
+                "thread_id": f"thread_{i // 3}",
+                "run_id": f"run_{i}",
+                "records_in_thread": 3,
+                "record_hash": f"{i:064x}",
+                "tools": rng.sample(TOOLS, rng.randint(0, 3)),
+                "scores": scores,
+            }
+        )
+    return rows
+
+
+def jsonl_diff(baseline_path: str, candidate_path: str) -> dict:
+    # What comparing two score files took before the store: a loop over every line and evaluator
+    def load(path: str) -> dict:
+        values = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                for evaluator, fields in row["scores"].items():
+                    values.setdefault(evaluator, []).append(fields[evaluator])
+        return values
+
+    base, cand = load(baseline_path), load(candidate_path)
+    return {
+        name: (statistics.mean(cand[name]) - statistics.mean(base[name]), statistics.quantiles(cand[name], n=100)[89])
+        for name in base
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = EvaluationStore(os.path.join(directory, "results"))
+        paths = {}
+        for name, seed, shift in (("baseline", 1, 0.0), ("candidate", 2, 0.1)):
+            rows = synthetic_rows(args.records, seed, shift)
+            paths[name] = os.path.join(directory, f"{name}.jsonl")
+            with open(paths[name], "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(row) + "\n" for row in rows)
+            start = time.perf_counter()
+            written = store.write(rows, name)
+            print(f"store write {name}: {written} result rows in {time.perf_counter() - start:.2f}s")
+
+        print(f"{'query':<36}{'seconds':>10}")
+        start = time.perf_counter()
+        jsonl_diff(paths["baseline"], paths["candidate"])
+        print(f"{'jsonl loop: mean + p90 diff':<36}{time.perf_counter() - start:>10.2f}")
+        for label, query in (
+            ("store: summary", lambda: store.summary("baseline")),
+            ("store: diff", lambda: store.diff("baseline", "candidate")),
+            ("store: diff by tool", lambda: store.diff("baseline", "candidate", by=("evaluator", "tool"))),
+            ("store: regressions", lambda: store.regressions("baseline", "candidate", min_drop=1.0)),
+        ):
+            start = time.perf_counter()
+            table = query()
+            print(f"{label:<36}{time.perf_counter() - start:>10.2f}   ({table.num_rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
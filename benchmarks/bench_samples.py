@@ -0,0 +1,314 @@
+"""
+DESCRIPTION:
+    Replays the workflows of the course samples against the local mock of the
+    agents endpoint, so latency, request counts and memory can be measured
+    offline and repeatably (no Azure project or credentials needed).
+
+    Each scenario follows the calls one sample makes:
+      5_x   create agent, thread and message, wait for the run, read the reply
+      5_4   upload files, build a vector store, run a file search agent
+      6_2   function tools executed through create_and_process_run
+      6_2'  the same tool calls answered in parallel by ParallelToolExecutor
+      7_3   streamed run consumed through a custom AgentEventHandler
+      8_x   many concurrent runs on the async client
+      9_x   the investment team's research fan-out with a warm agent pool
+            (research_fanout) and with a new pool per iteration (research_cold)
+
+    For every scenario it prints wall time, mean/p95 latency per iteration,
+    requests per iteration (with the busiest operations) and peak traced
+    allocations. Latency, run duration and failure rates of the mock are
+    configurable so regressions can be checked under different conditions.
+
+USAGE:
+    python benchmarks/bench_samples.py
+    python benchmarks/bench_samples.py --scenario stream_handler --iterations 50 --latency 0.05
+    python benchmarks/bench_samples.py --failure-rate 0.01 --run-failure-rate 0.05 --seed 7
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from azure.ai.projects.models import AgentEventHandler, FunctionTool, MessageDeltaChunk, ThreadRun, ToolSet
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+# The Section_9 helpers are flat modules imported by name
+section_9_dir = os.path.join(parent_dir, "Section_9")
+if section_9_dir not in sys.path:
+    sys.path.insert(0, section_9_dir)
+from agent_utils.async_runs import AsyncRunExecutor
+from agent_utils.mock_agents import AsyncMockProjectClient, MockAgentsBackend, MockProjectClient
+from agent_utils.parallel_tools import ParallelToolExecutor
+from agent_utils.run_waiter import PollBackoff, RunWaiter
+from agent_utils.stats import percentile
+
+
+# Seconds each sample tool function takes, set from --tool-latency
+TOOL_LATENCY = 0.0
+
+
+def fetch_weather(location: str) -> str:
+    """
+    Fetches the weather information for the specified location.
+
+    :param location: The location to fetch weather for.
+    :return: Weather information as a JSON string.
+    """
+    time.sleep(TOOL_LATENCY)
+    return '{"weather": "Sunny, 25C"}'
+
+
+def send_email(recipient: str, subject: str, body: str) -> str:
+    """
+    Sends an email with the specified subject and body to the recipient.
+
+    :param recipient: Email address of the recipient.
+    :param subject: Subject of the email.
+    :param body: Body content of the email.
+    :return: Confirmation message.
+    """
+    time.sleep(TOOL_LATENCY)
+    return '{"message": "Email successfully sent."}'
+
+
+def agent_basic(project_client: MockProjectClient, run_waiter: RunWaiter) -> None:
+    agents = project_client.agents
+    agent = agents.create_agent(model="mock", name="my-agent", instructions="You are a helpful agent")
+    thread = agents.create_thread()
+    agents.create_message(thread_id=thread.id, role="user", content="Hello, tell me a joke")
+    run_waiter.create_and_wait(agents, thread_id=thread.id, agent_id=agent.id, prefer_stream=False)
+    agents.list_messages(thread_id=thread.id).get_last_text_message_by_role("assistant")
+    agents.delete_agent(agent.id)
+
+
+def file_search(project_client: MockProjectClient, run_waiter: RunWaiter, file_paths: List[str]) -> None:
+    agents = project_client.agents
+    file_ids = [agents.upload_file_and_poll(file_path=path, purpose="assistants").id for path in file_paths]
+    vector_store = agents.create_vector_store_and_poll(file_ids=file_ids, name="my_vectorstore")
+    agent = agents.create_agent(model="mock", name="my-agent", instructions="Search the files")
+    thread = agents.create_thread()
+    agents.create_message(thread_id=thread.id, role="user", content="What do the files say?")
+    run_waiter.create_and_wait(agents, thread_id=thread.id, agent_id=agent.id, prefer_stream=False)
+    agents.delete_vector_store(vector_store.id)
+    for file_id in file_ids:
+        agents.delete_file(file_id)
+    agents.delete_agent(agent.id)
+
+
+def function_tools(project_client: MockProjectClient, sleep_interval: float) -> None:
+    agents = project_client.agents
+    toolset = ToolSet()
+    toolset.add(FunctionTool({fetch_weather, send_email}))
+    agent = agents.create_agent(model="mock", name="my-agent", instructions="Use the tools", toolset=toolset)
+    thread = agents.create_thread()
+    agents.create_message(thread_id=thread.id, role="user", content="Email me the weather in Seattle")
+    agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id, toolset=toolset, sleep_interval=sleep_interval)
+    agents.delete_agent(agent.id)
+
+
+def parallel_tools(project_client: MockProjectClient, tool_executor: ParallelToolExecutor) -> None:
+    agents = project_client.agents
+    agent = agents.create_agent(model="mock", name="my-agent", instructions="Use the tools", tools=tool_executor.definitions)
+    thread = agents.create_thread()
+    agents.create_message(thread_id=thread.id, role="user", content="Email me the weather in Seattle")
+    tool_executor.process_run(agents, thread_id=thread.id, agent_id=agent.id, run_waiter=fast_waiter())
+    agents.delete_agent(agent.id)
+
+
+class CountingEventHandler(AgentEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.deltas = 0
+        self.runs = 0
+
+    def on_message_delta(self, delta: "MessageDeltaChunk") -> None:
+        self.deltas += 1
+
+    def on_thread_run(self, run: "ThreadRun") -> None:
+        self.runs += 1
+
+
+def stream_handler(project_client: MockProjectClient) -> None:
+    agents = project_client.agents
+    agent = agents.create_agent(model="mock", name="my-assistant", instructions="You are a helpful assistant")
+    thread = agents.create_thread()
+    agents.create_message(thread_id=thread.id, role="user", content="Hello, tell me a joke")
+    with agents.create_stream(thread_id=thread.id, agent_id=agent.id, event_handler=CountingEventHandler()) as stream:
+        stream.until_done()
+    agents.delete_agent(agent.id)
+
+
+async def async_runs(project_client: AsyncMockProjectClient, runs: int) -> None:
+    agent = await project_client.agents.create_agent(model="mock", name="my-assistant")
+    executor = AsyncRunExecutor(project_client, agent.id, max_concurrency=runs, run_waiter=fast_waiter())
+    await executor.run_many(f"prompt {i}" for i in range(runs))
+    await project_client.agents.delete_agent(agent.id)
+
+
+async def research_fanout(project_client: AsyncMockProjectClient, agent_pool: Any) -> None:
+    from research_fanout import ResearchFanout
+
+    fanout = ResearchFanout(project_client, "mock", agent_pool=agent_pool)
+    await fanout.research("MSFT")
+
+
+async def research_cold(project_client: AsyncMockProjectClient) -> None:
+    from agent_pool import AsyncAgentPool
+
+    async with AsyncAgentPool(project_client) as agent_pool:
+        await research_fanout(project_client, agent_pool)
+
+
+class WarmResearchFanout:
+    """
+    Runs every research_fanout iteration on one event loop and one agent pool,
+    filled by an untimed first research whose requests are not counted.
+    """
+
+    def __init__(self, make_backend: Callable[[], MockAgentsBackend]) -> None:
+        self.make_backend = make_backend
+        self.loop = asyncio.new_event_loop()
+        self.project_client: Optional[AsyncMockProjectClient] = None
+        self.agent_pool: Any = None
+
+    def make(self) -> MockAgentsBackend:
+        from agent_pool import AsyncAgentPool
+
+        backend = self.make_backend()
+        self.project_client = AsyncMockProjectClient(backend)
+        self.agent_pool = AsyncAgentPool(self.project_client)
+        self.loop.run_until_complete(research_fanout(self.project_client, self.agent_pool))
+        backend.request_counts.clear()
+        return backend
+
+    def body(self, backend: MockAgentsBackend) -> None:
+        self.loop.run_until_complete(research_fanout(self.project_client, self.agent_pool))
+
+    def close(self) -> None:
+        if self.agent_pool is not None:
+            self.loop.run_until_complete(self.agent_pool.close())
+        self.loop.close()
+
+
+def fast_waiter() -> RunWaiter:
+    # The mock's runs finish in fractions of a second, so poll on a matching scale
+    return RunWaiter(backoff=PollBackoff(first_delay=0.02, initial_delay=0.04, max_delay=0.5))
+
+
+def measure(
+    name: str, iterations: int, make_backend: Callable[[], MockAgentsBackend], body: Callable[[MockAgentsBackend], Any]
+) -> None:
+    backend = make_backend()
+    latencies: List[float] = []
+    failures = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        iteration_start = time.perf_counter()
+        try:
+            body(backend)
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - iteration_start)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    counts: Counter = backend.request_counts
+    busiest = ", ".join(f"{op}={count / iterations:g}" for op, count in counts.most_common(3))
+    print(
+        f"{name:<16}{iterations:>6}{elapsed:>9.2f}{sum(latencies) / iterations:>9.3f}{percentile(latencies, 95):>9.3f}"
+        f"{backend.total_requests / iterations:>8.1f}{peak / 1024:>10.0f}{failures:>6}  {busiest}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", help="Scenarios to run (default: all).")
+    parser.add_argument("--iterations", type=int, default=10, help="Iterations per scenario.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Mock round-trip latency in seconds.")
+    parser.add_argument("--run-duration", type=float, default=0.2, help="Mock time for a run to complete.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that any request fails.")
+    parser.add_argument("--run-failure-rate", type=float, default=0.0, help="Probability that a run fails.")
+    parser.add_argument("--files", type=int, default=3, help="Files uploaded per file search iteration.")
+    parser.add_argument("--concurrent-runs", type=int, default=100, help="Runs per async_runs iteration.")
+    parser.add_argument("--sleep-interval", type=float, default=1.0, help="create_and_process_run poll interval, as in the SDK.")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="Seconds each tool function takes.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for failure injection.")
+    args = parser.parse_args()
+
+    global TOOL_LATENCY
+    TOOL_LATENCY = args.tool_latency
+    tool_calls = [("fetch_weather", {"location": "Seattle"}), ("send_email", {"recipient": "a@b.c", "subject": "Weather", "body": "Sunny"})]
+    tool_executor = ParallelToolExecutor({fetch_weather, send_email})
+
+    def make_backend(**overrides: Any) -> Callable[[], MockAgentsBackend]:
+        options: Dict[str, Any] = dict(
+            latency=args.latency,
+            queue_time=min(0.05, args.run_duration / 4),
+            run_duration=args.run_duration,
+            failure_rate=args.failure_rate,
+            run_failure_rate=args.run_failure_rate,
+            seed=args.seed,
+        )
+        options.update(overrides)
+        return lambda: MockAgentsBackend(**options)
+
+    temp_dir = tempfile.TemporaryDirectory()
+    file_paths = []
+    for index in range(args.files):
+        path = os.path.join(temp_dir.name, f"document_{index}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# Product information\n" * 200)
+        file_paths.append(path)
+
+    def run_async(make_client: Callable[[AsyncMockProjectClient], Any]) -> Callable[[MockAgentsBackend], Any]:
+        return lambda backend: asyncio.run(make_client(AsyncMockProjectClient(backend)))
+
+    warm_research = WarmResearchFanout(make_backend())
+    scenarios: Dict[str, Any] = {
+        "agent_basic": (make_backend(), lambda backend: agent_basic(MockProjectClient(backend), fast_waiter())),
+        "file_search": (
+            make_backend(index_time_per_file=0.01),
+            lambda backend: file_search(MockProjectClient(backend), fast_waiter(), file_paths),
+        ),
+        "function_tools": (
+            make_backend(tool_calls=tool_calls),
+            lambda backend: function_tools(MockProjectClient(backend), args.sleep_interval),
+        ),
+        "parallel_tools": (
+            make_backend(tool_calls=tool_calls),
+            lambda backend: parallel_tools(MockProjectClient(backend), tool_executor),
+        ),
+        "stream_handler": (make_backend(), lambda backend: stream_handler(MockProjectClient(backend))),
+        "async_runs": (make_backend(), run_async(lambda client: async_runs(client, args.concurrent_runs))),
+        "research_fanout": (warm_research.make, warm_research.body),
+        "research_cold": (make_backend(), run_async(research_cold)),
+    }
+    selected: Optional[List[str]] = args.scenario or list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}. Choose from {', '.join(scenarios)}.")
+
+    print(f"{'scenario':<16}{'iters':>6}{'wall_s':>9}{'mean_s':>9}{'p95_s':>9}{'req/it':>8}{'peak_KiB':>10}{'fail':>6}  busiest ops/it")
+    try:
+        for name in selected:
+            make, body = scenarios[name]
+            measure(name, args.iterations, make, body)
+    finally:
+        tool_executor.close()
+        warm_research.close()
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
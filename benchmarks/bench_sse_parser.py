@@ -0,0 +1,163 @@
+"""
+DESCRIPTION:
+    Micro-benchmark of agent stream parsing: tokens (message deltas) parsed per
+    second from a recorded stream, for
+
+      7_5 handler      the BaseAgentEventHandler override from 7_5 (split + json.loads per delta)
+      AgentEventHandler the SDK's default handler (builds a model for every event)
+      streaming text   agent_utils.fast_stream.StreamingTextEventHandler
+
+    The stream is replayed from memory in fixed-size network chunks, so only the
+    parsing is measured. Without --stream, a stream is synthesised with the local
+    mock: run and step events around a long assistant message, one delta per word.
+
+USAGE:
+    python benchmarks/bench_sse_parser.py --tokens 20000 --chunk-size 4096
+    python benchmarks/bench_sse_parser.py --record /tmp/run.sse
+    python benchmarks/bench_sse_parser.py --stream /tmp/run.sse --repeat 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, List, Optional
+
+from azure.ai.projects.models import (
+    AgentEventHandler,
+    AgentRunStream,
+    AgentStreamEvent,
+    BaseAgentEventHandler,
+    MessageDeltaChunk,
+    MessageDeltaTextContent,
+)
+
+# Add parent directory to sys.path to import the shared agent_utils package
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.fast_stream import StreamingTextEventHandler
+from agent_utils.mock_agents import MockAgentsBackend
+
+
+class LegacyEventHandler(BaseAgentEventHandler[Optional[str]]):
+    # The handler from 7_5, unchanged
+
+    def _process_event(self, event_data_str: str) -> Optional[str]:  # type: ignore[return]
+        event_lines = event_data_str.strip().split("\n")
+        event_type: Optional[str] = None
+        event_data = ""
+        for line in event_lines:
+            if line.startswith("event:"):
+                event_type = line.split(":", 1)[1].strip()
+            elif line.startswith("data:"):
+                event_data = line.split(":", 1)[1].strip()
+
+        if not event_type:
+            raise ValueError("Event type not specified in the event data.")
+
+        if event_type == AgentStreamEvent.THREAD_MESSAGE_DELTA.value:
+
+            event_obj: MessageDeltaChunk = MessageDeltaChunk(**json.loads(event_data))
+
+            for content_part in event_obj.delta.content:
+                if isinstance(content_part, MessageDeltaTextContent):
+                    if content_part.text is not None:
+                        return content_part.text.value
+        return None
+
+
+class TextCollectingEventHandler(AgentEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+
+    def on_message_delta(self, delta: "MessageDeltaChunk") -> None:
+        self.parts.append(delta.text)
+
+
+def synthesise_stream(tokens: int) -> bytes:
+    words = " ".join(f"token{i % 997}" for i in range(tokens))
+    # Some fragments need JSON escaping, as real model output does
+    words = words.replace("token7 ", 'token7 "quoted" ').replace("token11 ", "token11\n")
+    backend = MockAgentsBackend(reply=words)
+    agent = backend.create_agent(model="mock", name="bench")
+    thread = backend.create_thread()
+    backend.create_message(thread_id=thread.id, role="user", content="Tell me a long story")
+    _, frames = backend.stream_frames(thread.id, agent.id)
+    step = b'event: thread.run.step.created\ndata: {"id": "step_1", "object": "thread.run.step", "type": "message_creation", "status": "in_progress"}\n\n'
+    return frames[0] + frames[1] + step + b"".join(frames[2:])
+
+
+def chunked(stream: bytes, chunk_size: int) -> Iterator[bytes]:
+    for i in range(0, len(stream), chunk_size):
+        yield stream[i : i + chunk_size]
+
+
+def run_legacy(stream: bytes, chunk_size: int) -> str:
+    with AgentRunStream(chunked(stream, chunk_size), lambda *args: None, LegacyEventHandler()) as handler:
+        return "".join(chunk for chunk in handler if chunk)
+
+
+def run_sdk(stream: bytes, chunk_size: int) -> str:
+    handler = TextCollectingEventHandler()
+    with AgentRunStream(chunked(stream, chunk_size), lambda *args: None, handler) as events:
+        events.until_done()
+    return "".join(handler.parts)
+
+
+def run_fast(stream: bytes, chunk_size: int) -> str:
+    with AgentRunStream(chunked(stream, chunk_size), lambda *args: None, StreamingTextEventHandler()) as handler:
+        return "".join(handler.get_stream_chunks())
+
+
+def measure(name: str, parse: Callable[[bytes, int], str], stream: bytes, tokens: int, args: Any) -> str:
+    parse(stream, args.chunk_size)  # warm up
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        text = parse(stream, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    parse(stream, args.chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rate = tokens * args.repeat / elapsed
+    print(f"{name:<20}{elapsed / args.repeat * 1000:>10.1f}{rate:>14,.0f}{len(stream) * args.repeat / elapsed / 1e6:>10.1f}{peak / 1024:>11.0f}")
+    return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=20000, help="Message deltas in the synthesised stream.")
+    parser.add_argument("--stream", help="Replay a recorded SSE stream from this file instead.")
+    parser.add_argument("--record", help="Write the synthesised stream to this file and exit.")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Bytes per simulated network chunk.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream, "rb") as f:
+            stream = f.read()
+    else:
+        stream = synthesise_stream(args.tokens)
+    if args.record:
+        with open(args.record, "wb") as f:
+            f.write(stream)
+        print(f"Recorded {len(stream)} bytes to {args.record}")
+        return
+    tokens = stream.count(b"event: thread.message.delta")
+
+    print(f"{len(stream) / 1e6:.2f} MB stream, {tokens} deltas, {args.chunk_size}-byte chunks")
+    print(f"{'handler':<20}{'ms/stream':>10}{'tokens/s':>14}{'MB/s':>10}{'peak_KiB':>11}")
+    legacy = measure("7_5 handler", run_legacy, stream, tokens, args)
+    sdk = measure("AgentEventHandler", run_sdk, stream, tokens, args)
+    fast = measure("streaming text", run_fast, stream, tokens, args)
+    if not legacy == sdk == fast:
+        print("WARNING: handlers produced different text")
+
+
+if __name__ == "__main__":
+    main()
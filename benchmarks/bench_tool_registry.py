@@ -0,0 +1,111 @@
+"""
+DESCRIPTION:
+    Cold-start cost of a large function tool catalog: time to go from nothing
+    to the tool definitions of an agent, for
+
+      FunctionTool     import every tool module and build every schema (what the samples did)
+      registry cold    agent_utils.tool_registry with an empty schema cache
+      registry warm    the same with the cache written by the cold start
+
+    A synthetic catalog of --modules modules with --tools-per-module tools each
+    is generated in a temporary directory. Every measurement runs in a fresh
+    interpreter, so module imports are not shared between them.
+
+USAGE:
+    python benchmarks/bench_tool_registry.py --modules 20 --tools-per-module 25
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+
+TOOL_TEMPLATE = '''
+
+def tool_{module}_{index}(city: str, days: int = 3, units: Optional[str] = None, tags: List[str] = None) -> str:
+    """
+    Returns a mock forecast for a city.
+
+    :param city: Name of the city.
+    :param days: Number of days to forecast.
+    :param units: Optional unit system, metric or imperial.
+    :param tags: Labels to attach to the result.
+    :return: JSON string with the forecast.
+    """
+    return json.dumps({{"city": city, "days": days, "units": units, "tags": tags}})
+'''
+
+# Run in a fresh interpreter; prints the milliseconds spent after the SDK import
+PROBE = textwrap.dedent(
+    """
+    import importlib, sys, time
+    sys.path[:0] = [{catalog!r}, {root!r}]
+    from azure.ai.projects.models import FunctionTool
+    mode, modules = sys.argv[1], sys.argv[2].split(",")
+    start = time.perf_counter()
+    if mode == "function_tool":
+        functions = set()
+        for module in modules:
+            loaded = importlib.import_module(module)
+            functions.update(v for k, v in vars(loaded).items() if k.startswith("tool_"))
+        definitions = FunctionTool(functions).definitions
+    else:
+        from agent_utils.tool_registry import ToolRegistry
+        registry = ToolRegistry(cache_path={cache!r})
+        for module in modules:
+            registry.register_module(module)
+        definitions = registry.function_tool().definitions
+    print(f"{{(time.perf_counter() - start) * 1000:.1f}} {{len(definitions)}}")
+    """
+)
+
+
+def write_catalog(directory: str, modules: int, tools_per_module: int) -> list:
+    names = []
+    for m in range(modules):
+        name = f"catalog_tools_{m}"
+        with open(os.path.join(directory, f"{name}.py"), "w", encoding="utf-8") as f:
+            f.write("import json\nfrom typing import List, Optional\n")
+            f.write("".join(TOOL_TEMPLATE.format(module=m, index=i) for i in range(tools_per_module)))
+        names.append(name)
+    return names
+
+
+def probe(script: str, mode: str, modules: list) -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", script, mode, ",".join(modules)], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--tools-per-module", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per measurement; the best is shown.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as catalog:
+        modules = write_catalog(catalog, args.modules, args.tools_per_module)
+        cache = os.path.join(catalog, "tool_schemas.json")
+        script = PROBE.format(catalog=catalog, root=parent_dir, cache=cache)
+
+        print(f"{args.modules * args.tools_per_module} tools in {args.modules} modules")
+        print(f"{'mode':<16}{'best_ms':>10}{'tools':>8}")
+        for label, mode in [("FunctionTool", "function_tool"), ("registry cold", "registry"), ("registry warm", "registry")]:
+            runs = []
+            for _ in range(args.repeat):
+                if label == "registry cold" and os.path.exists(cache):
+                    os.remove(cache)
+                runs.append(probe(script, mode, modules))
+            best = min(ms for ms, _ in runs)
+            print(f"{label:<16}{best:>10.1f}{runs[0][1]:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+DESCRIPTION:
+    Disk and memory cost of evaluation records as plain JSONL and in the trace
+    format of agent_utils.trace_format, which stores tool definitions and system
+    prompts once per file. --records records are generated from the runs in
+    evaluation_input_data.jsonl, with fresh IDs.
+
+    For each file: its size, the time to stream every record, and the memory
+    held when all records are kept in a list (as evaluate() and the samples did).
+
+USAGE:
+    python benchmarks/bench_trace_format.py --records 20000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+from agent_utils.trace_format import read_trace, write_trace
+
+SAMPLE_PATH = os.path.join(parent_dir, "evaluation_input_data.jsonl")
+
+
+def synthetic_records(count: int) -> list:
+    with open(SAMPLE_PATH, "r", encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+    text = json.dumps(samples)
+    records = []
+    for i in range(count):
+        # Same shape and tool definitions as the sample runs, distinct run and call IDs
+        copy = json.loads(text.replace("run_", f"run_{i}_").replace("call_", f"call_{i}_"))
+        records.append(copy[i % len(copy)])
+    return records
+
+
+def measure(path: str) -> tuple:
+    start = time.perf_counter()
+    count = sum(1 for _ in read_trace(path))
+    stream_seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    held = list(read_trace(path))
+    held_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return count, stream_seconds, held_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.records)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            "jsonl": os.path.join(directory, "records.jsonl"),
+            "trace": os.path.join(directory, "records.trace.jsonl"),
+            "trace.gz": os.path.join(directory, "records.trace.jsonl.gz"),
+        }
+        with open(paths["jsonl"], "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        write_trace(records, paths["trace"])
+        write_trace(records, paths["trace.gz"])
+        del records
+
+        print(f"{'file':<10}{'records':>9}{'size_mb':>10}{'stream_s':>10}{'held_mb':>10}")
+        for label, path in paths.items():
+            count, seconds, held = measure(path)
+            print(f"{label:<10}{count:>9}{os.path.getsize(path) / 1e6:>10.1f}{seconds:>10.2f}{held / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+DESCRIPTION:
+    Per-run cost of tracing an agent run, with spans exported over OTLP/HTTP to
+    a local collector stand-in (an HTTP server that accepts and discards
+    /v1/traces requests). Each run makes the spans of a typical tool-calling
+    run: the run itself, thread and message calls, five status polls, three
+    traced tool calls with a 2 KB argument, and the message listing; 2% of
+    runs fail in a tool.
+
+      none           no tracer provider (OpenTelemetry API no-ops)
+      full           TracingProfile.full(): every span, arguments and contents captured
+      low_overhead   TracingProfile.low_overhead(): 10% head sample plus failed runs,
+                     capped attributes, no argument capture
+      head_only      10% head sample without tail sampling or argument capture
+
+    Every profile runs in a fresh interpreter. Per-run time is measured on the
+    calling thread; export happens on the batch thread and is reported as the
+    bytes the collector received.
+
+USAGE:
+    python benchmarks/bench_tracing.py --runs 2000
+"""
+
+import argparse
+import http.server
+import os
+import subprocess
+import sys
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+PROFILES = ["none", "full", "low_overhead", "head_only"]
+
+
+class CollectorStandIn(http.server.ThreadingHTTPServer):
+    """Accepts OTLP/HTTP export requests and counts them."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.requests = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/traces"
+
+
+class _CollectorHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self) -> None:  # noqa: N802
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:  # type: ignore[attr-defined]
+            self.server.requests += 1  # type: ignore[attr-defined]
+            self.server.bytes += len(body)  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def child(profile_name: str, endpoint: str, runs: int) -> None:
+    from opentelemetry import trace
+
+    from agent_utils.tracing import TracingProfile, active_profile, configure_tracing, trace_tool
+
+    session = None
+    if profile_name != "none":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        profile = {
+            "full": TracingProfile.full(),
+            "low_overhead": TracingProfile.low_overhead(),
+            "head_only": TracingProfile(sample_ratio=0.1, capture_arguments=False),
+        }[profile_name]
+        session = configure_tracing(profile, exporter=OTLPSpanExporter(endpoint=endpoint))
+    tracer = trace.get_tracer("bench")
+    body = "Hello,\n\n" + "The weather in New York is sunny. " * 60
+
+    @trace_tool()
+    def send_email_to_address(recipient: str, subject: str, body: str) -> str:
+        if recipient == "fail@example.com":
+            raise ValueError("mailbox unavailable")
+        return '{"message": "Email successfully sent."}'
+
+    def sdk_span(name: str, content: str = "") -> None:
+        # What the SDK instrumentation records per call; contents only with capture on
+        with tracer.start_as_current_span(name) as span:
+            if span.is_recording():
+                span.set_attributes({"gen_ai.system": "az.ai.agents", "gen_ai.operation.name": name})
+                if content and active_profile().capture_arguments:
+                    span.add_event("gen_ai.user.message", {"gen_ai.event.content": content})
+
+    def one_run(i: int) -> None:
+        with tracer.start_as_current_span("agent_run"):
+            sdk_span("create_thread")
+            sdk_span("create_message", body)
+            sdk_span("create_run")
+            for _ in range(5):
+                sdk_span("get_run")
+            for call in range(3):
+                recipient = "fail@example.com" if i % 50 == 0 and call == 2 else "example@example.com"
+                try:
+                    send_email_to_address(recipient, "Weather", body)
+                except ValueError:
+                    pass
+            sdk_span("list_messages", body)
+
+    for i in range(min(200, runs)):
+        one_run(i)
+    start = time.perf_counter()
+    for i in range(runs):
+        one_run(i)
+    per_run = (time.perf_counter() - start) / runs
+    flush = 0.0
+    if session is not None:
+        start = time.perf_counter()
+        session.shutdown()
+        flush = time.perf_counter() - start
+    exported = session.stats.spans_exported if session is not None else 0
+    print(f"{per_run * 1e6:.1f} {flush:.3f} {exported}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--child", nargs=2, metavar=("PROFILE", "ENDPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.runs)
+        return
+
+    collector = CollectorStandIn()
+    threading.Thread(target=collector.serve_forever, daemon=True).start()
+    print(f"{args.runs} runs per profile, 13 spans per run")
+    print(f"{'profile':<14}{'us_per_run':>12}{'overhead_us':>13}{'spans_out':>11}{'requests':>10}{'kb_out':>9}{'flush_s':>9}")
+    baseline = None
+    for name in PROFILES:
+        requests, sent = collector.requests, collector.bytes
+        output = subprocess.run(
+            [sys.executable, __file__, "--runs", str(args.runs), "--child", name, collector.endpoint],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        per_run, flush, exported = float(output[0]), float(output[1]), int(output[2])
+        baseline = per_run if baseline is None else baseline
+        print(
+            f"{name:<14}{per_run:>12.1f}{per_run - baseline:>13.1f}{exported:>11}"
+            f"{collector.requests - requests:>10}{(collector.bytes - sent) / 1024:>9.0f}{flush:>9.2f}"
+        )
+    collector.shutdown()
+
+
+if __name__ == "__main__":
+    main()